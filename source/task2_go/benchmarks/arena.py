@@ -0,0 +1,264 @@
+# benchmarks/arena.py
+"""
+Đấu hàng loạt AI vs AI không cần pygame, chạy song song trên ProcessPoolExecutor:
+- agent mô tả bằng chuỗi "loại:khoá=giá_trị,...", vd. "minimax:depth=3", "minimax:depth=2,aspiration=0",
+  "mcts:playouts=300" (khoá khớp tham số của MinimaxSearcher / MctsSearcher, depth = depth_limit,
+  book = đường dẫn opening book, heuristic = tên trong core.search.heuristic.HEURISTICS)
+- mỗi cặp ván dùng chung 1 khai cuộc ngẫu nhiên (--opening-moves nước đầu, theo seed) và đổi màu
+  => so sánh công bằng, ván nào cũng tái lập được từ (seed, số thứ tự cặp)
+- thời gian: --clock giây mỗi bên (TimeManager chia giờ, hết giờ = thua) hoặc --move-time mỗi nước
+- kết thúc: 2 PASS / RESIGN / hết giờ / đủ --max-moves nước; chấm diện tích + komi
+Báo cáo: thắng/hoà/thua, tỉ lệ điểm, Elo của A so với B kèm khoảng tin cậy 95%, thời gian trung bình mỗi nước.
+--save-games ghi toàn bộ ván ra file biên bản nhị phân (core/records.py) để phát lại / dựng opening book.
+Chạy (từ thư mục task2_go):
+  python -m benchmarks.arena "minimax:depth=3" "minimax:depth=2" --games 40 --move-time 0.5 [--workers 4] [--json]
+"""
+from __future__ import annotations
+import argparse
+import json
+import math
+import multiprocessing as mp
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, List, Optional, Tuple
+
+from core.board import BLACK, WHITE
+from core.game_state import GameState
+from core.move import Move
+from config.settings import BOARD_SIZE, KOMI
+
+def parse_agent(spec: str) -> Tuple[str, Dict[str, Any]]:
+    """'minimax:depth=3,time=0.5' -> ('minimax', {'depth': 3, 'time': 0.5}); giá trị đọc bằng json nếu được."""
+    kind, _, rest = spec.partition(":")
+    kind = kind.strip().lower()
+    if kind not in ("minimax", "mcts"):
+        raise ValueError(f"Loại agent không hỗ trợ: {kind!r} (minimax | mcts)")
+    params: Dict[str, Any] = {}
+    for item in filter(None, (p.strip() for p in rest.split(","))):
+        key, _, val = item.partition("=")
+        try:
+            params[key.strip()] = json.loads(val.lower() if val.lower() in ("true", "false", "null") else val)
+        except ValueError:
+            params[key.strip()] = val
+    return kind, params
+
+def make_agent(spec: str, color: int, move_time: Optional[float], seed: int):
+    """Agent mới cho 1 ván (searcher không mang bảng chuyển vị / cây sang ván khác)."""
+    kind, params = parse_agent(spec)
+    book = params.pop("book", None)
+    if book:
+        from core.search.opening_book import OpeningBook
+        book = OpeningBook(book)
+    params.setdefault("time_limit_sec", move_time)
+    if "time" in params:
+        params["time_limit_sec"] = params.pop("time")
+    if kind == "minimax":
+        from core.agents.minimax_agent import MinimaxAgent
+        from core.search.minimax import MinimaxSearcher
+        from core.search.heuristic import HEURISTICS
+        if "depth" in params:
+            params["depth_limit"] = params.pop("depth")
+        if "heuristic" in params:
+            params["heuristic"] = HEURISTICS[params["heuristic"]]
+        workers = params.pop("workers", 1)
+        return MinimaxAgent(MinimaxSearcher(**params), player_color=color, workers=workers, book=book)
+    from core.agents.mcts_agent import MctsAgent
+    from core.search.mcts import MctsSearcher
+    params.setdefault("seed", seed)
+    return MctsAgent(MctsSearcher(**params), player_color=color, book=book)
+
+def random_opening(size: int, n_moves: int, seed: int) -> List[Move]:
+    """n_moves nước PLAY hợp lệ ngẫu nhiên (tránh 2 hàng mép để khai cuộc còn bình thường)."""
+    rng = random.Random(seed)
+    state = GameState.new_game(size)
+    moves: List[Move] = []
+    for _ in range(n_moves):
+        cand = [m for m in state.legal_moves() if m.kind == "PLAY"
+                and 1 < m.x < size - 2 and 1 < m.y < size - 2] \
+            or [m for m in state.legal_moves() if m.kind == "PLAY"]
+        if not cand:
+            break
+        mv = rng.choice(cand)
+        moves.append(mv)
+        state = state.apply_move(mv)
+    return moves
+
+def final_score(state: GameState, komi: float) -> float:
+    """Đen - Trắng theo diện tích (Tromp-Taylor), đã trừ komi."""
+    from core.scoring import area_score
+    return area_score(state.board, komi)
+
+def play_game(job: Dict[str, Any]) -> Dict[str, Any]:
+    """1 ván (chạy trong tiến trình worker). job: black/white (spec), opening, clock, move_time, ..."""
+    size, komi = job["size"], job["komi"]
+    agents = {BLACK: make_agent(job["black"], BLACK, job["move_time"], job["seed"]),
+              WHITE: make_agent(job["white"], WHITE, job["move_time"], job["seed"] + 1)}
+    clock = {BLACK: job["clock"], WHITE: job["clock"]}
+    think = {BLACK: 0.0, WHITE: 0.0}
+    n_moves = {BLACK: 0, WHITE: 0}
+    state = GameState.new_game(size)
+    for mv in job["opening"]:
+        state = state.apply_move(Move.play(*mv))
+    winner, reason = None, "score"
+    try:
+        while not state.is_terminal():
+            if len(state.move_history) >= job["max_moves"]:
+                reason = "max_moves"
+                break
+            player = state.to_play
+            agent = agents[player]
+            agent.searcher.clock_remaining = clock[player]
+            t0 = time.perf_counter()
+            mv = agent.select_move(state)
+            dt = time.perf_counter() - t0
+            think[player] += dt
+            n_moves[player] += 1
+            if clock[player] is not None:
+                clock[player] -= dt
+                if clock[player] <= 0:
+                    winner, reason = -player, "time"
+                    break
+            if mv.kind != "RESIGN" and mv not in state.legal_moves():
+                winner, reason = -player, "illegal"
+                break
+            state = state.apply_move(mv)
+            if mv.kind == "RESIGN":
+                winner, reason = -player, "resign"
+    finally:
+        for a in agents.values():
+            if hasattr(a, "close"):
+                a.close()
+    score = None
+    if winner is None:
+        score = final_score(state, komi)
+        winner = BLACK if score > 0 else WHITE if score < 0 else 0
+    a_color = BLACK if job["a_is_black"] else WHITE
+    return {
+        "game": job["game"], "black": job["black"], "white": job["white"], "a_color": a_color,
+        "winner": winner, "reason": reason, "score": score, "moves": len(state.move_history),
+        "think": {str(c): think[c] for c in (BLACK, WHITE)},
+        "n_moves": {str(c): n_moves[c] for c in (BLACK, WHITE)},
+        "record": [[m.kind, m.x, m.y] for m in state.move_history],
+    }
+
+# --- Thống kê ---
+def elo_from_score(p: float) -> float:
+    p = min(max(p, 1e-6), 1 - 1e-6)
+    return -400.0 * math.log10(1.0 / p - 1.0)
+
+def summarize(results: List[Dict[str, Any]], a: str, b: str) -> Dict[str, Any]:
+    """Thắng/hoà/thua của A, Elo(A - B) với khoảng tin cậy 95% (xấp xỉ chuẩn trên điểm từng ván)."""
+    pts: List[float] = []
+    time_used = {a: 0.0, b: 0.0}
+    moves = {a: 0, b: 0}
+    reasons: Dict[str, int] = {}
+    for r in results:
+        pts.append(1.0 if r["winner"] == r["a_color"] else 0.5 if r["winner"] == 0 else 0.0)
+        for c in (BLACK, WHITE):
+            who = a if c == r["a_color"] else b
+            time_used[who] += r["think"][str(c)]
+            moves[who] += r["n_moves"][str(c)]
+        reasons[r["reason"]] = reasons.get(r["reason"], 0) + 1
+    n = len(pts)
+    p = sum(pts) / n if n else 0.5
+    var = sum((x - p) ** 2 for x in pts) / (n - 1) if n > 1 else 0.0
+    half = 1.96 * math.sqrt(var / n) if n else 0.0
+    return {
+        "a": a, "b": b, "games": n,
+        "wins": pts.count(1.0), "draws": pts.count(0.5), "losses": pts.count(0.0),
+        "score": p,
+        "elo": elo_from_score(p),
+        "elo_ci95": [elo_from_score(p - half), elo_from_score(p + half)],
+        "a_wins_as_black": sum(1 for r, x in zip(results, pts) if x == 1.0 and r["a_color"] == BLACK),
+        "avg_move_time": {k: (time_used[k] / moves[k] if moves[k] else 0.0) for k in (a, b)},
+        "avg_game_length": sum(r["moves"] for r in results) / n if n else 0.0,
+        "end_reasons": reasons,
+    }
+
+def make_jobs(a: str, b: str, games: int, seed: int, size: int, opening_moves: int,
+              clock: Optional[float], move_time: Optional[float], max_moves: int, komi: float) -> List[Dict[str, Any]]:
+    """Ván 2k và 2k+1 dùng chung khai cuộc của cặp k, đổi màu A/B."""
+    jobs = []
+    for g in range(games):
+        pair = g // 2
+        opening = random_opening(size, opening_moves, seed + pair)
+        a_black = g % 2 == 0
+        jobs.append({
+            "game": g, "a": a, "a_is_black": a_black,
+            "black": a if a_black else b, "white": b if a_black else a,
+            "opening": [(m.x, m.y) for m in opening], "seed": seed * 1000 + g,
+            "size": size, "komi": komi, "clock": clock, "move_time": move_time, "max_moves": max_moves,
+        })
+    return jobs
+
+def run_match(a: str, b: str, games: int = 20, seed: int = 0, size: int = BOARD_SIZE, opening_moves: int = 2,
+              clock: Optional[float] = None, move_time: Optional[float] = 0.5, max_moves: Optional[int] = None,
+              komi: float = KOMI, workers: Optional[int] = None, progress: bool = False) -> Dict[str, Any]:
+    if a == b:
+        raise ValueError("Hai agent trùng mô tả, thêm tham số để phân biệt (vd. ,seed=1).")
+    parse_agent(a); parse_agent(b)                     # báo lỗi mô tả sớm, trước khi tạo pool
+    max_moves = 2 * size * size if max_moves is None else max_moves
+    jobs = make_jobs(a, b, games, seed, size, opening_moves, clock, move_time, max_moves, komi)
+    workers = max(1, workers or os.cpu_count() or 1)
+    t0 = time.perf_counter()
+    results: List[Dict[str, Any]] = []
+    if workers == 1:
+        for job in jobs:
+            results.append(play_game(job))
+            if progress:
+                print(f"ván {len(results)}/{games}", file=sys.stderr)
+    else:
+        ctx = mp.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+            for fut in as_completed([pool.submit(play_game, j) for j in jobs]):
+                results.append(fut.result())
+                if progress:
+                    print(f"ván {len(results)}/{games}", file=sys.stderr)
+    results.sort(key=lambda r: r["game"])
+    summary = summarize(results, a, b)
+    summary["wall_time"] = time.perf_counter() - t0
+    return {"summary": summary, "games": results}
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Đấu AI vs AI không giao diện, báo cáo tỉ lệ thắng và Elo")
+    ap.add_argument("a", help='agent A, vd. "minimax:depth=3"')
+    ap.add_argument("b", help='agent B, vd. "mcts:playouts=200"')
+    ap.add_argument("--games", type=int, default=20)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--size", type=int, default=BOARD_SIZE)
+    ap.add_argument("--opening-moves", type=int, default=2, help="số nước khai cuộc ngẫu nhiên mỗi cặp ván")
+    ap.add_argument("--clock", type=float, default=None, help="giây mỗi bên cho cả ván (hết giờ = thua)")
+    ap.add_argument("--move-time", type=float, default=0.5, help="timebox mỗi nước khi không dùng --clock")
+    ap.add_argument("--max-moves", type=int, default=None, help="mặc định 2*size^2")
+    ap.add_argument("--komi", type=float, default=KOMI)
+    ap.add_argument("--workers", type=int, default=None, help="số tiến trình (mặc định số CPU)")
+    ap.add_argument("--json", action="store_true", help="in kết quả (kèm từng ván) dạng JSON")
+    ap.add_argument("--save-games", help="ghi các ván ra file biên bản .gor")
+    args = ap.parse_args(argv)
+
+    out = run_match(args.a, args.b, args.games, args.seed, args.size, args.opening_moves, args.clock,
+                    args.move_time, args.max_moves, args.komi, args.workers, progress=not args.json)
+    if args.save_games:
+        from core.records import GameRecord, write_records
+        write_records(args.save_games, (GameRecord(args.size, [Move(*m) for m in g["record"]], args.komi, g["winner"])
+                                        for g in out["games"]))
+    if args.json:
+        print(json.dumps(out, indent=2))
+        return 0
+    s = out["summary"]
+    lo, hi = s["elo_ci95"]
+    print(f"A = {s['a']}\nB = {s['b']}")
+    print(f"{s['games']} ván: A thắng {s['wins']}, hoà {s['draws']}, thua {s['losses']} "
+          f"(điểm {s['score']:.3f}, A cầm Đen thắng {s['a_wins_as_black']})")
+    print(f"Elo(A - B) = {s['elo']:+.0f}  [95%: {lo:+.0f} .. {hi:+.0f}]")
+    for k, v in s["avg_move_time"].items():
+        print(f"thời gian TB mỗi nước {k}: {v * 1000:.1f} ms")
+    print(f"độ dài ván TB {s['avg_game_length']:.1f} nước; kết thúc: {s['end_reasons']}; "
+          f"tổng {s['wall_time']:.1f}s")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,146 @@
+# benchmarks/batch_playout.py
+"""
+Kiểm tra + đo BatchPlayout (core/search/batch_playout.py) so với Rules:
+- check: chạy N ván ngẫu nhiên bằng BatchPlayout, đồng thời đi lại từng nước qua Rules.play_move
+  (simple-ko theo last_hash) trên N Board riêng; mỗi bước so mặt nạ nước hợp lệ và bàn cờ sau khi đi.
+  Lệch bất kỳ => in chi tiết và exit 1.
+- from_state: thế lấy từ các ván ngẫu nhiên qua GameState (mỗi luật ko, có PASS và ko xen kẽ);
+  mặt nạ nước đầu của BatchPlayout.from_state phải trùng GameState.legal_mask.
+- speed: số nước / giây của BatchPlayout.run so với vòng Python Rules.legal_mask + play_move.
+Chạy (từ thư mục task2_go):  python -m benchmarks.batch_playout [--size 9] [--games 64] [--seed 1]
+"""
+from __future__ import annotations
+import argparse
+import json
+import random
+import sys
+import time
+from typing import Any, Dict, List
+
+import numpy as np
+
+from core.board import BLACK, new_board
+from core.game_state import GameState
+from core.move import Move
+from core.rules import KO_RULES, Rules
+from core.search.batch_playout import BatchPlayout, PASS
+
+def check(size: int, games: int, seed: int, max_moves: int) -> Dict[str, Any]:
+    """Đi song song BatchPlayout và Rules; trả về số bước / nước đã so và danh sách chỗ lệch."""
+    rules = Rules()
+    sim = BatchPlayout(np.zeros((games, size, size), dtype=np.int8), BLACK, seed=seed)
+    boards = [new_board(size) for _ in range(games)]
+    players = [BLACK] * games
+    hists: List[List[int]] = [[b.hash_key(BLACK)] for b in boards]
+    errors: List[str] = []
+    steps = moves = 0
+    while not sim.done.all() and steps < max_moves and not errors:
+        live = ~sim.done
+        mask = sim.legal_mask()
+        for i in np.flatnonzero(live).tolist():
+            h = hists[i]
+            ref = rules.legal_mask(boards[i], players[i], last_hash=h[-2] if len(h) >= 2 else None)
+            if not np.array_equal(ref, mask[i]):
+                diff = [(int(x), int(y)) for y, x in zip(*np.nonzero(ref != mask[i]))]
+                errors.append(f"ván {i} bước {steps}: mặt nạ hợp lệ lệch tại {diff}")
+        played = sim.step()
+        for i in np.flatnonzero(live).tolist():
+            mv = int(played[i])
+            if mv != PASS:
+                y, x = divmod(mv, size)
+                rules.play_move(boards[i], players[i], x, y)
+                moves += 1
+            players[i] = -players[i]
+            hists[i].append(boards[i].hash_key(players[i]))
+            if not np.array_equal(np.asarray(boards[i].grid), sim.grids[i]):
+                errors.append(f"ván {i} bước {steps}: bàn cờ lệch sau nước {mv}")
+        steps += 1
+    return {"games": games, "steps": steps, "moves": moves, "errors": errors}
+
+def check_from_state(size: int, games: int, seed: int) -> Dict[str, Any]:
+    """So mặt nạ nước đầu của BatchPlayout.from_state với GameState.legal_mask dọc các ván ngẫu nhiên."""
+    rng = random.Random(seed)
+    errors: List[str] = []
+    states = 0
+    for rule in KO_RULES:
+        for g in range(games):
+            s = GameState.new_game(size, ko_rule=rule)
+            for _ in range(2 * size * size):
+                sim = BatchPlayout.from_state(s, 1)
+                ref = s.legal_mask()
+                if not np.array_equal(ref, sim.legal_mask()[0]):
+                    diff = [(int(x), int(y)) for y, x in zip(*np.nonzero(ref != sim.legal_mask()[0]))]
+                    errors.append(f"{rule} ván {g} nước {len(s.move_history)}: mặt nạ lệch tại {diff}")
+                states += 1
+                plays = [m for m in s.legal_moves() if m.kind == "PLAY"]
+                last_pass = bool(s.move_history) and s.move_history[-1].kind == "PASS"
+                # thỉnh thoảng PASS (không kết thúc ván) để thử thế sau PASS
+                if not plays or (not last_pass and rng.random() < 0.05):
+                    s = s.apply_move(Move.pass_())
+                else:
+                    s = s.apply_move(rng.choice(plays))
+                if s.is_terminal():
+                    break
+    return {"states": states, "errors": errors}
+
+def speed(size: int, games: int, seed: int) -> Dict[str, Any]:
+    t0 = time.perf_counter()
+    sim = BatchPlayout(np.zeros((games, size, size), dtype=np.int8), BLACK, seed=seed, record=True)
+    sim.run()
+    dt_batch = time.perf_counter() - t0
+    n_batch = int(sum((np.asarray(m) >= 0).sum() for m in sim.history))
+
+    rng = random.Random(seed)
+    rules = Rules()
+    n_rules = 0
+    t0 = time.perf_counter()
+    for _ in range(games):
+        b = new_board(size)
+        player = BLACK
+        hist = [b.hash_key(player)]
+        for _ in range(3 * size * size):
+            ys, xs = np.nonzero(rules.legal_mask(b, player, last_hash=hist[-2] if len(hist) >= 2 else None))
+            if len(xs) == 0:
+                break
+            i = rng.randrange(len(xs))
+            rules.play_move(b, player, int(xs[i]), int(ys[i]))
+            player = -player
+            hist.append(b.hash_key(player))
+            n_rules += 1
+    dt_rules = time.perf_counter() - t0
+    return {"batch": {"moves": n_batch, "sec": dt_batch, "moves_per_sec": n_batch / dt_batch},
+            "rules": {"moves": n_rules, "sec": dt_rules, "moves_per_sec": n_rules / dt_rules}}
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Kiểm tra + benchmark BatchPlayout so với Rules")
+    ap.add_argument("--size", type=int, default=9)
+    ap.add_argument("--games", type=int, default=64)
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--max-moves", type=int, default=None, help="số bước tối đa khi kiểm tra (mặc định 3*size^2)")
+    ap.add_argument("--no-speed", action="store_true", help="chỉ kiểm tra, không đo tốc độ")
+    ap.add_argument("--json", action="store_true", help="in kết quả dạng JSON")
+    args = ap.parse_args(argv)
+
+    max_moves = args.max_moves or 3 * args.size * args.size
+    results: Dict[str, Any] = {"size": args.size, "check": check(args.size, args.games, args.seed, max_moves),
+                               "from_state": check_from_state(args.size, max(1, args.games // 8), args.seed)}
+    if not args.no_speed:
+        results["speed"] = speed(args.size, args.games, args.seed)
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        c = results["check"]
+        print(f"check  {c['games']} ván {args.size}x{args.size}: {c['steps']} bước, {c['moves']} nước, "
+              f"{len(c['errors'])} lệch")
+        for e in c["errors"][:20]:
+            print(f"  [MISMATCH] {e}")
+        f = results["from_state"]
+        print(f"from_state {f['states']} thế ({', '.join(KO_RULES)}): {len(f['errors'])} lệch")
+        for e in f["errors"][:20]:
+            print(f"  [MISMATCH] {e}")
+        for name, r in results.get("speed", {}).items():
+            print(f"speed  {name:<6} {r['moves']:>7} nước {r['sec']:>8.3f}s {r['moves_per_sec']:>10.0f} nước/s")
+    return 1 if results["check"]["errors"] or results["from_state"]["errors"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
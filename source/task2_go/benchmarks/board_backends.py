@@ -0,0 +1,107 @@
+# benchmarks/board_backends.py
+"""
+So sánh hai backend bàn cờ (Board NumPy vs BitBoard) trên các đường nóng:
+ván ngẫu nhiên qua Rules (legal_mask + play_move), heuristic_score, search độ sâu cố định.
+Chạy (từ thư mục task2_go):  python -m benchmarks.board_backends [--size 9] [--games 20]
+"""
+from __future__ import annotations
+import argparse
+import json
+import random
+import time
+from typing import Dict, List
+
+import numpy as np
+
+from core.board import new_board
+from core.game_state import GameState
+from core.move import Move
+from core.rules import Rules
+from core.search.heuristic import heuristic_score
+from core.search.minimax import MinimaxSearcher
+
+BACKENDS = ("numpy", "bitboard")
+
+def _random_games(backend: str, size: int, games: int, seed: int) -> Dict[str, float]:
+    rng = random.Random(seed)
+    rules = Rules()
+    moves = 0
+    t0 = time.perf_counter()
+    for _ in range(games):
+        b = new_board(size, backend)
+        player = 1
+        hist = [b.hash_key(player)]
+        for _ in range(size * size * 2):
+            mask = rules.legal_mask(b, player, last_hash=hist[-2] if len(hist) >= 2 else None)
+            ys, xs = np.nonzero(mask)
+            if len(xs) == 0:
+                break
+            i = rng.randrange(len(xs))
+            rules.play_move(b, player, int(xs[i]), int(ys[i]))
+            player = -player
+            hist.append(b.hash_key(player))
+            moves += 1
+    dt = time.perf_counter() - t0
+    return {"moves": moves, "sec": dt, "moves_per_sec": moves / dt}
+
+def _positions(backend: str, size: int, count: int, seed: int) -> List[GameState]:
+    rng = random.Random(seed)
+    out = []
+    s = GameState.new_game(size, backend)
+    while len(out) < count:
+        play = [m for m in s.legal_moves() if m.kind == "PLAY"]
+        if not play or len(s.move_history) > size * size:
+            s = GameState.new_game(size, backend)
+            continue
+        s = s.apply_move(rng.choice(play))
+        if len(s.move_history) % 7 == 0:
+            out.append(s)
+    return out
+
+def _heuristic(backend: str, size: int, seed: int) -> Dict[str, float]:
+    states = _positions(backend, size, 200, seed)
+    t0 = time.perf_counter()
+    for s in states:
+        heuristic_score(s, 1)
+    dt = time.perf_counter() - t0
+    return {"evals": len(states), "sec": dt, "evals_per_sec": len(states) / dt}
+
+def _search(backend: str, size: int, depth: int) -> Dict[str, float]:
+    s = GameState.new_game(size, backend)
+    c = size // 2
+    for x, y in [(c-2, c-2), (c+2, c+2), (c-2, c+2), (c+2, c-2), (c, c), (c-1, c-1)]:
+        s = s.apply_move(Move.play(x, y))
+    ms = MinimaxSearcher(depth_limit=depth, time_limit_sec=None)
+    t0 = time.perf_counter()
+    mv = ms.search(s, s.to_play)
+    dt = time.perf_counter() - t0
+    return {"depth": depth, "nodes": ms._nodes, "sec": dt, "move": [mv.kind, mv.x, mv.y]}
+
+def main(argv=None) -> None:
+    ap = argparse.ArgumentParser(description="Benchmark Board (NumPy) vs BitBoard")
+    ap.add_argument("--size", type=int, default=9)
+    ap.add_argument("--games", type=int, default=20)
+    ap.add_argument("--depth", type=int, default=2)
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--json", action="store_true", help="in kết quả dạng JSON")
+    args = ap.parse_args(argv)
+
+    results = {}
+    for backend in BACKENDS:
+        results[backend] = {
+            "random_games": _random_games(backend, args.size, args.games, args.seed),
+            "heuristic": _heuristic(backend, args.size, args.seed),
+            "search": _search(backend, args.size, args.depth),
+        }
+    if args.json:
+        print(json.dumps({"size": args.size, "results": results}, indent=2))
+        return
+    print(f"Board {args.size}x{args.size}")
+    print(f"{'backend':<10}{'moves/s':>12}{'evals/s':>12}{'search s':>12}{'nodes':>8}")
+    for backend, r in results.items():
+        print(f"{backend:<10}{r['random_games']['moves_per_sec']:>12.0f}"
+              f"{r['heuristic']['evals_per_sec']:>12.0f}"
+              f"{r['search']['sec']:>12.3f}{r['search']['nodes']:>8}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,290 @@
+# benchmarks/suite.py
+"""
+Bộ benchmark cho lõi cờ vây (không cần pygame), trên một tập thế cờ cố định:
+- perft: đếm số lá của cây nước hợp lệ tới độ sâu d (PLAY + PASS, bỏ RESIGN) - vừa đo tốc độ
+  make/unmake + sinh nước, vừa là kiểm tra đúng luật (số đếm phải khớp baseline tuyệt đối)
+- throughput: legal_moves (không cache), apply_move, heuristic_score (lần gọi / giây)
+- search: MinimaxSearcher độ sâu cố định (thời gian, node, lá, nước chọn)
+Kết quả dạng JSON; so với baseline đã lưu (thời gian: ngưỡng --tolerance, số đếm perft: phải khớp).
+Baseline ghi kèm chế độ chạy (meta.mode: quick, độ sâu, số lần lặp, repeat); chỉ so khi chế độ trùng.
+Chạy (từ thư mục task2_go):
+  python -m benchmarks.suite [--quick] [--json] [--out kq.json]
+  python -m benchmarks.suite --baseline benchmarks/baseline.json     # so sánh, exit 1 nếu tệ đi
+  python -m benchmarks.suite --save-baseline benchmarks/baseline.json
+"""
+from __future__ import annotations
+import argparse
+import json
+import platform
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from core.board import BLACK, WHITE, new_board
+from core.game_state import GameState
+from core.move import Move
+from core.search.heuristic import heuristic_score
+from core.search.minimax import MinimaxSearcher
+from core.search.position import SearchPosition
+
+# --- Thế cờ cố định: sơ đồ (X = Đen, O = Trắng, . = trống), bên đi, các nước đi thêm sau sơ đồ ---
+POSITIONS: Dict[str, Tuple[str, int, List[Tuple[int, int]]]] = {
+    "empty": ("""
+.........
+.........
+.........
+.........
+.........
+.........
+.........
+.........
+.........""", BLACK, []),
+    "opening": ("""
+.........
+.........
+..X...O..
+.........
+....X....
+.........
+..O...X..
+.........
+.........""", WHITE, []),
+    "fight": ("""
+.........
+..OX.....
+.OXXO.O..
+..OX.X...
+..OXX.X..
+...OOX...
+.....OX..
+.........
+.........""", BLACK, []),
+    # Trắng đi (3,4) bắt quân Đen ở (4,4) -> Đen không được bắt lại ngay ở (4,4)
+    "ko": ("""
+.........
+.........
+.........
+...XO....
+..X.XO...
+...XO....
+.........
+.........
+.........""", WHITE, [(3, 4)]),
+    "endgame": ("""
+.XOO.O.O.
+XXXOOOOO.
+.X.XXXOO.
+XXXX.XXOO
+.X.XXXOOO
+XXX.XO.O.
+XOOXXOOOO
+OO.OXXXO.
+.OOOX.XXO""", BLACK, []),
+}
+
+def load_position(name: str) -> GameState:
+    diagram, to_play, moves = POSITIONS[name]
+    rows = [r.strip() for r in diagram.strip().splitlines()]
+    b = new_board(len(rows))
+    for y, row in enumerate(rows):
+        for x, ch in enumerate(row):
+            if ch in "XO":
+                b.place_stone(BLACK if ch == "X" else WHITE, x, y)
+    s = GameState(board=b, to_play=to_play, move_history=[], hash_history=[b.hash_key(to_play)])
+    for x, y in moves:
+        s = s.apply_move(Move.play(x, y))
+    return s
+
+# --- perft ---
+def perft(pos: SearchPosition, depth: int) -> int:
+    """Số lá của cây nước hợp lệ độ sâu `depth` (tầng cuối đếm gộp, không make)."""
+    if pos.is_terminal():
+        return 1
+    moves = [m for m in pos.legal_moves() if m.kind != "RESIGN"]
+    if depth == 1:
+        return len(moves)
+    total = 0
+    for mv in moves:
+        pos.make_move(mv)
+        total += perft(pos, depth - 1)
+        pos.unmake_move()
+    return total
+
+def _best_of(fn: Callable[[], Any], repeat: int) -> Tuple[float, Any]:
+    best, out = float("inf"), None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, out
+
+def bench_perft(names: List[str], depth: int, repeat: int) -> Dict[str, Any]:
+    out = {}
+    for name in names:
+        state = load_position(name)
+        sec, count = _best_of(lambda: perft(SearchPosition.from_state(state), depth), repeat)
+        out[name] = {"depth": depth, "count": count, "sec": sec, "leaves_per_sec": count / sec}
+    return out
+
+def bench_throughput(names: List[str], iters: int, repeat: int) -> Dict[str, Any]:
+    out: Dict[str, Any] = {"legal_moves": {}, "apply_move": {}, "heuristic_score": {}}
+    for name in names:
+        s = load_position(name)
+
+        def legal():
+            # GameState mới mỗi lần -> không dùng lại cache nước hợp lệ
+            for _ in range(iters):
+                GameState(board=s.board, to_play=s.to_play, move_history=s.move_history, ko_rule=s.ko_rule,
+                          hash_history=s.hash_history).legal_moves()
+            return iters
+        plays = [m for m in s.legal_moves() if m.kind == "PLAY"] or [Move.pass_()]
+
+        def apply():
+            n = 0
+            while n < iters:
+                for mv in plays:
+                    s.apply_move(mv); n += 1
+            return n
+
+        def heur():
+            for _ in range(iters):
+                heuristic_score(s, BLACK)
+            return iters
+        for key, fn in (("legal_moves", legal), ("apply_move", apply), ("heuristic_score", heur)):
+            sec, n = _best_of(fn, repeat)
+            out[key][name] = {"calls": n, "sec": sec, "calls_per_sec": n / sec}
+    return out
+
+def bench_search(names: List[str], depth: int, repeat: int) -> Dict[str, Any]:
+    out = {}
+    for name in names:
+        s = load_position(name)
+
+        def run():
+            # searcher mới mỗi lần -> bảng chuyển vị / history không mang sang lần đo sau
+            ms = MinimaxSearcher(depth_limit=depth, time_limit_sec=None)
+            mv = ms.search(s, s.to_play)
+            return ms, mv
+        sec, (ms, mv) = _best_of(run, repeat)
+        st = ms.last_stats
+        out[name] = {"depth": depth, "sec": sec, "nodes": st.nodes, "leaves": st.leaves,
+                     "move": [mv.kind, mv.x, mv.y], "score": st.score}
+    return out
+
+def run_suite(quick: bool = False, perft_depth: Optional[int] = None, search_depth: Optional[int] = None,
+              repeat: Optional[int] = None) -> Dict[str, Any]:
+    names = list(POSITIONS)
+    mode = {"quick": quick, "perft_depth": perft_depth or (2 if quick else 3),
+            "search_depth": search_depth or (2 if quick else 3), "iters": 50 if quick else 300,
+            "repeat": repeat or (1 if quick else 3)}
+    return {
+        "meta": {"python": platform.python_version(), "machine": platform.machine(),
+                 "quick": quick, "repeat": mode["repeat"], "mode": mode},
+        "perft": bench_perft(names, mode["perft_depth"], mode["repeat"]),
+        "throughput": bench_throughput(names, mode["iters"], mode["repeat"]),
+        "search": bench_search(names, mode["search_depth"], mode["repeat"]),
+    }
+
+# --- So sánh với baseline ---
+def _flatten(results: Dict[str, Any]) -> Dict[str, Tuple[str, float]]:
+    """{tên chỉ số: (loại, giá trị)}; loại: 'exact' (phải khớp), 'time' (thấp hơn là tốt),
+    'rate' (cao hơn là tốt), 'info' (chỉ báo thay đổi)."""
+    flat: Dict[str, Tuple[str, float]] = {}
+    for name, r in results.get("perft", {}).items():
+        flat[f"perft/{name}/d{r['depth']}/count"] = ("exact", r["count"])
+        flat[f"perft/{name}/d{r['depth']}/leaves_per_sec"] = ("rate", r["leaves_per_sec"])
+    for op, by_pos in results.get("throughput", {}).items():
+        for name, r in by_pos.items():
+            flat[f"throughput/{op}/{name}/calls_per_sec"] = ("rate", r["calls_per_sec"])
+    for name, r in results.get("search", {}).items():
+        flat[f"search/{name}/d{r['depth']}/sec"] = ("time", r["sec"])
+        flat[f"search/{name}/d{r['depth']}/nodes"] = ("info", r["nodes"])
+    return flat
+
+def mode_mismatch(current: Dict[str, Any], baseline: Dict[str, Any]) -> Optional[str]:
+    """Lý do không so được 2 lần chạy (khác chế độ / baseline cũ không ghi chế độ), None nếu so được."""
+    a, b = current.get("meta", {}).get("mode"), baseline.get("meta", {}).get("mode")
+    if b is None:
+        return "baseline không ghi chế độ chạy (meta.mode) -> lưu lại bằng --save-baseline"
+    if a != b:
+        diff = ", ".join(f"{k}: {b.get(k)} -> {a.get(k)}" for k in sorted(a.keys() | b.keys()) if a.get(k) != b.get(k))
+        return f"chế độ chạy khác baseline ({diff})"
+    return None
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[Dict[str, Any]]:
+    """Từng chỉ số chung của 2 lần chạy: status OK / FASTER / SLOWER / CHANGED / MISMATCH.
+    Hai lần chạy khác chế độ (xem mode_mismatch) => ValueError."""
+    reason = mode_mismatch(current, baseline)
+    if reason:
+        raise ValueError(reason)
+    cur, base = _flatten(current), _flatten(baseline)
+    rows = []
+    for key in sorted(cur.keys() & base.keys()):
+        kind, v = cur[key]
+        b = base[key][1]
+        ratio = v / b if b else None
+        if kind == "exact":
+            status = "OK" if v == b else "MISMATCH"
+        elif kind == "info":
+            status = "OK" if v == b else "CHANGED"
+        else:
+            # với 'time' giá trị tăng là chậm đi, với 'rate' giá trị giảm là chậm đi
+            speed = (1 / ratio if kind == "time" else ratio) if ratio else 1.0
+            status = "SLOWER" if speed < 1 - tolerance else "FASTER" if speed > 1 + tolerance else "OK"
+        rows.append({"metric": key, "baseline": b, "current": v,
+                     "ratio": None if ratio is None else round(ratio, 3), "status": status})
+    return rows
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Benchmark lõi cờ vây: perft, throughput, search độ sâu cố định")
+    ap.add_argument("--quick", action="store_true", help="chạy nhanh (độ sâu / số lần lặp nhỏ)")
+    ap.add_argument("--perft-depth", type=int, default=None)
+    ap.add_argument("--search-depth", type=int, default=None)
+    ap.add_argument("--repeat", type=int, default=None, help="số lần đo, lấy lần nhanh nhất")
+    ap.add_argument("--json", action="store_true", help="in kết quả dạng JSON")
+    ap.add_argument("--out", help="ghi kết quả JSON ra file")
+    ap.add_argument("--baseline", help="file JSON baseline để so sánh")
+    ap.add_argument("--save-baseline", help="ghi kết quả thành baseline mới")
+    ap.add_argument("--tolerance", type=float, default=0.15, help="ngưỡng chậm đi/nhanh lên tương đối")
+    args = ap.parse_args(argv)
+
+    results = run_suite(args.quick, args.perft_depth, args.search_depth, args.repeat)
+    for path in (args.out, args.save_baseline):
+        if path:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(results, f, indent=2)
+
+    rows, skipped = [], None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        try:
+            rows = compare(results, baseline, args.tolerance)
+            results["comparison"] = rows
+        except ValueError as e:
+            skipped = f"không so với {args.baseline}: {e}"
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for name, r in results["perft"].items():
+            print(f"perft  {name:<8} d{r['depth']} {r['count']:>9} lá  {r['leaves_per_sec']:>10.0f} lá/s")
+        for op, by_pos in results["throughput"].items():
+            for name, r in by_pos.items():
+                print(f"{op:<16} {name:<8} {r['calls_per_sec']:>10.0f} lần/s")
+        for name, r in results["search"].items():
+            print(f"search {name:<8} d{r['depth']} {r['sec']:>8.3f}s {r['nodes']:>7} node {r['leaves']:>7} lá")
+        for row in rows:
+            if row["status"] != "OK":
+                print(f"[{row['status']}] {row['metric']}: {row['baseline']} -> {row['current']} (x{row['ratio']})")
+        if args.baseline and not skipped:
+            print(f"so với baseline: {sum(r['status'] == 'OK' for r in rows)}/{len(rows)} chỉ số OK")
+    if skipped:
+        # khác chế độ chạy: số liệu không so được -> exit code 2 (khác với tệ đi = 1)
+        print(skipped, file=sys.stderr)
+        return 2
+    # số đếm perft lệch (sai luật) hoặc chậm đi quá ngưỡng -> exit code 1
+    return 1 if any(r["status"] in ("MISMATCH", "SLOWER") for r in rows) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,10 +1,35 @@
 # config/settings.py
 BOARD_SIZE = 9
+# Các kích thước bàn engine + UI hỗ trợ (bảng chỉ số dựng sẵn theo từng cỡ, core/board.py: Geometry)
+BOARD_SIZES = (9, 13, 19)
+# Cài đặt bàn cờ: "numpy" (Board, bảng nhóm cập nhật dần) hoặc "bitboard" (BitBoard, bitmask)
+BOARD_BACKEND = "numpy"
 DEFAULT_AI_DEPTH = 2
 
 # Thời gian cho AI suy nghĩ mỗi nước (timebox cho MinimaxSearcher)
 TIMEBOX_SEC = 2.0
 USE_ALPHA_BETA = True
+# Số lần gọi kiểm tra giờ giữa 2 lần đọc đồng hồ thật trong search (mỗi node tốn ~0.1-0.3 ms)
+TIME_CHECK_NODES = 32
+# File JSONL nhận số liệu của mỗi lần search (None => không ghi)
+SEARCH_STATS_FILE = None
+# Bộ nhớ cho bảng chuyển vị của MinimaxSearcher (MB); 0 => tắt
+TT_SIZE_MB = 16
+# Số tiến trình tìm kiếm song song ở gốc cho AI (1 = chạy đơn luồng như cũ)
+SEARCH_WORKERS = 1
+# Chấm tầng lá theo lô (heuristic_score_batch) thay vì từng con một
+BATCH_LEAF_EVAL = False
+# Điểm bù cho Trắng khi chấm diện tích (playout MCTS)
+KOMI = 6.5
+# Luật ko: "simple" (cấm bắt lại ngay), "positional" / "situational" superko (cấm lặp mọi thế đã có;
+# positional đi cùng cách đếm Tromp-Taylor)
+KO_RULE = "positional"
+# Nửa độ rộng cửa sổ aspiration quanh điểm của vòng trước (0 => luôn cửa sổ đầy đủ)
+ASPIRATION_WINDOW = 1.0
+# Đọc thang khi sắp xếp nước đi của MinimaxSearcher (core/search/ladder.py)
+LADDER_READING = True
+# File opening book (core/search/opening_book.py) agent tra trước khi search (None => không dùng)
+OPENING_BOOK_FILE = None
 
 # --- Đồng hồ ván (UI) ---
 # Tổng thời gian cho mỗi bên (giây). Ví dụ: 300 = 5 phút
@@ -0,0 +1,108 @@
+
+from __future__ import annotations
+import threading
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor
+from typing import Optional
+from core.move import Move
+
+class BackgroundAgent:
+    """
+    Chạy select_move của agent AI (có .searcher) trong 1 thread nền để vòng lặp UI không bị đứng.
+    - request(state, clock): yêu cầu nước cho `state` khi đồng hồ bên đi còn `clock` giây
+      (gọi mỗi khung hình được, mỗi trạng thái chỉ chạy 1 lần)
+    - poll(): nước đi nếu đã tìm xong, chưa xong thì None
+    - ponder(state): ngay sau nước của AI, tìm trước cho trạng thái sau nước trả lời được dự đoán
+      (searcher.pondering: không giới hạn thời gian). Đối thủ đi đúng dự đoán => giữ search đang chạy,
+      searcher.ponderhit() chia giờ như bình thường từ lúc đó; đi khác => dừng ponder, tìm lại từ đầu.
+    Dùng thread (không phải process) để searcher giữ bảng chuyển vị / cây MCTS giữa các nước.
+    """
+    def __init__(self, agent):
+        self.agent = agent
+        self.searcher = agent.searcher
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ai")
+        self._lock = threading.Lock()
+        self._future: Optional[Future] = None
+        self._target = None            # trạng thái mà _future đang tìm nước cho
+        self._pondering = False
+        self._gen = 0                  # tăng mỗi lần huỷ -> job cũ còn xếp hàng tự bỏ
+        self._clock: Optional[float] = None
+        self._started = False
+        self.predicted: Optional[Move] = None   # nước trả lời đang ponder
+        self.ponder_hits = 0
+        self.ponder_misses = 0
+
+    def _job(self, state, gen: int) -> Optional[Move]:
+        with self._lock:
+            if gen != self._gen:
+                return None
+            self.searcher.stop_event.clear()
+            self.searcher.pondering = self._pondering
+            self.searcher.clock_remaining = self._clock
+            self._started = True
+        return self.agent.select_move(state)
+
+    def _start(self, state, pondering: bool, clock: Optional[float] = None) -> None:
+        with self._lock:
+            self._pondering = pondering
+            self._target = state
+            self._clock = clock
+            self._started = False
+            self._future = self._pool.submit(self._job, state, self._gen)
+
+    def cancel(self) -> None:
+        """Dừng / bỏ search đang chạy (kể cả ponder)."""
+        with self._lock:
+            self._gen += 1
+            if self._future is not None and not self._future.done():
+                if not self._future.cancel():
+                    self.searcher.stop()
+            self._future = None
+            self._target = None
+            self._pondering = False
+
+    def request(self, state, clock: Optional[float] = None) -> None:
+        if state is self._target:
+            return
+        t = self._target
+        if self._pondering and t is not None and t.hash_history == state.hash_history \
+                and t.move_history == state.move_history:
+            # đoán trúng: search đang chạy chính là search cần; tính giờ từ bây giờ
+            with self._lock:
+                self._pondering = False
+                self._target = state
+                self._clock = clock
+                if self._started:
+                    self.searcher.ponderhit(clock)
+            self.ponder_hits += 1
+            return
+        if self._pondering:
+            self.ponder_misses += 1
+        self.cancel()
+        self._start(state, pondering=False, clock=clock)
+
+    def poll(self) -> Optional[Move]:
+        fut = self._future
+        if fut is None or self._pondering or not fut.done():
+            return None
+        self._future = None
+        try:
+            return fut.result()
+        except CancelledError:
+            return None
+
+    def ponder(self, state) -> None:
+        """`state`: trạng thái ngay sau nước của AI (tới lượt đối thủ)."""
+        self.predicted = None
+        pred = self.agent.ponder_move() if hasattr(self.agent, "ponder_move") else None
+        if pred is None or pred.kind == "RESIGN" or pred not in state.legal_moves():
+            return
+        nxt = state.apply_move(pred)
+        if nxt.is_terminal():
+            return
+        self.cancel()
+        self.predicted = pred
+        self._start(nxt, pondering=True)
+
+    def close(self) -> None:
+        self.cancel()
+        self._pool.shutdown(wait=False, cancel_futures=True)
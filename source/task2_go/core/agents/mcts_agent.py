@@ -0,0 +1,23 @@
+
+from __future__ import annotations
+from typing import Optional
+from .base_agent import BaseAgent
+from core.search.mcts import MctsSearcher
+from core.search.opening_book import OpeningBook, load_book
+
+class MctsAgent(BaseAgent):
+    def __init__(self, searcher: MctsSearcher, player_color:int, book: Optional[OpeningBook]=None):
+        # searcher giữ cây giữa các nước -> mỗi agent một searcher riêng
+        self.searcher=searcher; self.player_color=player_color
+        # opening book tra trước khi search (mặc định theo OPENING_BOOK_FILE)
+        self.book = book if book is not None else load_book()
+        self._book_move = False
+    def select_move(self, state):
+        mv = self.book.choose(state) if self.book is not None else None
+        self._book_move = mv is not None
+        return mv if mv is not None else self.searcher.search(state, self.player_color)
+    def ponder_move(self):
+        # nước trả lời đối thủ được dự đoán sau lần search gần nhất (None nếu không rõ / vừa đi theo book)
+        return None if self._book_move else self.searcher.ponder_move()
+    def stop(self):
+        self.searcher.stop()
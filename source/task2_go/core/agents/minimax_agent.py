@@ -1,10 +1,28 @@
 
 from __future__ import annotations
+from typing import Optional
 from .base_agent import BaseAgent
 from core.search.minimax import MinimaxSearcher
+from core.search.opening_book import OpeningBook, load_book
 
 class MinimaxAgent(BaseAgent):
-    def __init__(self, searcher: MinimaxSearcher, player_color:int):
+    def __init__(self, searcher: MinimaxSearcher, player_color:int, workers: Optional[int]=None,
+                 book: Optional[OpeningBook]=None):
         self.searcher=searcher; self.player_color=player_color
+        # opening book tra trước khi search (mặc định theo OPENING_BOOK_FILE)
+        self.book = book if book is not None else load_book()
+        self._book_move = False
+        # số tiến trình tìm song song ở gốc; None => giữ theo searcher (MinimaxSearcher(workers=...))
+        if workers is not None:
+            self.searcher.workers = max(1, workers)
     def select_move(self, state):
-        return self.searcher.search(state, self.player_color)
+        mv = self.book.choose(state) if self.book is not None else None
+        self._book_move = mv is not None
+        return mv if mv is not None else self.searcher.search(state, self.player_color)
+    def ponder_move(self):
+        # nước trả lời đối thủ được dự đoán sau lần search gần nhất (None nếu không rõ / vừa đi theo book)
+        return None if self._book_move else self.searcher.ponder_move()
+    def stop(self):
+        self.searcher.stop()
+    def close(self):
+        self.searcher.close()
@@ -0,0 +1,214 @@
+
+from __future__ import annotations
+from typing import Dict, List, Optional, Set, Tuple
+import numpy as np
+from .board import EMPTY, BLACK, WHITE, geometry
+from .zobrist import stone_keys, side_key
+
+# Mặt nạ nền theo kích thước: (ON = mọi điểm trên bàn, stride hàng = size + 1)
+_MASKS: Dict[int, int] = {}
+
+def _on_mask(size: int) -> int:
+    on = _MASKS.get(size)
+    if on is None:
+        row = (1 << size) - 1
+        stride = size + 1
+        on = 0
+        for y in range(size):
+            on |= row << (y * stride)
+        _MASKS[size] = on
+    return on
+
+
+class BitBoard:
+    """
+    Bàn cờ lưu bằng bitmask số nguyên Python (mỗi màu 1 số), hàng có thêm 1 cột đệm
+    (stride = size + 1) nên dịch trái/phải không tràn sang hàng khác.
+    Láng giềng, loang nhóm, đếm liberties, phát hiện bắt quân = dịch bit + AND.
+    Cùng giao diện với Board (get/place_stone/remove_stone/truy vấn nhóm/hash_key/grid).
+    """
+    def __init__(self, size: int = 9):
+        self.size = size
+        self._stride = size + 1
+        self._on = _on_mask(size)
+        self._bits = {BLACK: 0, WHITE: 0}
+        self._zkeys = stone_keys(size)
+        self._geo = geometry(size)
+        self._hash = 0
+        self._grid: Optional[np.ndarray] = None
+
+    # --- chuyển chỉ số ---
+    def _bit(self, x: int, y: int) -> int:
+        return 1 << (y * self._stride + x)
+
+    def _coords(self, mask: int) -> List[Tuple[int,int]]:
+        out = []
+        s = self._stride
+        while mask:
+            low = mask & -mask
+            y, x = divmod(low.bit_length() - 1, s)
+            out.append((x, y))
+            mask ^= low
+        return out
+
+    # --- phép toán bit ---
+    def _dilate(self, m: int) -> int:
+        s = self._stride
+        return ((m << 1) | (m >> 1) | (m << s) | (m >> s)) & self._on
+
+    def _flood(self, seed: int, color_bits: int) -> int:
+        g = seed
+        while True:
+            ng = g | (self._dilate(g) & color_bits)
+            if ng == g:
+                return g
+            g = ng
+
+    def _empty(self) -> int:
+        return self._on & ~(self._bits[BLACK] | self._bits[WHITE])
+
+    def _group_mask(self, x: int, y: int) -> Tuple[int, int]:
+        """(mask nhóm chứa (x,y), màu) - mask = 0 nếu ô trống."""
+        b = self._bit(x, y)
+        for color in (BLACK, WHITE):
+            if self._bits[color] & b:
+                return self._flood(b, self._bits[color]), color
+        return 0, EMPTY
+
+    def _key_of(self, mask: int, color: int) -> int:
+        keys = self._zkeys[color]
+        n = self.size
+        h = 0
+        for x, y in self._coords(mask):
+            h ^= keys[y*n + x]
+        return h
+
+    # --- giao diện Board ---
+    @property
+    def grid(self) -> np.ndarray:
+        """Mảng (size,size) giống Board.grid (dựng từ bit, cache tới lần sửa kế tiếp)."""
+        if self._grid is None:
+            n, s = self.size, self._stride
+            nbytes = (n * s + 7) // 8
+            def plane(m: int) -> np.ndarray:
+                raw = np.frombuffer(m.to_bytes(nbytes, "little"), dtype=np.uint8)
+                return np.unpackbits(raw, bitorder="little")[:n*s].reshape(n, s)[:, :n]
+            self._grid = plane(self._bits[BLACK]).astype(int) - plane(self._bits[WHITE]).astype(int)
+        return self._grid
+
+    def is_on_board(self, x: int, y: int) -> bool:
+        return 0 <= x < self.size and 0 <= y < self.size
+
+    def get(self, x: int, y: int) -> int:
+        b = self._bit(x, y)
+        if self._bits[BLACK] & b: return BLACK
+        if self._bits[WHITE] & b: return WHITE
+        return EMPTY
+
+    def place_stone(self, player: int, x: int, y: int) -> None:
+        if self.get(x, y) != EMPTY:
+            self.remove_stone(x, y)
+        self._bits[player] |= self._bit(x, y)
+        self._hash ^= self._zkeys[player][y*self.size + x]
+        self._grid = None
+
+    def remove_stone(self, x: int, y: int) -> None:
+        color = self.get(x, y)
+        if color == EMPTY:
+            return
+        self._bits[color] &= ~self._bit(x, y)
+        self._hash ^= self._zkeys[color][y*self.size + x]
+        self._grid = None
+
+    def remove_group(self, x: int, y: int) -> List[Tuple[int,int]]:
+        g, color = self._group_mask(x, y)
+        if not g:
+            return []
+        self._bits[color] &= ~g
+        self._hash ^= self._key_of(g, color)
+        self._grid = None
+        return self._coords(g)
+
+    def neighbors(self, x: int, y: int) -> Tuple[Tuple[int,int], ...]:
+        return self._geo.nbrs_xy[y*self.size + x]
+
+    def diagonals(self, x: int, y: int) -> Tuple[Tuple[int,int], ...]:
+        return self._geo.diags_xy[y*self.size + x]
+
+    # --- Truy vấn nhóm / liberties ---
+    def group_size(self, x: int, y: int) -> int:
+        return self._group_mask(x, y)[0].bit_count()
+
+    def liberty_count(self, x: int, y: int) -> int:
+        g, _ = self._group_mask(x, y)
+        return (self._dilate(g) & self._empty()).bit_count() if g else 0
+
+    def in_atari(self, x: int, y: int) -> bool:
+        return self.liberty_count(x, y) == 1
+
+    def same_group(self, x1: int, y1: int, x2: int, y2: int) -> bool:
+        g, _ = self._group_mask(x1, y1)
+        return bool(g & self._bit(x2, y2))
+
+    def group_at(self, x: int, y: int) -> Set[Tuple[int,int]]:
+        return set(self._coords(self._group_mask(x, y)[0]))
+
+    def group_liberties(self, x: int, y: int) -> Set[Tuple[int,int]]:
+        g, _ = self._group_mask(x, y)
+        return set(self._coords(self._dilate(g) & self._empty())) if g else set()
+
+    def group_stats(self, color: int) -> List[Tuple[int,int]]:
+        """(kích thước, số liberties) của mọi nhóm màu `color`."""
+        out = []
+        bits = self._bits[color]
+        empty = self._empty()
+        rest = bits
+        while rest:
+            g = self._flood(rest & -rest, bits)
+            out.append((g.bit_count(), (self._dilate(g) & empty).bit_count()))
+            rest &= ~g
+        return out
+
+    def atari_points(self, color: int) -> Set[Tuple[int,int]]:
+        """Liberty cuối của các nhóm màu `color` đang bị atari (đánh vào đó là bắt quân)."""
+        out = set()
+        bits = self._bits[color]
+        empty = self._empty()
+        rest = bits
+        while rest:
+            g = self._flood(rest & -rest, bits)
+            libs = self._dilate(g) & empty
+            if libs and not libs & (libs - 1):
+                out.update(self._coords(libs))
+            rest &= ~g
+        return out
+
+    def copy(self) -> "BitBoard":
+        b = BitBoard.__new__(BitBoard)
+        b.size, b._stride, b._on = self.size, self._stride, self._on
+        b._geo = self._geo
+        b._bits = dict(self._bits)
+        b._zkeys = self._zkeys
+        b._hash = self._hash
+        b._grid = self._grid
+        return b
+
+    def hash_key(self, to_play: Optional[int] = None) -> int:
+        """Khoá Zobrist 64-bit của bàn cờ; truyền `to_play` để gộp lượt đi vào khoá."""
+        return self._hash ^ side_key(to_play) if to_play is not None else self._hash
+
+    def hash_after(self, player: int, x: int, y: int, to_play: Optional[int] = None) -> int:
+        """Khoá sau khi `player` đặt quân ở ô trống (x,y) và bắt các nhóm hết liberties."""
+        p = self._bit(x, y)
+        h = self._hash ^ self._zkeys[player][y*self.size + x]
+        opp_bits = self._bits[-player]
+        empty_after = self._empty() & ~p
+        seen = 0
+        for nx, ny in self.neighbors(x, y):
+            q = self._bit(nx, ny)
+            if opp_bits & q and not seen & q:
+                g = self._flood(q, opp_bits)
+                seen |= g
+                if not self._dilate(g) & empty_after:
+                    h ^= self._key_of(g, -player)
+        return h ^ side_key(to_play) if to_play is not None else h
@@ -1,37 +1,323 @@
 
 from __future__ import annotations
 from dataclasses import dataclass
-from typing import List, Tuple
+from typing import Dict, List, Optional, Set, Tuple
 import numpy as np
+from .zobrist import stone_keys, side_key
 
 EMPTY, BLACK, WHITE = 0, 1, -1
+# giá trị ô viền (sentinel) của bàn 1-D có đệm
+BORDER = 2
+
+# 8 ô quanh 1 điểm theo thứ tự hàng của ô 3x3 (bỏ ô giữa) - thứ tự của pattern 3x3
+PATTERN_OFFSETS = ((-1, -1), (0, -1), (1, -1), (-1, 0), (1, 0), (-1, 1), (0, 1), (1, 1))
+
+class Geometry:
+    """
+    Bảng chỉ số dựng sẵn cho 1 kích thước bàn. Bàn 1-D có viền: W = size + 2, điểm (x,y) ở
+    P = (y+1)*W + (x+1), hàng / cột viền là ô BORDER nên đọc láng giềng không cần kiểm tra biên.
+    - nbrs[P] / diags[P]: các điểm trên bàn kề cạnh / kề chéo (tuple, () với ô viền)
+    - pattern[P]: 8 ô quanh P theo PATTERN_OFFSETS (có thể là ô viền) cho pattern 3x3
+    - nbrs_xy / diags_xy: như trên nhưng theo chỉ số phẳng y*size + x, phần tử là (x,y)
+    - zkeys: khoá Zobrist theo P (cùng giá trị với zobrist.stone_keys, 0 ở ô viền)
+    """
+    __slots__ = ("size", "W", "points", "index", "xy", "nbrs", "diags", "pattern", "nbrs_xy", "diags_xy", "zkeys")
+
+    def __init__(self, size: int):
+        W = size + 2
+        self.size = size
+        self.W = W
+        self.index = [(y + 1) * W + x + 1 for y in range(size) for x in range(size)]
+        self.points = tuple(self.index)
+        self.xy: List[Optional[Tuple[int, int]]] = [None] * (W * W)
+        for y in range(size):
+            for x in range(size):
+                self.xy[(y + 1) * W + x + 1] = (x, y)
+        def on(P: int) -> bool:
+            return self.xy[P] is not None
+        self.nbrs: List[Tuple[int, ...]] = [()] * (W * W)
+        self.diags: List[Tuple[int, ...]] = [()] * (W * W)
+        self.pattern: List[Tuple[int, ...]] = [()] * (W * W)
+        for P in self.points:
+            self.nbrs[P] = tuple(q for q in (P - 1, P + 1, P - W, P + W) if on(q))
+            self.diags[P] = tuple(q for q in (P - W - 1, P - W + 1, P + W - 1, P + W + 1) if on(q))
+            self.pattern[P] = tuple(P + dy * W + dx for dx, dy in PATTERN_OFFSETS)
+        self.nbrs_xy = [tuple(self.xy[q] for q in self.nbrs[P]) for P in self.points]
+        self.diags_xy = [tuple(self.xy[q] for q in self.diags[P]) for P in self.points]
+        flat = stone_keys(size)
+        self.zkeys: Dict[int, List[int]] = {}
+        for color in (BLACK, WHITE):
+            keys = [0] * (W * W)
+            for p, P in enumerate(self.points):
+                keys[P] = flat[color][p]
+            self.zkeys[color] = keys
+
+_GEOMETRY: Dict[int, Geometry] = {}
+
+def geometry(size: int) -> Geometry:
+    """Bảng chỉ số của kích thước `size` (dựng 1 lần, dùng chung cho mọi bàn cùng cỡ)."""
+    g = _GEOMETRY.get(size)
+    if g is None:
+        g = _GEOMETRY[size] = Geometry(size)
+    return g
+
+def hoshi_points(size: int) -> List[Tuple[int, int]]:
+    """Điểm sao: cách mép 3 dòng (2 với bàn < 13), thêm giữa cạnh với bàn lẻ >= 13 và điểm giữa bàn lẻ."""
+    if size < 7:
+        return []
+    e = 2 if size < 13 else 3
+    lines = [e, size - 1 - e]
+    mid = size // 2
+    pts = [(x, y) for x in lines for y in lines]
+    if size % 2:
+        pts.append((mid, mid))
+        if size >= 13:
+            pts += [(mid, e), (mid, size - 1 - e), (e, mid), (size - 1 - e, mid)]
+    return pts
+
+
+class _Chain:
+    """Một nhóm quân liền nhau: màu, tập điểm (chỉ số phẳng), tập liberties
+    và khoá Zobrist của riêng nhóm (XOR khoá các quân) để tính nhanh hash sau khi bắt."""
+    __slots__ = ("color", "stones", "libs", "key")
+
+    def __init__(self, color: int, stones: Set[int], libs: Set[int], key: int):
+        self.color = color
+        self.stones = stones
+        self.libs = libs
+        self.key = key
+
 
 @dataclass
 class Board:
+    """Bàn cờ + bảng nhóm/liberties cập nhật dần theo từng lần đặt/nhấc quân.
+    Kích thước nhóm, số liberties, atari là truy vấn O(1).
+    Khoá Zobrist được cập nhật bằng XOR trong place_stone/remove_stone.
+    Bên trong là bàn 1-D có viền (Geometry): _cells[P] là màu / BORDER, chỉ số nhóm / liberties là P;
+    `grid` (size,size) giữ song song cho phần phân tích bằng mảng."""
     size: int = 9
     def __post_init__(self):
+        geo = geometry(self.size)
         self.grid = np.zeros((self.size, self.size), dtype=int)
+        self._geo = geo
+        self._W = geo.W
+        self._cells: List[int] = [BORDER] * (geo.W * geo.W)
+        for P in geo.points:
+            self._cells[P] = EMPTY
+        self._nbrs = geo.nbrs
+        self._chain_of: List[Optional[_Chain]] = [None] * (geo.W * geo.W)
+        self._chains: Set[_Chain] = set()
+        self._zkeys = geo.zkeys
+        self._hash = 0
 
     def is_on_board(self, x: int, y: int) -> bool:
         return 0 <= x < self.size and 0 <= y < self.size
 
     def get(self, x: int, y: int) -> int:
-        return self.grid[y, x]
+        return self._cells[(y+1)*self._W + x + 1]
 
     def place_stone(self, player: int, x: int, y: int) -> None:
+        p = (y+1)*self._W + x + 1
+        if self._chain_of[p] is not None:
+            self.remove_stone(x, y)
         self.grid[y, x] = player
+        self._cells[p] = player
+        k = self._zkeys[player][p]
+        self._hash ^= k
+        chain_of = self._chain_of
+        libs: Set[int] = set()
+        same: List[_Chain] = []
+        for q in self._nbrs[p]:
+            c = chain_of[q]
+            if c is None:
+                libs.add(q)
+            else:
+                c.libs.discard(p)
+                if c.color == player and c not in same:
+                    same.append(c)
+        if not same:
+            chain = _Chain(player, {p}, libs, k)
+            self._chains.add(chain)
+        else:
+            # gộp vào nhóm lớn nhất để ít phải đổi chain_of nhất
+            chain = max(same, key=lambda c: len(c.stones))
+            for other in same:
+                if other is chain: continue
+                chain.stones |= other.stones
+                chain.libs |= other.libs
+                chain.key ^= other.key
+                for s in other.stones:
+                    chain_of[s] = chain
+                self._chains.discard(other)
+            chain.stones.add(p)
+            chain.libs |= libs
+            chain.key ^= k
+        chain_of[p] = chain
 
     def remove_stone(self, x: int, y: int) -> None:
+        p = (y+1)*self._W + x + 1
+        chain = self._chain_of[p]
+        if chain is None:
+            return
         self.grid[y, x] = EMPTY
+        self._cells[p] = EMPTY
+        self._hash ^= self._zkeys[chain.color][p]
+        self._chain_of[p] = None
+        chain.stones.discard(p)
+        self._chains.discard(chain)
+        if chain.stones:
+            # nhấc 1 quân giữa nhóm có thể tách nhóm -> dựng lại phần còn lại
+            self._rebuild(chain.stones, chain.color)
+        for q in self._nbrs[p]:
+            c = self._chain_of[q]
+            if c is not None:
+                c.libs.add(p)
+
+    def remove_group(self, x: int, y: int) -> List[Tuple[int,int]]:
+        """Nhấc cả nhóm chứa (x,y) (dùng khi bắt quân). Trả về toạ độ đã nhấc."""
+        chain = self._chain_of[(y+1)*self._W + x + 1]
+        if chain is None:
+            return []
+        xy = self._geo.xy
+        cells = self._cells
+        chain_of = self._chain_of
+        self._chains.discard(chain)
+        self._hash ^= chain.key
+        removed: List[Tuple[int,int]] = []
+        for s in chain.stones:
+            sx, sy = xy[s]
+            self.grid[sy, sx] = EMPTY
+            cells[s] = EMPTY
+            chain_of[s] = None
+            removed.append((sx, sy))
+        for s in chain.stones:
+            for q in self._nbrs[s]:
+                c = chain_of[q]
+                if c is not None:
+                    c.libs.add(s)
+        return removed
+
+    def _rebuild(self, stones: Set[int], color: int) -> None:
+        remaining = set(stones)
+        chain_of = self._chain_of
+        keys = self._zkeys[color]
+        while remaining:
+            seed = remaining.pop()
+            comp = {seed}; libs: Set[int] = set(); q = [seed]
+            while q:
+                s = q.pop()
+                for t in self._nbrs[s]:
+                    if t in remaining:
+                        remaining.discard(t); comp.add(t); q.append(t)
+                    elif chain_of[t] is None:
+                        libs.add(t)
+            key = 0
+            for s in comp:
+                key ^= keys[s]
+            chain = _Chain(color, comp, libs, key)
+            self._chains.add(chain)
+            for s in comp:
+                chain_of[s] = chain
+
+    # --- Láng giềng (bảng dựng sẵn theo kích thước, không tạo list mới) ---
+    def neighbors(self, x: int, y: int) -> Tuple[Tuple[int,int], ...]:
+        return self._geo.nbrs_xy[y*self.size + x]
 
-    def neighbors(self, x: int, y: int) -> List[Tuple[int,int]]:
-        cand = [(x-1,y),(x+1,y),(x,y-1),(x,y+1)]
-        return [(i,j) for i,j in cand if self.is_on_board(i,j)]
+    def diagonals(self, x: int, y: int) -> Tuple[Tuple[int,int], ...]:
+        return self._geo.diags_xy[y*self.size + x]
+
+    def pattern3(self, x: int, y: int) -> int:
+        """Mã pattern 3x3 quanh (x,y): 8 ô theo PATTERN_OFFSETS, mỗi ô 2 bit
+        (màu & 3: 0 trống, 1 Đen, 3 Trắng, 2 viền) -> số trong [0, 4^8) dùng làm chỉ số bảng pattern."""
+        cells = self._cells
+        code = 0
+        for q in self._geo.pattern[(y+1)*self._W + x + 1]:
+            code = (code << 2) | (cells[q] & 3)
+        return code
+
+    # --- Truy vấn nhóm / liberties ---
+    def group_size(self, x: int, y: int) -> int:
+        c = self._chain_of[(y+1)*self._W + x + 1]
+        return len(c.stones) if c is not None else 0
+
+    def liberty_count(self, x: int, y: int) -> int:
+        c = self._chain_of[(y+1)*self._W + x + 1]
+        return len(c.libs) if c is not None else 0
+
+    def in_atari(self, x: int, y: int) -> bool:
+        c = self._chain_of[(y+1)*self._W + x + 1]
+        return c is not None and len(c.libs) == 1
+
+    def same_group(self, x1: int, y1: int, x2: int, y2: int) -> bool:
+        W = self._W
+        c = self._chain_of[(y1+1)*W + x1 + 1]
+        return c is not None and c is self._chain_of[(y2+1)*W + x2 + 1]
+
+    def group_at(self, x: int, y: int) -> Set[Tuple[int,int]]:
+        c = self._chain_of[(y+1)*self._W + x + 1]
+        if c is None:
+            return set()
+        xy = self._geo.xy
+        return {xy[s] for s in c.stones}
+
+    def group_liberties(self, x: int, y: int) -> Set[Tuple[int,int]]:
+        c = self._chain_of[(y+1)*self._W + x + 1]
+        if c is None:
+            return set()
+        xy = self._geo.xy
+        return {xy[s] for s in c.libs}
+
+    def group_stats(self, color: int) -> List[Tuple[int,int]]:
+        """(kích thước, số liberties) của mọi nhóm màu `color`."""
+        return [(len(c.stones), len(c.libs)) for c in self._chains if c.color == color]
+
+    def atari_points(self, color: int) -> Set[Tuple[int,int]]:
+        """Liberty cuối của các nhóm màu `color` đang bị atari (đánh vào đó là bắt quân)."""
+        xy = self._geo.xy
+        return {xy[next(iter(c.libs))] for c in self._chains if c.color == color and len(c.libs) == 1}
 
     def copy(self) -> "Board":
-        b = Board(self.size)
+        b = Board.__new__(Board)
+        b.size = self.size
         b.grid = self.grid.copy()
+        b._geo = self._geo
+        b._W = self._W
+        b._cells = self._cells[:]
+        b._nbrs = self._nbrs
+        b._zkeys = self._zkeys
+        b._hash = self._hash
+        mapping = {c: _Chain(c.color, set(c.stones), set(c.libs), c.key) for c in self._chains}
+        b._chains = set(mapping.values())
+        b._chain_of = [mapping[c] if c is not None else None for c in self._chain_of]
         return b
 
-    def hash_key(self) -> int:
-        return hash(tuple(map(tuple, self.grid.tolist())))
\ No newline at end of file
+    def hash_key(self, to_play: Optional[int] = None) -> int:
+        """Khoá Zobrist 64-bit của bàn cờ; truyền `to_play` để gộp lượt đi vào khoá."""
+        return self._hash ^ side_key(to_play) if to_play is not None else self._hash
+
+    def hash_after(self, player: int, x: int, y: int, to_play: Optional[int] = None) -> int:
+        """Khoá sau khi `player` đặt quân ở ô trống (x,y) và bắt các nhóm hết liberties,
+        tính bằng XOR, không sửa bàn cờ."""
+        p = (y+1)*self._W + x + 1
+        h = self._hash ^ self._zkeys[player][p]
+        seen: List[_Chain] = []
+        for q in self._nbrs[p]:
+            c = self._chain_of[q]
+            if c is not None and c.color == -player and c not in seen and c.libs == {p}:
+                seen.append(c)
+                h ^= c.key
+        return h ^ side_key(to_play) if to_play is not None else h
+
+
+def new_board(size: int = 9, backend: Optional[str] = None):
+    """Tạo bàn cờ theo backend: "numpy" (Board, mặc định) hoặc "bitboard" (BitBoard).
+    Không truyền backend thì lấy BOARD_BACKEND trong config.settings."""
+    if backend is None:
+        from config.settings import BOARD_BACKEND
+        backend = BOARD_BACKEND
+    if backend == "bitboard":
+        from .bitboard import BitBoard
+        return BitBoard(size)
+    if backend == "numpy":
+        return Board(size)
+    raise ValueError(f"Backend bàn cờ không hợp lệ: {backend!r}")
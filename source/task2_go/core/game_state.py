@@ -1,59 +1,152 @@
 from __future__ import annotations
-from dataclasses import dataclass, field
-from typing import List, Optional
-from .board import Board, BLACK, WHITE
+import threading
+from typing import Iterable, List, Optional
+import numpy as np
+from .board import Board, BLACK, WHITE, new_board
+from .history import History
 from .move import Move
-from .rules import Rules
+from .rules import Rules, PositionSet, position_set
+from .zobrist import side_key
+from config.settings import KO_RULE
+
+def moves_from_mask(mask: np.ndarray) -> List[Move]:
+    """Danh sách PLAY theo thứ tự hàng (y) rồi cột (x), thêm PASS/RESIGN ở cuối."""
+    ys, xs = np.nonzero(mask)
+    moves = [Move.play(x, y) for y, x in zip(ys.tolist(), xs.tolist())]
+    moves.append(Move.pass_()); moves.append(Move.resign())
+    return moves
+
+_set = object.__setattr__
+
+# Tập thế superko được chia sẻ (và pop/push) giữa các state của cùng mạch ván, kể cả khi chỉ đọc
+# (positions() tua lại cho state cũ) -> mọi thao tác trên tập giữ khoá này (UI thread + BackgroundAgent).
+_SEEN_LOCK = threading.RLock()
 
-@dataclass(frozen=True)
 class GameState:
-    board: Board
-    to_play: int = BLACK
-    move_history: List[Move] = field(default_factory=list)
-    hash_history: List[int] = field(default_factory=list)  # <- thêm
+    """
+    Trạng thái ván (bất biến). move_history / hash_history là History bền vững: state con chỉ thêm
+    1 nút trỏ về lịch sử của cha -> apply_move không copy lịch sử, bộ nhớ mỗi state cố định
+    (bàn cờ + vài con trỏ; __slots__, Move là flyweight dùng chung).
+    Superko: tập thế đã có được chia sẻ dọc theo mạch ván (cha chuyển cho con); state cũ cần lại
+    thì pop ngược về lịch sử của mình, chỉ dựng lại từ hash_history khi ở nhánh khác.
+    Đa luồng: legal_mask / legal_moves / apply_move dùng được song song trên cùng state hoặc cùng
+    mạch ván (tập dùng chung luôn đọc/ghi dưới `seen_lock`); ai tự gọi positions() phải giữ
+    `seen_lock` tới khi dùng xong tập trả về.
+    """
+    seen_lock = _SEEN_LOCK
+    __slots__ = ("board", "to_play", "move_history", "hash_history", "ko_rule",
+                 "_legal_mask", "_legal_list", "_seen")
+
+    def __init__(self, board: Board, to_play: int = BLACK, move_history: Iterable[Move] = (),
+                 hash_history: Iterable[int] = (), ko_rule: str = KO_RULE):
+        _set(self, "board", board)
+        _set(self, "to_play", to_play)
+        _set(self, "move_history", History.of(move_history))
+        _set(self, "hash_history", History.of(hash_history))
+        _set(self, "ko_rule", ko_rule)                     # "simple" | "positional" | "situational"
+        # cache nước đi hợp lệ của trạng thái (UI, ordering, search dùng chung)
+        _set(self, "_legal_mask", None)
+        _set(self, "_legal_list", None)
+        _set(self, "_seen", None)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("GameState là bất biến")
+
+    def __reduce__(self):
+        # gửi sang worker (ProcessPool): bỏ cache
+        return GameState, (self.board, self.to_play, self.move_history, self.hash_history, self.ko_rule)
+
+    def __repr__(self) -> str:
+        return f"GameState(to_play={self.to_play}, moves={len(self.move_history)}, ko_rule={self.ko_rule!r})"
 
     @staticmethod
-    def new_game(size:int=9)->"GameState":
-        b = Board(size=size)
-        # hash ban đầu
-        return GameState(board=b, to_play=BLACK, move_history=[], hash_history=[b.hash_key()])
+    def new_game(size:int=9, backend:Optional[str]=None, ko_rule:str=KO_RULE)->"GameState":
+        b = new_board(size, backend)
+        # hash ban đầu (khoá Zobrist có gộp lượt đi)
+        return GameState(board=b, to_play=BLACK, hash_history=[b.hash_key(BLACK)], ko_rule=ko_rule)
+
+    def positions(self) -> Optional[PositionSet]:
+        """Tập thế đã có trong ván cho superko (None với simple-ko). Tập dùng chung chỉ hợp lệ khi
+        đang phản ánh đúng lịch sử của state này (owner); không thì dựng lại.
+        Chỉ đúng khi còn giữ `seen_lock` (state khác cùng mạch có thể tua tập đi)."""
+        if self.ko_rule == "simple":
+            return None
+        with _SEEN_LOCK:
+            seen = self._seen
+            if seen is not None and seen.owner is not self.hash_history and not self._rewind(seen):
+                seen = None
+            if seen is None:
+                seen = position_set(self.ko_rule, self.hash_history, self.to_play)
+                seen.owner = self.hash_history
+                _set(self, "_seen", seen)
+            return seen
+
+    def _rewind(self, seen: PositionSet) -> bool:
+        """Tập đã đi tiếp xuống con cháu của state này (vd. thử nhiều nước từ cùng 1 state):
+        pop các thế thêm sau nó thay vì dựng lại, nếu đoạn cần pop không dài hơn lịch sử."""
+        mine = self.hash_history
+        node = seen.owner
+        extra = len(node) - len(mine)
+        if not 0 < extra <= len(mine):
+            return False
+        path = node
+        for _ in range(extra):
+            path = path.tail
+        if path is not mine:
+            return False
+        tp = self.to_play if extra % 2 == 0 else -self.to_play
+        while node is not mine:
+            seen.pop(node.head ^ side_key(tp), tp)
+            node, tp = node.tail, -tp
+        seen.owner = mine
+        return True
 
     def _last_hash(self) -> Optional[int]:
         # simple-ko dùng hash của trạng thái ngay trước đó
-        return self.hash_history[-2] if len(self.hash_history) >= 2 else None
+        h = self.hash_history
+        return h.tail.head if len(h) >= 2 else None
+
+    def legal_mask(self)->np.ndarray:
+        """Mặt nạ (size,size) ô đi được cho bên to_play; tính 1 lần rồi cache theo trạng thái."""
+        if self._legal_mask is None:
+            with _SEEN_LOCK:
+                mask = Rules().legal_mask(self.board, self.to_play, last_hash=self._last_hash(),
+                                          seen=self.positions())
+            _set(self, "_legal_mask", mask)
+        return self._legal_mask
 
     def legal_moves(self)->List[Move]:
-        rules = Rules()
-        moves = []
-        last_hash = self._last_hash()
-        for y in range(self.board.size):
-            for x in range(self.board.size):
-                if rules.is_legal(self.board, self.to_play, x, y, last_hash=last_hash):
-                    moves.append(Move.play(x,y))
-        moves.append(Move.pass_()); moves.append(Move.resign())
-        return moves
+        if self._legal_list is None:
+            _set(self, "_legal_list", moves_from_mask(self.legal_mask()))
+        return list(self._legal_list)
 
     def is_terminal(self)->bool:
         # kết thúc đơn giản: 2 PASS liên tiếp hoặc RESIGN
-        if len(self.move_history)>=2 and self.move_history[-1].kind=='PASS' and self.move_history[-2].kind=='PASS':
-            return True
-        if any(m.kind=='RESIGN' for m in self.move_history[-1:]):
+        h = self.move_history
+        if len(h) >= 2 and h.head.kind == 'PASS' and h.tail.head.kind == 'PASS':
             return True
-        return False
+        return bool(h) and h.head.kind == 'RESIGN'
 
     def apply_move(self, mv:Move)->"GameState":
-        rules = Rules()
+        with _SEEN_LOCK:
+            return self._apply(mv)
+
+    def _apply(self, mv: Move) -> "GameState":
+        seen = self.positions()
         if mv.kind=='PLAY':
             nb = self.board.copy()
-            # dùng last_hash để chặn ko
-            last_hash = self._last_hash()
-            rules.play_move(nb, self.to_play, mv.x, mv.y, last_hash=last_hash)
-            new_hash_history = self.hash_history + [nb.hash_key()]
-            return GameState(board=nb, to_play=-self.to_play,
-                             move_history=self.move_history+[mv],
-                             hash_history=new_hash_history)
+            # dùng last_hash (simple-ko) / tập thế đã có (superko) để chặn ko
+            Rules().play_move(nb, self.to_play, mv.x, mv.y, last_hash=self._last_hash(), seen=seen)
         else:
-            # PASS/RESIGN không đổi bàn cờ → hash giữ nguyên
-            return GameState(board=self.board, to_play=-self.to_play,
-                             move_history=self.move_history+[mv],
-                             hash_history=self.hash_history + [self.board.hash_key()])
+            # PASS/RESIGN không đổi bàn cờ → chỉ đổi phần lượt đi trong hash
+            nb = self.board
+        child = GameState(board=nb, to_play=-self.to_play,
+                          move_history=self.move_history.push(mv),
+                          hash_history=self.hash_history.push(nb.hash_key(-self.to_play)),
+                          ko_rule=self.ko_rule)
+        if seen is not None:
+            # chuyển tập cho con (O(1)); cha cần lại thì pop ngược (_rewind)
+            seen.push(nb.hash_key(), child.to_play)
+            seen.owner = child.hash_history
+            _set(child, "_seen", seen)
+        return child
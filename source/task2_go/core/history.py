@@ -0,0 +1,86 @@
+# core/history.py
+"""
+Lịch sử bền vững (persistent) cho GameState: danh sách liên kết ngược, mỗi nút = 1 phần tử + nút trước.
+State con chỉ thêm 1 nút trỏ về lịch sử của state cha (dùng chung phần đầu, không copy):
+push O(1), len / [-1] / [-2] O(1); duyệt, cắt lát, [i] là O(n) (chỉ dùng khi xuất / so sánh).
+"""
+from __future__ import annotations
+from collections.abc import Sequence
+from typing import Any, Iterable, Iterator, List, Optional
+
+class History(Sequence):
+    __slots__ = ("head", "tail", "_len")
+
+    def __init__(self, head: Any = None, tail: Optional["History"] = None):
+        self.head = head
+        self.tail = tail
+        self._len = 0 if tail is None else tail._len + 1
+
+    @staticmethod
+    def of(items: Iterable[Any]) -> "History":
+        if isinstance(items, History):
+            return items
+        h = History()
+        for x in items:
+            h = History(x, h)
+        return h
+
+    def push(self, item: Any) -> "History":
+        """Lịch sử mới = lịch sử này + [item] (không sửa lịch sử này)."""
+        return History(item, self)
+
+    def __len__(self) -> int:
+        return self._len
+
+    def _rev(self) -> List[Any]:
+        out = []
+        node = self
+        while node._len:
+            out.append(node.head)
+            node = node.tail
+        return out
+
+    def __iter__(self) -> Iterator[Any]:
+        return reversed(self._rev())
+
+    def __reversed__(self) -> Iterator[Any]:
+        node = self
+        while node._len:
+            yield node.head
+            node = node.tail
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return list(self)[i]
+        if i < 0:
+            i += self._len
+        if not 0 <= i < self._len:
+            raise IndexError("History index out of range")
+        node = self
+        for _ in range(self._len - 1 - i):
+            node = node.tail
+        return node.head
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, History):
+            a, b = self, other
+            if a._len != b._len:
+                return False
+            # phần chung (cùng nút) thì chắc chắn bằng nhau -> dừng sớm
+            while a is not b and a._len:
+                if a.head != b.head:
+                    return False
+                a, b = a.tail, b.tail
+            return True
+        if isinstance(other, (list, tuple)):
+            return len(other) == self._len and list(self) == list(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __reduce__(self):
+        # pickle phẳng (danh sách dài lồng nhau sẽ vượt giới hạn đệ quy)
+        return History.of, (list(self),)
+
+    def __repr__(self) -> str:
+        return f"History({list(self)!r})"
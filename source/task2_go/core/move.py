@@ -1,7 +1,7 @@
 
 from __future__ import annotations
 from dataclasses import dataclass
-from typing import Optional, Literal
+from typing import Dict, Optional, Literal, Tuple
 
 MoveKind = Literal["PLAY","PASS","RESIGN"]
 
@@ -11,9 +11,18 @@ class Move:
     x: Optional[int]=None
     y: Optional[int]=None
 
+    # Flyweight: Move.play / pass_ / resign trả về đối tượng dùng chung (so sánh vẫn theo giá trị)
     @staticmethod
-    def play(x:int,y:int)->"Move": return Move("PLAY",x,y)
+    def play(x:int,y:int)->"Move":
+        mv = _POINTS.get((x, y))
+        if mv is None:
+            mv = _POINTS[(x, y)] = Move("PLAY", x, y)
+        return mv
     @staticmethod
-    def pass_()->"Move": return Move("PASS")
+    def pass_()->"Move": return _PASS
     @staticmethod
-    def resign()->"Move": return Move("RESIGN")
+    def resign()->"Move": return _RESIGN
+
+_POINTS: Dict[Tuple[int, int], Move] = {(x, y): Move("PLAY", x, y) for y in range(19) for x in range(19)}
+_PASS = Move("PASS")
+_RESIGN = Move("RESIGN")
@@ -0,0 +1,278 @@
+# core/records.py
+"""
+Lưu / nạp ván cờ:
+- SGF (FF[4]): GameRecord.to_sgf() / GameRecord.from_sgf() - chỉ nhánh chính, không hỗ trợ quân đặt sẵn (AB/AW)
+- file nhị phân gọn (.gor): mỗi nước 1 byte (2 byte nếu size^2 > 253), bảng chỉ mục ở cuối file
+  để truy cập ngẫu nhiên; RecordStore đọc qua np.memmap nên không phải nạp / parse cả file
+- replay_positions(): phát lại hàng loạt ván qua Rules trên 1 bàn cờ dùng lại, sinh lần lượt từng thế cờ
+
+Bố cục .gor: header (MAGIC, số ván u64, vị trí chỉ mục u64) | các nước của từng ván nối tiếp | chỉ mục
+(mỗi ván 1 dòng INDEX_DTYPE). Mã nước: y*size + x; PASS / RESIGN là 2 mã lớn nhất của độ rộng.
+"""
+from __future__ import annotations
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+import re
+import struct
+import numpy as np
+from core.board import BLACK, WHITE, new_board
+from core.game_state import GameState
+from core.move import Move
+from core.rules import Rules
+from config.settings import KOMI
+
+MAGIC = b"GOREC\x01\x00\x00"
+HEADER = struct.Struct("<8sQQ")
+INDEX_DTYPE = np.dtype([("offset", "<u8"), ("length", "<u4"), ("size", "u1"), ("width", "u1"),
+                        ("winner", "i1"), ("_pad", "u1"), ("komi", "<f4")])
+# winner trong chỉ mục: 1 Đen, -1 Trắng, 0 hoà, UNKNOWN = chưa rõ
+UNKNOWN = 2
+
+def move_width(size: int) -> int:
+    """Số byte mỗi nước: 1 nếu mọi điểm + PASS + RESIGN vừa 1 byte (tới 15x15), ngược lại 2."""
+    return 1 if size * size <= 254 else 2
+
+def encode_move(mv: Move, size: int, width: int) -> int:
+    top = (1 << (8 * width)) - 1
+    if mv.kind == "PASS":
+        return top - 1
+    if mv.kind == "RESIGN":
+        return top
+    return mv.y * size + mv.x
+
+def decode_move(code: int, size: int, width: int) -> Move:
+    top = (1 << (8 * width)) - 1
+    if code == top - 1:
+        return Move.pass_()
+    if code == top:
+        return Move.resign()
+    y, x = divmod(int(code), size)
+    return Move.play(x, y)
+
+
+@dataclass
+class GameRecord:
+    """Biên bản 1 ván: kích thước, các nước từ bàn trống (Đen đi trước), komi, bên thắng (None = chưa rõ)."""
+    size: int
+    moves: List[Move] = field(default_factory=list)
+    komi: float = KOMI
+    winner: Optional[int] = None
+    props: Dict[str, str] = field(default_factory=dict)     # thuộc tính SGF khác (PB, PW, RE, DT, ...)
+
+    @staticmethod
+    def from_state(state: GameState, komi: float = KOMI, winner: Optional[int] = None) -> "GameRecord":
+        return GameRecord(state.board.size, list(state.move_history), komi, winner)
+
+    def to_state(self, backend: Optional[str] = None) -> GameState:
+        """Phát lại qua GameState.apply_move (nước không hợp lệ -> ValueError từ Rules)."""
+        s = GameState.new_game(self.size, backend)
+        for mv in self.moves:
+            s = s.apply_move(mv)
+        return s
+
+    # ------------- SGF -------------
+    def to_sgf(self) -> str:
+        props = dict(self.props)
+        if self.winner is not None:
+            props.setdefault("RE", _result_str(self.winner, self.moves))
+        head = f"(;GM[1]FF[4]CA[UTF-8]SZ[{self.size}]KM[{self.komi:g}]"
+        head += "".join(f"{k}[{_sgf_escape(v)}]" for k, v in props.items()
+                        if k not in ("GM", "FF", "CA", "SZ", "KM"))
+        body = []
+        color = BLACK
+        for mv in self.moves:
+            if mv.kind == "RESIGN":
+                break                                   # đầu hàng chỉ ghi trong RE
+            c = "B" if color == BLACK else "W"
+            body.append(f";{c}[]" if mv.kind == "PASS" else f";{c}[{chr(97 + mv.x)}{chr(97 + mv.y)}]")
+            color = -color
+        return head + "".join(body) + ")\n"
+
+    @staticmethod
+    def from_sgf(text: str) -> "GameRecord":
+        """Nhánh chính của cây SGF đầu tiên. Nước phải xen kẽ Đen / Trắng bắt đầu từ Đen."""
+        nodes = _main_line(_tokens(text))
+        if not nodes:
+            raise ValueError("SGF rỗng")
+        root = nodes[0]
+        size = int(root.get("SZ", ["19"])[0].split(":")[0])
+        komi = float(root["KM"][0]) if root.get("KM", [""])[0] else KOMI
+        if "AB" in root or "AW" in root:
+            raise ValueError("Không hỗ trợ SGF có quân đặt sẵn (AB/AW)")
+        moves: List[Move] = []
+        color = BLACK
+        for node in nodes:
+            for key, c in (("B", BLACK), ("W", WHITE)):
+                if key not in node:
+                    continue
+                if c != color:
+                    raise ValueError(f"SGF: nước {len(moves) + 1} không đúng lượt")
+                v = node[key][0]
+                if v == "" or (v == "tt" and size <= 19):
+                    moves.append(Move.pass_())
+                else:
+                    moves.append(Move.play(ord(v[0]) - 97, ord(v[1]) - 97))
+                color = -color
+        props = {k: v[0] for k, v in root.items() if k not in ("GM", "FF", "CA", "SZ", "KM")}
+        winner = _parse_result(props.get("RE", ""))
+        if props.get("RE", "")[1:].upper() in ("+R", "+RESIGN") and winner == -color:
+            moves.append(Move.resign())                 # bên tới lượt là bên đầu hàng
+        return GameRecord(size, moves, komi, winner, props)
+
+
+def _sgf_escape(v: str) -> str:
+    return v.replace("\\", "\\\\").replace("]", "\\]")
+
+def _result_str(winner: int, moves: List[Move]) -> str:
+    if winner == 0:
+        return "0"
+    side = "B" if winner == BLACK else "W"
+    return f"{side}+R" if moves and moves[-1].kind == "RESIGN" else f"{side}+"
+
+def _parse_result(re_val: str) -> Optional[int]:
+    v = re_val.strip().upper()
+    if v in ("0", "DRAW", "JIGO"):
+        return 0
+    if v.startswith("B+"):
+        return BLACK
+    if v.startswith("W+"):
+        return WHITE
+    return None
+
+_TOKEN = re.compile(r"\(|\)|;|([A-Za-z]+)\s*((?:\[(?:\\.|[^\]\\])*\]\s*)+)", re.S)
+_VALUE = re.compile(r"\[((?:\\.|[^\]\\])*)\]", re.S)
+
+def _tokens(text: str) -> List:
+    out = []
+    for m in _TOKEN.finditer(text):
+        if m.group(1) is None:
+            out.append(m.group(0))
+        else:
+            ident = "".join(ch for ch in m.group(1) if ch.isupper())   # FF[3]: "AddBlack" -> "AB"
+            vals = [re.sub(r"\\(.)", r"\1", v, flags=re.S) for v in _VALUE.findall(m.group(2))]
+            out.append((ident, vals))
+    return out
+
+def _main_line(tokens: List) -> List[Dict[str, List[str]]]:
+    """Các node của nhánh chính (ở mỗi chỗ rẽ nhánh lấy nhánh con đầu tiên)."""
+    nodes: List[Dict[str, List[str]]] = []
+    depth = 0
+    skip_from = None          # đang bỏ qua nhánh phụ bắt đầu ở độ sâu này
+    finished = set()          # các độ sâu mà nhánh con đầu tiên đã đọc xong
+    for t in tokens:
+        if t == "(":
+            depth += 1
+            if skip_from is None and (depth - 1) in finished:
+                skip_from = depth
+        elif t == ")":
+            if skip_from == depth:
+                skip_from = None
+            elif skip_from is None:
+                finished.add(depth - 1)
+            depth -= 1
+            if depth == 0:
+                break
+        elif skip_from is not None:
+            continue
+        elif t == ";":
+            nodes.append({})
+        elif nodes:
+            ident, vals = t
+            nodes[-1].setdefault(ident, []).extend(vals)
+    return nodes
+
+
+# ------------- File nhị phân -------------
+class RecordWriter:
+    """Ghi tuần tự nhiều ván vào file .gor; chỉ mục ghi khi close() (dùng được với `with`)."""
+    def __init__(self, path: str):
+        self._f = open(path, "wb")
+        self._f.write(HEADER.pack(MAGIC, 0, 0))
+        self._rows: List[Tuple] = []
+
+    def add(self, record: GameRecord) -> None:
+        width = move_width(record.size)
+        codes = np.fromiter((encode_move(m, record.size, width) for m in record.moves),
+                            dtype=np.uint8 if width == 1 else np.dtype("<u2"), count=len(record.moves))
+        offset = self._f.tell()
+        self._f.write(codes.tobytes())
+        winner = UNKNOWN if record.winner is None else record.winner
+        self._rows.append((offset, len(codes), record.size, width, winner, 0, record.komi))
+
+    def close(self) -> None:
+        if self._f.closed:
+            return
+        index_offset = self._f.tell()
+        self._f.write(np.array(self._rows, dtype=INDEX_DTYPE).tobytes())
+        self._f.seek(0)
+        self._f.write(HEADER.pack(MAGIC, len(self._rows), index_offset))
+        self._f.close()
+
+    def __enter__(self) -> "RecordWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+def write_records(path: str, records: Iterable[GameRecord]) -> int:
+    n = 0
+    with RecordWriter(path) as w:
+        for r in records:
+            w.add(r); n += 1
+    return n
+
+
+class RecordStore:
+    """Đọc file .gor qua np.memmap: len(), store[i] -> GameRecord, codes(i) -> mảng mã nước (không copy)."""
+    def __init__(self, path: str):
+        self._mm = np.memmap(path, dtype=np.uint8, mode="r")
+        magic, n, index_offset = HEADER.unpack(self._mm[:HEADER.size].tobytes())
+        if magic != MAGIC:
+            raise ValueError(f"Không phải file biên bản .gor: {path}")
+        self.index = self._mm[index_offset:index_offset + n * INDEX_DTYPE.itemsize].view(INDEX_DTYPE)
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def codes(self, i: int) -> np.ndarray:
+        row = self.index[i]
+        width = int(row["width"])
+        start = int(row["offset"])
+        raw = self._mm[start:start + int(row["length"]) * width]
+        return raw if width == 1 else raw.view("<u2")
+
+    def __getitem__(self, i: int) -> GameRecord:
+        row = self.index[i]
+        size, width = int(row["size"]), int(row["width"])
+        winner = int(row["winner"])
+        return GameRecord(size, [decode_move(c, size, width) for c in self.codes(i)],
+                          float(row["komi"]), None if winner == UNKNOWN else winner)
+
+    def __iter__(self) -> Iterator[GameRecord]:
+        for i in range(len(self)):
+            yield self[i]
+
+
+def replay_positions(store: RecordStore, games: Optional[Iterable[int]] = None,
+                     backend: Optional[str] = None) -> Iterator[Tuple[int, int, object, int, Move]]:
+    """Phát lại các ván qua Rules, sinh (ván, số nước đã đi, board, bên đi, nước sắp đi) TRƯỚC mỗi nước.
+    `board` là 1 bàn dùng lại và bị sửa sau khi sinh -> cần giữ thì board.copy().
+    Nước không hợp lệ -> ValueError (từ Rules.play_move)."""
+    rules = Rules()
+    for g in (range(len(store)) if games is None else games):
+        row = store.index[g]
+        size, width = int(row["size"]), int(row["width"])
+        top = (1 << (8 * width)) - 1
+        board = new_board(size, backend)
+        player = BLACK
+        prev_hash, cur_hash = None, board.hash_key(BLACK)
+        for ply, code in enumerate(store.codes(g).tolist()):
+            mv = decode_move(code, size, width)
+            yield g, ply, board, player, mv
+            if code == top:
+                break
+            if code != top - 1:
+                y, x = divmod(code, size)
+                rules.play_move(board, player, x, y, last_hash=prev_hash)
+            player = -player
+            prev_hash, cur_hash = cur_hash, board.hash_key(player)
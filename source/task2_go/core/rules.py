@@ -1,87 +1,182 @@
 from __future__ import annotations
-from typing import Optional, Tuple, Set, List
+from typing import Dict, Iterable, Optional, Tuple, List
+import numpy as np
 from .board import Board, EMPTY, BLACK, WHITE
+from .zobrist import side_key, stone_key_array
+
+# Luật ko: "simple" (chỉ cấm lặp thế ngay trước), "positional" (superko: cấm lặp bất kỳ bàn cờ nào đã có),
+# "situational" (superko: cấm lặp bàn cờ + bên tới lượt)
+KO_RULES = ("simple", "positional", "situational")
+
+_MASK64 = (1 << 64) - 1
+
+class PositionSet:
+    """
+    Tập (đếm bội) các thế cờ đã xuất hiện trong ván cho luật superko, cập nhật dần:
+    push khi đi 1 nước, pop khi undo (SearchPosition.unmake_move) -> kiểm tra lặp O(1), không quét lịch sử.
+    Khoá: positional = khoá Zobrist bàn cờ; situational = khoá có gộp lượt đi (như hash_history).
+    `digest` = tổng các khoá (mod 2^64), dấu vân tay của cả tập để cache nước hợp lệ theo lịch sử.
+    `owner`: lịch sử (History) mà tập đang phản ánh khi GameState chia sẻ tập dọc mạch ván.
+    """
+    __slots__ = ("rule", "_count", "_n", "digest", "owner")
+
+    def __init__(self, rule: str):
+        if rule not in ("positional", "situational"):
+            raise ValueError(f"PositionSet chỉ dùng cho superko, không phải {rule!r}")
+        self.rule = rule
+        self._count: Dict[int, int] = {}
+        self._n = 0
+        self.digest = 0
+        self.owner = None
+
+    @staticmethod
+    def from_history(rule: str, hash_history: Iterable[int], to_play: int) -> "PositionSet":
+        """Dựng từ hash_history (khoá có lượt đi, phần tử cuối ứng với `to_play`)."""
+        hashes = list(hash_history)
+        out = PositionSet(rule)
+        n = len(hashes)
+        for i, h in enumerate(hashes):
+            tp = to_play if (n - 1 - i) % 2 == 0 else -to_play
+            out.push(h ^ side_key(tp), tp)
+        return out
+
+    def key(self, board_hash: int, to_play: int) -> int:
+        return board_hash if self.rule == "positional" else board_hash ^ side_key(to_play)
+
+    def push(self, board_hash: int, to_play: int) -> None:
+        k = self.key(board_hash, to_play)
+        self._count[k] = self._count.get(k, 0) + 1
+        self._n += 1
+        self.digest = (self.digest + k) & _MASK64
+
+    def pop(self, board_hash: int, to_play: int) -> None:
+        k = self.key(board_hash, to_play)
+        c = self._count[k] - 1
+        if c:
+            self._count[k] = c
+        else:
+            del self._count[k]
+        self._n -= 1
+        self.digest = (self.digest - k) & _MASK64
+
+    def seen(self, board_hash: int, to_play: int) -> bool:
+        """Thế (bàn cờ `board_hash`, `to_play` đi tiếp) đã xuất hiện chưa."""
+        return self.key(board_hash, to_play) in self._count
+
+    def seen_many(self, board_hashes: np.ndarray, to_play: int) -> np.ndarray:
+        """Như seen() cho cả mảng khoá bàn (uint64): giao tập ở tầng C, không lặp Python từng ô."""
+        keys = board_hashes if self.rule == "positional" else board_hashes ^ np.uint64(side_key(to_play))
+        hits = self._count.keys() & set(keys.tolist())
+        if not hits:
+            return np.zeros(keys.shape, dtype=bool)
+        return np.isin(keys, np.fromiter(hits, dtype=np.uint64, count=len(hits)))
+
+    def copy(self) -> "PositionSet":
+        out = PositionSet(self.rule)
+        out._count = dict(self._count)
+        out._n = self._n
+        out.digest = self.digest
+        return out
+
+    def __len__(self) -> int:
+        return self._n
+
+def position_set(rule: str, hash_history: Iterable[int], to_play: int) -> Optional[PositionSet]:
+    """PositionSet cho luật `rule`, None với simple-ko (chỉ cần last_hash)."""
+    if rule not in KO_RULES:
+        raise ValueError(f"Luật ko không hợp lệ: {rule!r} (chọn {', '.join(KO_RULES)})")
+    return None if rule == "simple" else PositionSet.from_history(rule, hash_history, to_play)
+
 
 class Rules:
-    # --- Helpers: nhóm & liberties ---
-    def _collect_group(self, board: Board, x: int, y: int) -> Set[Tuple[int,int]]:
-        """BFS gom nhóm quân cùng màu với (x,y)."""
-        color = board.get(x, y)
-        if color == EMPTY:
-            return set()
-        q = [(x, y)]
-        seen: Set[Tuple[int,int]] = set()
-        seen.add((x, y))
-        while q:
-            cx, cy = q.pop()
-            for nx, ny in board.neighbors(cx, cy):
-                if (nx, ny) not in seen and board.get(nx, ny) == color:
-                    seen.add((nx, ny))
-                    q.append((nx, ny))
-        return seen
-
-    def _liberties_of_group(self, board: Board, group: Set[Tuple[int,int]]) -> Set[Tuple[int,int]]:
-        libs: Set[Tuple[int,int]] = set()
-        for (x, y) in group:
-            for nx, ny in board.neighbors(x, y):
-                if board.get(nx, ny) == EMPTY:
-                    libs.add((nx, ny))
-        return libs
-
-    def _remove_group(self, board: Board, group: Set[Tuple[int,int]]) -> None:
-        for (x, y) in group:
-            board.remove_stone(x, y)
-
-    # --- Kiểm tra hợp lệ (mô phỏng) ---
-    def is_legal(self, board: Board, player: int, x: int, y: int, last_hash: Optional[int]=None) -> bool:
+    # --- Kiểm tra hợp lệ ---
+    def is_legal(self, board: Board, player: int, x: int, y: int, last_hash: Optional[int]=None,
+                 seen: Optional[PositionSet]=None) -> bool:
+        """`last_hash`: khoá (có lượt) của trạng thái trước đó cho simple-ko;
+        `seen`: các thế đã có trong ván cho superko (None => chỉ simple-ko)."""
         if not board.is_on_board(x, y):
             return False
         if board.get(x, y) != EMPTY:
             return False
 
-        # Mô phỏng trên bản sao
-        tmp = board.copy()
-        tmp.place_stone(player, x, y)
-
-        # Bắt các nhóm đối thủ không còn liberties
+        # Nước đi hợp lệ (không tự sát) nếu: có ô trống kề, hoặc nối vào nhóm mình còn >1 liberties,
+        # hoặc bắt được nhóm đối thủ đang còn đúng 1 liberty (chính là (x,y))
         opp = -player
+        has_liberty = False
         captured_any = False
-        for nx, ny in tmp.neighbors(x, y):
-            if tmp.is_on_board(nx, ny) and tmp.get(nx, ny) == opp:
-                grp = self._collect_group(tmp, nx, ny)
-                if not self._liberties_of_group(tmp, grp):  # hết liberties
-                    self._remove_group(tmp, grp)
-                    captured_any = True
-
-        # Nếu không bắt quân, kiểm tra tự sát (nhóm của mình phải còn liberties)
-        my_group = self._collect_group(tmp, x, y)
-        if not self._liberties_of_group(tmp, my_group) and not captured_any:
+        for nx, ny in board.neighbors(x, y):
+            v = board.get(nx, ny)
+            if v == EMPTY:
+                has_liberty = True
+            elif v == player:
+                if board.liberty_count(nx, ny) > 1:
+                    has_liberty = True
+            elif v == opp and board.liberty_count(nx, ny) == 1:
+                captured_any = True
+        if not has_liberty and not captured_any:
             return False
 
-        # Simple-ko: nếu cung cấp last_hash thì trạng thái sau khi đi không được giống hệt last
-        if last_hash is not None:
-            if tmp.hash_key() == last_hash:
+        # Simple-ko: trạng thái sau khi đi (khoá Zobrist có gộp lượt đi) không được giống hệt last_hash.
+        # Không bắt quân thì bàn cờ mới có thêm quân so với mọi trạng thái trước -> không thể lặp.
+        if last_hash is not None and captured_any:
+            if board.hash_after(player, x, y, to_play=-player) == last_hash:
                 return False
 
+        # Superko: sau khi bắt quân rồi đặt lại, nước không bắt quân cũng có thể lặp thế cũ -> xét mọi nước.
+        if seen is not None and seen.seen(board.hash_after(player, x, y), -player):
+            return False
+
         return True
 
-    # --- Chơi nước đi thật sự ---
-    def play_move(self, board: Board, player: int, x: int, y: int, last_hash: Optional[int]=None) -> List[Tuple[int,int]]:
-        if not self.is_legal(board, player, x, y, last_hash=last_hash):
-            raise ValueError("Nước đi không hợp lệ (tự sát/ko/đã chiếm/ngoài bàn).")
+    # --- Sinh mặt nạ nước đi hợp lệ cho cả bàn (1 lượt) ---
+    def legal_mask(self, board: Board, player: int, last_hash: Optional[int]=None,
+                   seen: Optional[PositionSet]=None) -> np.ndarray:
+        """Mảng bool (size,size): mask[y,x] = True nếu `player` đi được ở (x,y).
+        Ô trống có ô trống kề luôn hợp lệ (không tự sát, không thể là simple-ko) -> tính bằng dịch mảng;
+        chỉ các ô bị vây kín mới cần kiểm tra đầy đủ (tự sát/bắt quân/ko).
+        Superko (`seen`): mọi ô còn lại tra thêm khoá sau nước trong tập: ô không phải liberty cuối
+        của nhóm đối thủ thì khoá sau = khoá hiện tại XOR khoá quân (tính cả mảng 1 lần),
+        còn lại (nước bắt quân) dùng hash_after."""
+        empty = board.grid == EMPTY
+        nb_empty = np.zeros_like(empty)
+        nb_empty[1:, :] |= empty[:-1, :]
+        nb_empty[:-1, :] |= empty[1:, :]
+        nb_empty[:, 1:] |= empty[:, :-1]
+        nb_empty[:, :-1] |= empty[:, 1:]
+        mask = empty & nb_empty
+        if seen is not None and len(seen):
+            n = board.size
+            flat = mask.reshape(-1)
+            captures = [y*n + x for x, y in board.atari_points(-player)]
+            quiet = flat.copy()
+            quiet[captures] = False
+            idx = np.flatnonzero(quiet)
+            after = stone_key_array(n)[player][idx] ^ np.uint64(board.hash_key())
+            flat[idx[seen.seen_many(after, -player)]] = False
+            for p in captures:
+                if flat[p] and seen.seen(board.hash_after(player, p % n, p // n), -player):
+                    flat[p] = False
+        ys, xs = np.nonzero(empty & ~nb_empty)
+        for x, y in zip(xs.tolist(), ys.tolist()):
+            if self.is_legal(board, player, x, y, last_hash=last_hash, seen=seen):
+                mask[y, x] = True
+        return mask
 
+    def _place_and_capture(self, board: Board, player: int, x: int, y: int) -> List[Tuple[int,int]]:
         board.place_stone(player, x, y)
         opp = -player
         captured: List[Tuple[int,int]] = []
-
         # Bắt các nhóm đối thủ không còn liberties
         for nx, ny in board.neighbors(x, y):
-            if board.is_on_board(nx, ny) and board.get(nx, ny) == opp:
-                grp = self._collect_group(board, nx, ny)
-                if not self._liberties_of_group(board, grp):
-                    for c in grp:
-                        captured.append(c)
-                    self._remove_group(board, grp)
+            if board.get(nx, ny) == opp and board.liberty_count(nx, ny) == 0:
+                captured.extend(board.remove_group(nx, ny))
+        return captured
+
+    # --- Chơi nước đi thật sự ---
+    def play_move(self, board: Board, player: int, x: int, y: int, last_hash: Optional[int]=None,
+                  seen: Optional[PositionSet]=None) -> List[Tuple[int,int]]:
+        if not self.is_legal(board, player, x, y, last_hash=last_hash, seen=seen):
+            raise ValueError("Nước đi không hợp lệ (tự sát/ko/đã chiếm/ngoài bàn).")
 
         # (Tự sát đã tránh ở is_legal; không cần check lại nếu tin vào is_legal)
-        return captured
+        return self._place_and_capture(board, player, x, y)
@@ -0,0 +1,133 @@
+# core/scoring.py
+"""
+Chấm điểm diện tích kiểu Tromp-Taylor: điểm của một màu = số quân của màu đó + số ô trống chỉ
+"chạm tới" được màu đó (lan qua các ô trống liền nhau). Không xét quân chết: ván kết thúc bằng
+2 PASS thì quân còn trên bàn coi như sống (playout không lấp mắt luôn dẫn tới thế này).
+- area_score(board): 1 bàn, loang vùng trống bằng bitmask (int Python) - ~10 µs trên 9x9
+- area_scores(grids): cả chồng bàn (N, n, n) một lần, gán nhãn vùng trống bằng mảng
+- game_result(state, komi): bên thắng, điểm, lý do (đầu hàng / đếm điểm)
+"""
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+import numpy as np
+from core.board import EMPTY, BLACK, WHITE
+from config.settings import KOMI
+from core.search.analysis import DIRS, _shift, label_groups
+
+_LAYOUT: Dict[int, Tuple[int, int]] = {}
+
+def _layout(size: int) -> Tuple[int, int]:
+    """(mask mọi ô thật, stride): mỗi hàng thêm 1 cột đệm để dịch trái/phải không tràn sang hàng khác."""
+    out = _LAYOUT.get(size)
+    if out is None:
+        stride = size + 1
+        row = (1 << size) - 1
+        on = 0
+        for y in range(size):
+            on |= row << (y * stride)
+        out = (on, stride)
+        _LAYOUT[size] = out
+    return out
+
+def _bits(grid: np.ndarray, color: int) -> int:
+    n = grid.shape[0]
+    padded = np.zeros((n, n + 1), dtype=bool)
+    padded[:, :n] = grid == color
+    # bit p = y*stride + x (packbits little-endian: phần tử đầu là bit thấp nhất)
+    return int.from_bytes(np.packbits(padded.reshape(-1), bitorder="little").tobytes(), "little")
+
+def _reach(seed: int, empty: int, stride: int, on: int) -> int:
+    """Các ô trống loang tới được từ `seed` (quân) qua ô trống liền nhau."""
+    frontier = seed
+    reached = 0
+    while frontier:
+        grow = ((frontier << 1) | (frontier >> 1) | (frontier << stride) | (frontier >> stride)) & on & empty
+        frontier = grow & ~reached
+        reached |= frontier
+    return reached
+
+@dataclass(frozen=True)
+class AreaCount:
+    """Chi tiết điểm diện tích: quân, đất (ô trống chỉ chạm 1 màu), ô trung lập (chạm cả 2 / không màu nào)."""
+    black_stones: int
+    white_stones: int
+    black_territory: int
+    white_territory: int
+    dame: int
+
+    @property
+    def black(self) -> int:
+        return self.black_stones + self.black_territory
+
+    @property
+    def white(self) -> int:
+        return self.white_stones + self.white_territory
+
+    def score(self, komi: float = 0.0) -> float:
+        """Đen - Trắng - komi."""
+        return self.black - self.white - komi
+
+def area_count(board) -> AreaCount:
+    """`board`: Board / BitBoard / mảng (n, n)."""
+    grid = np.asarray(board.grid if hasattr(board, "grid") else board)
+    on, stride = _layout(grid.shape[0])
+    black, white = _bits(grid, BLACK), _bits(grid, WHITE)
+    empty = on & ~(black | white)
+    rb = _reach(black, empty, stride, on)
+    rw = _reach(white, empty, stride, on)
+    nb, nw = black.bit_count(), white.bit_count()
+    tb, tw = (rb & ~rw).bit_count(), (rw & ~rb).bit_count()
+    return AreaCount(nb, nw, tb, tw, empty.bit_count() - tb - tw)
+
+def area_score(board, komi: float = 0.0) -> float:
+    """Điểm Tromp-Taylor Đen - Trắng - komi của 1 bàn."""
+    return area_count(board).score(komi)
+
+def area_scores(grids: np.ndarray, komi: float = 0.0) -> np.ndarray:
+    """Điểm Tromp-Taylor (Đen - Trắng - komi) cho chồng bàn (N, n, n): gán nhãn vùng trống
+    bằng mảng, vùng thuộc màu c nếu có ít nhất 1 ô kề quân c và không ô nào kề màu kia."""
+    N = grids.shape[0]
+    empty = grids == EMPTY
+    labels = label_groups(empty.astype(np.int8))      # nhãn vùng trống (ô có quân = -1)
+    touch = {}
+    for c in (BLACK, WHITE):
+        near = np.zeros_like(empty)
+        for dy, dx in DIRS:
+            near |= _shift(grids, dy, dx, 2) == c
+        hit = np.zeros(labels.size + 1, dtype=bool)
+        hit[labels[empty & near]] = True
+        touch[c] = hit
+    lab = np.where(empty, labels, labels.size)
+    own_b = empty & touch[BLACK][lab] & ~touch[WHITE][lab]
+    own_w = empty & touch[WHITE][lab] & ~touch[BLACK][lab]
+    stones = grids.reshape(N, -1).sum(axis=1, dtype=np.int64)
+    return stones + own_b.reshape(N, -1).sum(axis=1) - own_w.reshape(N, -1).sum(axis=1) - komi
+
+def winner_of(score: float) -> int:
+    return BLACK if score > 0 else WHITE if score < 0 else EMPTY
+
+@dataclass(frozen=True)
+class GameResult:
+    winner: int                  # BLACK / WHITE / EMPTY (hoà)
+    reason: str                  # "resign" | "score"
+    score: Optional[float]       # Đen - Trắng - komi (None nếu đầu hàng)
+    count: Optional[AreaCount]
+
+    def describe(self) -> str:
+        name = {BLACK: "Đen", WHITE: "Trắng"}
+        if self.reason == "resign":
+            return f"{name[-self.winner]} đầu hàng. {name[self.winner]} thắng."
+        if self.winner == EMPTY:
+            return "Hoà."
+        return f"{name[self.winner]} thắng {abs(self.score):g} điểm."
+
+def game_result(state, komi: float = KOMI) -> GameResult:
+    """Kết quả của ván (thường gọi khi state.is_terminal()); đầu hàng => bên kia thắng."""
+    h = state.move_history
+    if h and h[-1].kind == "RESIGN":
+        # bên vừa đi nước RESIGN là -state.to_play
+        return GameResult(state.to_play, "resign", None, None)
+    cnt = area_count(state.board)
+    score = cnt.score(komi)
+    return GameResult(winner_of(score), "score", score, cnt)
@@ -0,0 +1,211 @@
+# core/search/batch_playout.py
+from __future__ import annotations
+from typing import Optional, Tuple, Union
+import numpy as np
+from core.board import EMPTY, BLACK
+from core.game_state import GameState
+from core.rules import Rules
+from core.scoring import area_scores
+from core.zobrist import side_key, stone_keys
+
+from .analysis import DIRS, _shift, group_tables, label_groups
+
+# giá trị ngoài bàn khi dịch mảng (khác EMPTY/BLACK/WHITE)
+OFF = 2
+# mã nước trong lịch sử: y*size + x, PASS = -1
+PASS = -1
+
+def _ko_point(state: GameState) -> Tuple[int, int]:
+    """(điểm ko, quân ko) dạng chỉ số phẳng, (-1, -1) nếu không có: nước cuối là quân đơn còn đúng
+    1 liberty và thế trước nó = bàn hiện tại bỏ quân đó + 1 quân đối thủ ở liberty ấy (vừa bị bắt)."""
+    mh, hh = state.move_history, state.hash_history
+    if not mh or mh[-1].kind != "PLAY" or len(hh) < 2:
+        return -1, -1
+    b, last = state.board, mh[-1]
+    if b.group_size(last.x, last.y) != 1 or b.liberty_count(last.x, last.y) != 1:
+        return -1, -1
+    (kx, ky), = b.group_liberties(last.x, last.y)
+    n, mover = b.size, -state.to_play
+    keys = stone_keys(n)
+    before = b.hash_key() ^ keys[mover][last.y * n + last.x] ^ keys[state.to_play][ky * n + kx]
+    if before ^ side_key(mover) != hh[-2]:
+        return -1, -1
+    return ky * n + kx, last.y * n + last.x
+
+class BatchPlayout:
+    """
+    Chạy N ván cờ độc lập song song (lockstep) trên mảng (N, size, size).
+    Luật giống core/rules.py: không tự sát, bắt nhóm đối thủ hết liberties, simple-ko
+    (cấm bắt lại ngay 1 quân vừa bắt 1 quân); mọi bước làm bằng phép toán mảng:
+    nhãn nhóm -> liberties theo điểm -> mặt nạ hợp lệ -> chọn ngẫu nhiên -> đặt quân/bắt quân.
+    Nhãn nhóm chỉ gán đầy đủ 1 lần; sau mỗi bước chỉ gộp nhãn các nhóm kề quân mới và xoá nhãn nhóm bị bắt.
+    Ván dừng khi 2 bên pass liên tiếp (bên không còn nước hợp lệ thì pass).
+    Superko không theo dõi trong playout; `banned` (N, n, n) chỉ cấm thêm các ô ở nước đầu tiên
+    (vd. các ô superko cấm ở thế gốc, xem from_state).
+    """
+    def __init__(self, grids: np.ndarray, to_play: Union[int, np.ndarray] = BLACK,
+                 ko: Optional[np.ndarray] = None, seed: Optional[int] = None,
+                 avoid_eyes: bool = True, record: bool = False, banned: Optional[np.ndarray] = None):
+        self.grids = np.array(grids, dtype=np.int8)
+        N, n = self.grids.shape[0], self.grids.shape[-1]
+        self.n, self.size = N, n
+        self.to_play = np.broadcast_to(np.asarray(to_play, dtype=np.int8), (N,)).copy()
+        # điểm ko (chỉ số phẳng) cấm bên to_play đi, -1 = không có; kèm quân đơn vừa bắt ở đó
+        self.ko = np.full(N, -1, dtype=np.int64) if ko is None else np.asarray(ko, dtype=np.int64).copy()
+        self.ko_stone = np.full(N, -1, dtype=np.int64)
+        self.passes = np.zeros(N, dtype=np.int8)
+        self.done = np.zeros(N, dtype=bool)
+        self.moves_played = 0
+        self.rng = np.random.default_rng(seed)
+        self.avoid_eyes = avoid_eyes
+        self.history = [] if record else None
+        self.banned = None if banned is None else np.broadcast_to(np.asarray(banned, dtype=bool), self.grids.shape)
+        # nhãn nhóm (như label_groups), gán 1 lần rồi cập nhật dần theo từng nước
+        self._labels = label_groups(self.grids)
+
+    @staticmethod
+    def from_state(state: GameState, n: int, **kw) -> "BatchPlayout":
+        """N bản sao của `state`: điểm ko lấy từ nước cuối (quân đơn vừa bắt đúng 1 quân);
+        với superko, các ô state cấm mà simple-ko không cấm thành `banned` cho nước đầu."""
+        size = state.board.size
+        grids = np.broadcast_to(np.asarray(state.board.grid, dtype=np.int8), (n, size, size))
+        banned = None
+        if state.ko_rule != "simple":
+            h = state.hash_history
+            free = Rules().legal_mask(state.board, state.to_play, last_hash=h[-2] if len(h) >= 2 else None)
+            banned = free & ~state.legal_mask()
+            if not banned.any():
+                banned = None
+        ko, stone = _ko_point(state)
+        sim = BatchPlayout(grids, state.to_play, np.full(n, ko), banned=banned, **kw)
+        sim.ko_stone[:] = stone
+        if state.move_history and state.move_history[-1].kind == "PASS":
+            sim.passes[:] = 1
+        return sim
+
+    # ------------- Bảng nhóm của cả lô -------------
+    def _point_tables(self):
+        """(nhãn nhóm theo điểm, số liberties của nhóm tại mỗi điểm; 0 ở ô trống)."""
+        labels = self._labels
+        reps, _, _, libs = group_tables(self.grids, labels)
+        by_rep = np.zeros(labels.size + 1, dtype=np.int64)
+        by_rep[reps] = libs
+        return labels, by_rep[np.where(labels >= 0, labels, labels.size)]
+
+    def legal_mask(self, tables=None) -> np.ndarray:
+        """Mặt nạ (N, n, n) nước hợp lệ cho bên to_play của từng ván (cùng ngữ nghĩa Rules.is_legal)."""
+        g = self.grids
+        _, plibs = tables if tables is not None else self._point_tables()
+        me = self.to_play[:, None, None]
+        ok = np.zeros(g.shape, dtype=bool)
+        for dy, dx in DIRS:
+            c = _shift(g, dy, dx, OFF)
+            l = _shift(plibs, dy, dx, 0)
+            # ô trống kề / nối nhóm mình còn > 1 liberty / bắt nhóm đối thủ còn đúng 1 liberty
+            ok |= (c == EMPTY) | ((c == me) & (l > 1)) | ((c == -me) & (l == 1))
+        legal = (g == EMPTY) & ok & ~self.done[:, None, None]
+        if self.banned is not None:
+            legal &= ~self.banned
+        has_ko = np.flatnonzero(self.ko >= 0)
+        if has_ko.size:
+            # bắt lại ở điểm ko chỉ bị cấm khi chỉ bắt đúng quân ko (lặp lại bàn cờ 2 nước trước)
+            n = self.size
+            ky, kx = np.divmod(self.ko[has_ko], n)
+            extra = np.zeros(has_ko.size, dtype=bool)
+            for dy, dx in DIRS:
+                ny, nx = ky + dy, kx + dx
+                on = (ny >= 0) & (ny < n) & (nx >= 0) & (nx < n)
+                ny, nx = np.clip(ny, 0, n - 1), np.clip(nx, 0, n - 1)
+                opp = g[has_ko, ny, nx] == -self.to_play[has_ko]
+                extra |= on & opp & (plibs[has_ko, ny, nx] == 1) & (ny * n + nx != self.ko_stone[has_ko])
+            legal.reshape(self.n, -1)[has_ko[~extra], self.ko[has_ko[~extra]]] = False
+        return legal
+
+    def _own_eyes(self) -> np.ndarray:
+        me = self.to_play[:, None, None]
+        eye = self.grids == EMPTY
+        for dy, dx in DIRS:
+            c = _shift(self.grids, dy, dx, OFF)
+            eye &= (c == me) | (c == OFF)
+        return eye
+
+    # ------------- Một bước cho cả lô -------------
+    def step(self, moves: Optional[np.ndarray] = None) -> np.ndarray:
+        """Mỗi ván chưa xong đi 1 nước. `moves` (N,) mã nước cho sẵn (phải hợp lệ),
+        None => chọn ngẫu nhiên đều trong các nước hợp lệ (bỏ qua mắt của mình nếu avoid_eyes).
+        Trả về mã nước đã đi của từng ván (PASS nếu không đi / đã xong)."""
+        N, n = self.n, self.size
+        labels, plibs = tables = self._point_tables()
+        if moves is None:
+            cand = self.legal_mask(tables)
+            if self.avoid_eyes:
+                cand &= ~self._own_eyes()
+            keys = np.where(cand.reshape(N, -1), self.rng.random((N, n * n)), -1.0)
+            best = keys.argmax(axis=1)
+            moves = np.where(keys[np.arange(N), best] >= 0, best, PASS)
+        moves = np.where(self.done, PASS, np.asarray(moves, dtype=np.int64))
+
+        play = np.flatnonzero(moves >= 0)
+        p = moves[play]
+        ys, xs = np.divmod(p, n)
+        me = self.to_play[play]
+        # nhóm đối thủ kề điểm vừa đi chỉ còn 1 liberty (chính là điểm đó) -> bị bắt;
+        # quân mới + các nhóm mình kề nó gộp 1 nhãn (chỉ số phẳng của quân mới)
+        new_lab = play * (n * n) + p
+        remap = np.arange(labels.size)
+        is_cap = np.zeros(labels.size + 1, dtype=bool)
+        own_nb = np.zeros(play.size, dtype=bool)
+        for dy, dx in DIRS:
+            ny, nx = ys + dy, xs + dx
+            on = (ny >= 0) & (ny < n) & (nx >= 0) & (nx < n)
+            ny, nx = np.clip(ny, 0, n - 1), np.clip(nx, 0, n - 1)
+            c = self.grids[play, ny, nx]
+            join = on & (c == me)
+            own_nb |= join
+            remap[labels[play[join], ny[join], nx[join]]] = new_lab[join]
+            hit = on & (c == -me) & (plibs[play, ny, nx] == 1)
+            is_cap[labels[play[hit], ny[hit], nx[hit]]] = True
+        self.grids[play, ys, xs] = me
+        captured = is_cap[np.where(labels >= 0, labels, labels.size)]
+        n_cap = captured.reshape(N, -1).sum(axis=1)
+        self.grids[captured] = EMPTY
+        self._labels = np.where(labels >= 0, remap[labels], -1)
+        self._labels[play, ys, xs] = new_lab
+        self._labels[captured] = -1
+
+        # simple-ko: bắt đúng 1 quân bằng 1 quân đơn độc chỉ còn 1 liberty -> cấm bắt lại ngay
+        self.ko[:] = -1
+        self.ko_stone[:] = -1
+        single = play[(n_cap[play] == 1) & ~own_nb]
+        if single.size:
+            libs1 = np.zeros(single.size, dtype=np.int64)
+            sy, sx = np.divmod(moves[single], n)
+            for dy, dx in DIRS:
+                ny, nx = sy + dy, sx + dx
+                on = (ny >= 0) & (ny < n) & (nx >= 0) & (nx < n)
+                libs1 += on & (self.grids[single, np.clip(ny, 0, n - 1), np.clip(nx, 0, n - 1)] == EMPTY)
+            ko_games = single[libs1 == 1]
+            self.ko[ko_games] = captured.reshape(N, -1)[ko_games].argmax(axis=1)
+            self.ko_stone[ko_games] = moves[ko_games]
+
+        live = ~self.done
+        self.passes = np.where(moves >= 0, 0, self.passes + live).astype(np.int8)
+        self.done |= self.passes >= 2
+        self.to_play = np.where(live, -self.to_play, self.to_play).astype(np.int8)
+        self.moves_played += 1
+        self.banned = None
+        if self.history is not None:
+            self.history.append(moves)
+        return moves
+
+    def run(self, max_moves: Optional[int] = None) -> np.ndarray:
+        """Chơi tới khi mọi ván xong (hoặc đủ max_moves bước, mặc định 3*size^2); trả về area_scores."""
+        max_moves = 3 * self.size * self.size if max_moves is None else max_moves
+        for _ in range(max_moves):
+            if self.done.all():
+                break
+            self.step()
+        return self.scores()
+
+    def scores(self) -> np.ndarray:
+        return area_scores(self.grids)
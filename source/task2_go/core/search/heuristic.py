@@ -1,77 +1,29 @@
 # core/search/heuristic.py
 from __future__ import annotations
-from typing import Set, Tuple
+from typing import Optional, Tuple
 import numpy as np
-from core.board import Board, BLACK, WHITE, EMPTY
+from core.board import BLACK, WHITE
 from core.game_state import GameState
+from .analysis import BoardAnalysis, analyze, analyze_batch
+from .ladder import LadderReader
 
 Coord = Tuple[int, int]
 
-def _collect_group(board: Board, x: int, y: int) -> Set[Coord]:
-    """BFS gom nhóm cùng màu với (x,y)."""
-    color = board.get(x, y)
-    if color == EMPTY: return set()
-    q = [(x, y)]
-    seen: Set[Coord] = {(x, y)}
-    while q:
-        cx, cy = q.pop()
-        for nx, ny in board.neighbors(cx, cy):
-            if (nx, ny) not in seen and board.get(nx, ny) == color:
-                seen.add((nx, ny)); q.append((nx, ny))
-    return seen
-
-def _group_liberties(board: Board, group: Set[Coord]) -> Set[Coord]:
-    libs: Set[Coord] = set()
-    for x, y in group:
-        for nx, ny in board.neighbors(x, y):
-            if board.get(nx, ny) == EMPTY:
-                libs.add((nx, ny))
-    return libs
-
-def _sum_liberties(board: Board, color: int) -> int:
-    """Tổng liberties theo nhóm (không đếm trùng trong cùng nhóm)."""
-    seen: Set[Coord] = set()
-    total = 0
-    for y in range(board.size):
-        for x in range(board.size):
-            if board.get(x, y) == color and (x, y) not in seen:
-                g = _collect_group(board, x, y)
-                seen |= g
-                total += len(_group_liberties(board, g))
-    return total
-
-def _capture_potential(board: Board, color: int) -> int:
-    """Số quân đối thủ đang ở thế nguy (nhóm liberties = 1)."""
-    opp = -color
-    seen: Set[Coord] = set()
-    cnt = 0
-    for y in range(board.size):
-        for x in range(board.size):
-            if board.get(x, y) == opp and (x, y) not in seen:
-                g = _collect_group(board, x, y)
-                seen |= g
-                if len(_group_liberties(board, g)) == 1:
-                    cnt += len(g)
-    return cnt
-
-def stone_diff(state: GameState, player: int) -> float:
-    g = state.board.grid
-    black = int((g == BLACK).sum())
-    white = int((g == WHITE).sum())
-    diff = black - white
+def stone_diff(state: GameState, player: int, analysis: Optional[BoardAnalysis] = None) -> float:
+    a = analysis or analyze(state.board)
+    diff = a.stones[BLACK] - a.stones[WHITE]
     return float(diff if player == BLACK else -diff)
 
-def liberty_diff(state: GameState, player: int) -> float:
-    b_lib = _sum_liberties(state.board, BLACK)
-    w_lib = _sum_liberties(state.board, WHITE)
-    diff = b_lib - w_lib
+def liberty_diff(state: GameState, player: int, analysis: Optional[BoardAnalysis] = None) -> float:
+    a = analysis or analyze(state.board)
+    diff = a.liberties[BLACK] - a.liberties[WHITE]
     return float(diff if player == BLACK else -diff)
 
-def capture_threat_balance(state: GameState, player: int) -> float:
+def capture_threat_balance(state: GameState, player: int, analysis: Optional[BoardAnalysis] = None) -> float:
     """Dương nếu mình đang đe doạ bắt nhiều hơn đối thủ."""
-    mine = _capture_potential(state.board, player)
-    opp  = _capture_potential(state.board, -player)
-    return float(mine - opp)
+    a = analysis or analyze(state.board)
+    # mine = số quân đối thủ đang bị atari, opp = số quân mình đang bị atari
+    return float(a.atari_stones[-player] - a.atari_stones[player])
 
 def heuristic_score(state: GameState, player: int) -> float:
     """
@@ -79,10 +31,58 @@ def heuristic_score(state: GameState, player: int) -> float:
       - stone_diff: chênh quân
       - liberty_diff: chênh tự do
       - capture_threat_balance: thế bắt/đe doạ
+    Cả 3 thành phần đọc chung 1 lần phân tích bàn cờ (analyze).
     """
     a, b, c = 1.0, 0.4, 0.8
+    an = analyze(state.board)
+    return (
+        a * stone_diff(state, player, an)
+        + b * liberty_diff(state, player, an)
+        + c * capture_threat_balance(state, player, an)
+    )
+
+# đọc thang dùng chung cho heuristic (cache theo khoá bàn cờ nên dùng lại được giữa các lần search)
+_LADDERS = LadderReader()
+
+def ladder_balance(state: GameState, player: int, reader: Optional[LadderReader] = None) -> float:
+    """Chênh số quân chết theo đọc thang (nhóm 1-2 liberties không cứu được khi state.to_play đi trước)."""
+    dead = (reader or _LADDERS).dead_stones(state.board, state.to_play)
+    return float(dead[-player] - dead[player])
+
+def heuristic_score_ladders(state: GameState, player: int) -> float:
+    """heuristic_score + ladder_balance: nhóm bị thang bắt tính như đã mất (không có bản batch)."""
+    return heuristic_score(state, player) + 1.0 * ladder_balance(state, player)
+
+# --- Bản batch: chấm cả chồng bàn (N, size, size) trong 1 lần gọi, kết quả trùng bản đơn ---
+def _sign(player: int) -> float:
+    return 1.0 if player == BLACK else -1.0
+
+def stone_diff_batch(grids: np.ndarray, player: int, analysis=None) -> np.ndarray:
+    an = analysis or analyze_batch(grids)
+    return _sign(player) * (an["stones"][BLACK] - an["stones"][WHITE])
+
+def liberty_diff_batch(grids: np.ndarray, player: int, analysis=None) -> np.ndarray:
+    an = analysis or analyze_batch(grids)
+    return _sign(player) * (an["liberties"][BLACK] - an["liberties"][WHITE])
+
+def capture_threat_balance_batch(grids: np.ndarray, player: int, analysis=None) -> np.ndarray:
+    an = analysis or analyze_batch(grids)
+    return an["atari_stones"][-player] - an["atari_stones"][player]
+
+def heuristic_score_batch(grids: np.ndarray, player: int) -> np.ndarray:
+    """heuristic_score cho N bàn: `grids` dạng (N, size, size) -> mảng điểm (N,)."""
+    grids = np.asarray(grids)
+    if grids.shape[0] == 0:
+        return np.zeros(0)
+    a, b, c = 1.0, 0.4, 0.8
+    an = analyze_batch(grids)
     return (
-        a * stone_diff(state, player)
-        + b * liberty_diff(state, player)
-        + c * capture_threat_balance(state, player)
+        a * stone_diff_batch(grids, player, an)
+        + b * liberty_diff_batch(grids, player, an)
+        + c * capture_threat_balance_batch(grids, player, an)
     )
+
+# heuristic đơn -> bản batch tương ứng (MinimaxSearcher dùng để chấm tầng lá theo lô)
+BATCH_HEURISTICS = {heuristic_score: heuristic_score_batch}
+# tên -> heuristic (chọn từ cấu hình / dòng lệnh, vd. benchmarks.arena "minimax:heuristic=ladder")
+HEURISTICS = {"default": heuristic_score, "ladder": heuristic_score_ladders}
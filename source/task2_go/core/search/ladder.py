@@ -0,0 +1,235 @@
+# core/search/ladder.py
+"""
+Đọc thang (ladder) / đuổi bắt liberties cho nhóm còn 1-2 liberties, thay vì tăng độ sâu minimax.
+Bàn cờ nhẹ: 2 bitmask (int Python, mỗi hàng thêm 1 cột đệm như core/scoring.py) cho bên bị đuổi
+(phòng thủ) và bên đuổi (tấn công); mỗi nước chỉ là vài phép dịch / AND / OR, không copy Board.
+- Phòng thủ đang bị atari, tới lượt: thoát nếu có nước (nối dài ở liberty cuối, hoặc bắt nhóm tấn công
+  kề đang bị atari) đưa nhóm lên >= 3 liberties, hoặc lên 2 liberties mà bên tấn công không đuổi tiếp được.
+- Nhóm có 2 liberties, bên tấn công tới lượt: bắt được nếu đánh vào 1 trong 2 liberties mà phòng thủ không thoát.
+Bỏ qua ko; đọc quá max_depth nước hoặc quá max_nodes thế cờ cho 1 câu hỏi thì coi như thoát
+(an toàn cho search; đuổi bắt nhiều nhánh có thể nổ tổ hợp).
+Kết quả gốc cache theo (khoá Zobrist của bàn, ô nhỏ nhất của nhóm, loại câu hỏi).
+"""
+from __future__ import annotations
+from typing import Dict, Optional, Tuple
+from core.board import BLACK, WHITE, EMPTY
+from core.scoring import _bits, _layout
+
+def _low_bits(m: int):
+    while m:
+        b = m & -m
+        yield b
+        m ^= b
+
+
+class LadderReader:
+    def __init__(self, max_depth: int = 80, max_nodes: int = 400, max_entries: int = 200_000):
+        self.max_depth = max_depth
+        self.max_nodes = max_nodes
+        self._budget = 0
+        self.max_entries = max_entries
+        self._cache: Dict[Tuple[int, int, str], bool] = {}
+        self.hits = 0
+        self.misses = 0
+        # bố cục bit của kích thước bàn đang đọc (đặt lại mỗi lần gọi từ ngoài)
+        self._on = 0
+        self._stride = 0
+        self._size = 0
+        # bitmask của bàn gần nhất (MoveOrderer hỏi nhiều nước trên cùng 1 bàn)
+        self._last: Tuple[int, int, int] = (-1, 0, 0)
+
+    # ------------- Phép toán bitmask -------------
+    def _nb(self, m: int) -> int:
+        s = self._stride
+        return ((m << 1) | (m >> 1) | (m << s) | (m >> s)) & self._on
+
+    def _flood(self, seed: int, stones: int) -> int:
+        grp = seed
+        while True:
+            nxt = (grp | self._nb(grp)) & stones
+            if nxt == grp:
+                return grp
+            grp = nxt
+
+    def _libs(self, grp: int, me: int, opp: int) -> int:
+        return self._nb(grp) & ~(me | opp)
+
+    def _play(self, me: int, opp: int, p: int) -> Optional[Tuple[int, int]]:
+        """`me` đặt quân ở bit p, bắt nhóm `opp` hết liberties; None nếu tự sát."""
+        me |= p
+        for b in _low_bits(self._nb(p) & opp):
+            if b & opp:
+                grp = self._flood(b, opp)
+                if not self._libs(grp, me, opp):
+                    opp &= ~grp
+        if not self._libs(self._flood(p, me), me, opp):
+            return None
+        return me, opp
+
+    # ------------- Đọc thang -------------
+    def _defender_escapes(self, d: int, a: int, g: int, depth: int) -> bool:
+        """Nhóm phòng thủ chứa bit g đang còn 1 liberty, phòng thủ tới lượt."""
+        self._budget -= 1
+        if depth > self.max_depth or self._budget < 0:
+            return True
+        grp = self._flood(g, d)
+        tries = self._libs(grp, d, a)
+        # bắt nhóm tấn công kề đang bị atari
+        seen = 0
+        for b in _low_bits(self._nb(grp) & a):
+            if b & seen:
+                continue
+            ag = self._flood(b, a)
+            seen |= ag
+            lib = self._libs(ag, a, d)
+            if lib & (lib - 1) == 0:
+                tries |= lib
+        for p in _low_bits(tries):
+            nxt = self._play(d, a, p)
+            if nxt is None:
+                continue
+            d2, a2 = nxt
+            n = self._libs(self._flood(g, d2), d2, a2).bit_count()
+            if n >= 3 or (n == 2 and not self._attacker_captures(d2, a2, g, depth + 1)):
+                return True
+        return False
+
+    def _attacker_captures(self, d: int, a: int, g: int, depth: int) -> bool:
+        """Nhóm phòng thủ chứa bit g còn 2 liberties, tấn công tới lượt."""
+        self._budget -= 1
+        if depth > self.max_depth or self._budget < 0:
+            return False
+        libs = self._libs(self._flood(g, d), d, a)
+        for p in _low_bits(libs):
+            nxt = self._play(a, d, p)
+            if nxt is None:
+                continue
+            a2, d2 = nxt
+            n = self._libs(self._flood(g, d2), d2, a2).bit_count()
+            if n == 1 and not self._defender_escapes(d2, a2, g, depth + 1):
+                return True
+        return False
+
+    # ------------- API trên Board / BitBoard -------------
+    def _setup(self, board) -> Tuple[int, int]:
+        h = board.hash_key()
+        n = board.size
+        if n != self._size:
+            self._on, self._stride = _layout(n)
+            self._size = n
+            self._last = (-1, 0, 0)
+        if self._last[0] != h:
+            grid = board.grid
+            self._last = (h, _bits(grid, BLACK), _bits(grid, WHITE))
+        return self._last[1], self._last[2]
+
+    def _bit(self, x: int, y: int) -> int:
+        return 1 << (y * self._stride + x)
+
+    def _cached(self, key: Tuple[int, int, str], fn) -> bool:
+        v = self._cache.get(key)
+        if v is not None:
+            self.hits += 1
+            return v
+        self.misses += 1
+        if len(self._cache) >= self.max_entries:
+            self._cache.clear()
+        self._budget = self.max_nodes
+        v = fn()
+        self._cache[key] = v
+        return v
+
+    def _group_key(self, g: int, stones: int) -> int:
+        grp = self._flood(g, stones)
+        return (grp & -grp).bit_length()
+
+    def is_dead(self, board, x: int, y: int, to_play: int) -> bool:
+        """Nhóm tại (x,y) có bị bắt chắc chắn không khi `to_play` đi trước:
+        1 liberty: chủ nhóm đi trước mà không thoát (đối thủ đi trước => chết ngay);
+        2 liberties: đối thủ đi trước và đuổi thang bắt được; >= 3: False."""
+        black, white = self._setup(board)
+        color = board.get(x, y)
+        if color == EMPTY:
+            return False
+        d, a = (black, white) if color == BLACK else (white, black)
+        return self._dead(board.hash_key(), d, a, self._bit(x, y), color, to_play)
+
+    def _dead(self, h: int, d: int, a: int, g: int, color: int, to_play: int) -> bool:
+        grp = self._flood(g, d)
+        n = self._libs(grp, d, a).bit_count()
+        rep = (grp & -grp).bit_length()
+        if n == 1:
+            if to_play != color:
+                return True
+            return self._cached((h, rep, "escape"), lambda: not self._defender_escapes(d, a, g, 0))
+        if n == 2 and to_play != color:
+            return self._cached((h, rep, "ladder"), lambda: self._attacker_captures(d, a, g, 0))
+        return False
+
+    def move_captures(self, board, player: int, x: int, y: int) -> bool:
+        """Nước (x,y) của `player` đưa 1 nhóm đối thủ kề vào atari mà nhóm đó không thoát được (thang / net)."""
+        black, white = self._setup(board)
+        me, opp = (black, white) if player == BLACK else (white, black)
+        p = self._bit(x, y)
+        nxt = self._play(me, opp, p)
+        if nxt is None:
+            return False
+        me2, opp2 = nxt
+        h = None
+        seen = 0
+        for b in _low_bits(self._nb(p) & opp2):
+            if b & seen:
+                continue
+            grp = self._flood(b, opp2)
+            seen |= grp
+            if self._libs(grp, opp2, me2).bit_count() != 1:
+                continue
+            if h is None:
+                h = board.hash_after(player, x, y)
+            key = (h, (grp & -grp).bit_length(), "escape")
+            if self._cached(key, lambda: not self._defender_escapes(opp2, me2, b, 0)):
+                return True
+        return False
+
+    def escape_fails(self, board, player: int, x: int, y: int) -> bool:
+        """`player` có nhóm kề (x,y) đang bị atari; nối ra ở (x,y) vẫn bị bắt (<= 1 liberty, hoặc 2 mà thang chạy)."""
+        black, white = self._setup(board)
+        me, opp = (black, white) if player == BLACK else (white, black)
+        p = self._bit(x, y)
+        nxt = self._play(me, opp, p)
+        if nxt is None:
+            return True
+        me2, opp2 = nxt
+        n = self._libs(self._flood(p, me2), me2, opp2).bit_count()
+        if n >= 3:
+            return False
+        if n <= 1:
+            return True
+        key = (board.hash_after(player, x, y), self._group_key(p, me2), "ladder")
+        return self._cached(key, lambda: self._attacker_captures(me2, opp2, p, 0))
+
+    def dead_stones(self, board, to_play: int) -> Dict[int, int]:
+        """{màu: số quân thuộc các nhóm chết theo is_dead (1-2 liberties) khi `to_play` đi trước}."""
+        black, white = self._setup(board)
+        out = {BLACK: 0, WHITE: 0}
+        h = None
+        for color, d, a in ((BLACK, black, white), (WHITE, white, black)):
+            seen = 0
+            for b in _low_bits(d):
+                if b & seen:
+                    continue
+                grp = self._flood(b, d)
+                seen |= grp
+                n = self._libs(grp, d, a).bit_count()
+                if n > 2 or (n == 2 and to_play == color):
+                    continue
+                if h is None:
+                    h = board.hash_key()
+                if self._dead(h, d, a, b, color, to_play):
+                    out[color] += grp.bit_count()
+        return out
+
+    def stats(self) -> Dict[str, float]:
+        total = self.hits + self.misses
+        return {"entries": len(self._cache), "hits": self.hits, "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0}
@@ -0,0 +1,224 @@
+# core/search/mcts.py
+from __future__ import annotations
+from typing import Dict, List, Optional, Tuple
+import math
+import random
+import threading
+import time
+from core.board import EMPTY, BLACK, WHITE
+from core.game_state import GameState
+from core.move import Move
+from core.rules import Rules
+from core.scoring import area_score
+from config.settings import TIMEBOX_SEC, KOMI
+
+from .position import SearchPosition
+from .time_manager import TimeManager, MoveBudget
+
+Coord = Tuple[int, int]
+
+# --- Playout nhẹ: nước ngẫu nhiên hợp lệ, không tự lấp mắt mình ---
+def _is_own_eye(board, player: int, x: int, y: int) -> bool:
+    return all(board.get(nx, ny) == player for nx, ny in board.neighbors(x, y))
+
+def random_playout(board, to_play: int, prev_hash: Optional[int], rng: random.Random,
+                   max_moves: Optional[int] = None, rules: Optional[Rules] = None) -> int:
+    """Chơi ngẫu nhiên TRÊN `board` (sửa tại chỗ) tới khi 2 bên cùng pass / đủ max_moves.
+    prev_hash: khoá (có lượt) của trạng thái trước nước vừa đi, để chặn ko như Rules.is_legal.
+    Trả về điểm Tromp-Taylor Đen - Trắng (chưa trừ komi)."""
+    rules = rules or Rules()
+    n = board.size
+    empties: List[Coord] = [(x, y) for y in range(n) for x in range(n) if board.get(x, y) == EMPTY]
+    max_moves = n * n * 3 if max_moves is None else max_moves
+    cur_hash = board.hash_key(to_play)
+    passes = 0
+    for _ in range(max_moves):
+        played = False
+        k = len(empties)
+        start = rng.randrange(k) if k else 0
+        for j in range(k):
+            i = (start + j) % k
+            x, y = empties[i]
+            if _is_own_eye(board, to_play, x, y) or not rules.is_legal(board, to_play, x, y, last_hash=prev_hash):
+                continue
+            captured = rules._place_and_capture(board, to_play, x, y)
+            empties[i] = empties[-1]; empties.pop()
+            empties.extend(captured)
+            played = True
+            break
+        passes = 0 if played else passes + 1
+        if passes >= 2:
+            break
+        to_play = -to_play
+        prev_hash, cur_hash = cur_hash, board.hash_key(to_play)
+    return area_score(board)
+
+
+class MctsNode:
+    """Node của cây MCTS. `wins`/`visits` tính theo góc nhìn bên vừa đi nước `move` (player)."""
+    __slots__ = ("move", "player", "parent", "children", "untried", "visits", "wins")
+
+    def __init__(self, move: Optional[Move], player: int, parent: Optional["MctsNode"] = None):
+        self.move = move
+        self.player = player
+        self.parent = parent
+        self.children: Dict[Move, MctsNode] = {}
+        self.untried: Optional[List[Move]] = None     # sinh khi mở rộng lần đầu
+        self.visits = 0
+        self.wins = 0.0
+
+    def uct_child(self, c: float) -> "MctsNode":
+        log_n = math.log(self.visits)
+        return max(self.children.values(),
+                   key=lambda ch: ch.wins / ch.visits + c * math.sqrt(log_n / ch.visits))
+
+
+class MctsSearcher:
+    """
+    Monte Carlo Tree Search (UCT) + playout ngẫu nhiên nhẹ.
+    - time_limit_sec: ngân sách thời gian mỗi nước (None => chỉ theo playouts)
+    - time_manager: có clock_remaining thì chia giờ theo đồng hồ (dùng mức soft, MCTS dừng lúc nào cũng được)
+    - playouts: số playout tối đa mỗi nước (None => chỉ theo thời gian)
+    - uct_c: hằng số khám phá của UCT
+    - komi: điểm bù cho Trắng khi chấm playout
+    Cây được giữ giữa các nước: lần search sau đi theo các nước đã chơi từ gốc cũ
+    và dùng lại cây con khớp (không khớp thì dựng lại).
+    """
+    def __init__(self, time_limit_sec: Optional[float] = TIMEBOX_SEC, playouts: Optional[int] = None,
+                 uct_c: float = 1.4, komi: float = KOMI, seed: Optional[int] = None,
+                 time_manager: Optional[TimeManager] = None):
+        if time_limit_sec is None and playouts is None:
+            raise ValueError("Cần ít nhất một ngân sách: time_limit_sec hoặc playouts.")
+        self.time_limit_sec = time_limit_sec
+        self.time_manager = time_manager or TimeManager()
+        self.clock_remaining: Optional[float] = None
+        self.pondering = False
+        self._budget = MoveBudget(time_limit_sec, time_limit_sec)
+        self._root_state: Optional[GameState] = None
+        self.playouts = playouts
+        self.uct_c = uct_c
+        self.komi = komi
+        self.rng = random.Random(seed)
+        self._rules = Rules()
+        self.root: Optional[MctsNode] = None
+        self._root_hashes: List[int] = []
+        self._root_moves = 0
+        self.last_playouts = 0
+        self.reused_visits = 0
+        self._t0 = 0.0
+        # đặt từ thread khác để dừng search đang chạy (UI / ponder); người gọi tự clear
+        self.stop_event = threading.Event()
+
+    # ------------- Public API -------------
+    def search(self, state: GameState, player: int) -> Move:
+        """Nước được thăm nhiều nhất ở gốc. pondering => chạy tới khi ponderhit()/stop()."""
+        self._t0 = time.perf_counter()
+        self._root_state = state
+        self._budget = MoveBudget(None, None) if self.pondering else \
+            self.time_manager.budget(state, self.clock_remaining, self.time_limit_sec)
+        self._advance_root(state)
+        pos = SearchPosition.from_state(state)
+        self.last_playouts = 0
+        while True:
+            self._iterate(pos)
+            self.last_playouts += 1
+            if self.playouts is not None and self.last_playouts >= self.playouts and not self.pondering:
+                break
+            limit = self._budget.soft
+            if limit is not None and time.perf_counter() - self._t0 >= limit:
+                break
+            if self.stop_event.is_set():
+                break
+        if not self.root.children:
+            return Move.pass_()
+        return max(self.root.children.values(), key=lambda ch: ch.visits).move
+
+    def stop(self) -> None:
+        """Yêu cầu dừng search đang chạy (gọi được từ thread khác)."""
+        self.stop_event.set()
+
+    def ponderhit(self, clock_remaining: Optional[float] = None) -> None:
+        """Đối thủ đi đúng nước đang ponder: từ bây giờ search có ngân sách bình thường."""
+        self.clock_remaining = clock_remaining
+        self.pondering = False
+        if self._root_state is not None:
+            budget = self.time_manager.budget(self._root_state, clock_remaining, self.time_limit_sec)
+            self._t0 = time.perf_counter()
+            self._budget = budget
+
+    def ponder_move(self) -> Optional[Move]:
+        """Nước trả lời được dự đoán: con thăm nhiều nhất của nước tốt nhất ở gốc."""
+        if self.root is None or not self.root.children:
+            return None
+        best = max(self.root.children.values(), key=lambda ch: ch.visits)
+        if not best.children:
+            return None
+        return max(best.children.values(), key=lambda ch: ch.visits).move
+
+    def stats(self) -> Dict[str, float]:
+        """Số playout của lần search gần nhất, số lượt thăm dùng lại từ cây cũ, thống kê nước tốt nhất."""
+        out: Dict[str, float] = {"playouts": self.last_playouts, "reused_visits": self.reused_visits}
+        if self.root is not None and self.root.children:
+            best = max(self.root.children.values(), key=lambda ch: ch.visits)
+            out.update(root_visits=self.root.visits, best_visits=best.visits,
+                       best_winrate=best.wins / best.visits)
+        return out
+
+    # ------------- Dùng lại cây -------------
+    def _advance_root(self, state: GameState) -> None:
+        """Đi theo các nước đã chơi kể từ gốc cũ; giữ cây con khớp, không khớp thì dựng gốc mới."""
+        node = self.root
+        k = self._root_moves
+        if node is not None and len(state.hash_history) >= len(self._root_hashes) \
+                and state.hash_history[:len(self._root_hashes)] == self._root_hashes:
+            for mv in state.move_history[k:]:
+                node = node.children.get(mv)
+                if node is None:
+                    break
+        else:
+            node = None
+        if node is None:
+            node = MctsNode(state.move_history[-1] if state.move_history else None, -state.to_play)
+        node.parent = None
+        self.root = node
+        self.reused_visits = node.visits
+        self._root_hashes = list(state.hash_history)
+        self._root_moves = len(state.move_history)
+
+    # ------------- Một vòng MCTS -------------
+    def _iterate(self, pos: SearchPosition) -> None:
+        node = self.root
+        depth = 0
+        # 1) chọn theo UCT tới node còn nước chưa thử / node cuối
+        while node.untried is not None and not node.untried and node.children:
+            node = node.uct_child(self.uct_c)
+            pos.make_move(node.move); depth += 1
+        # 2) mở rộng 1 nước
+        if not pos.is_terminal():
+            if node.untried is None:
+                node.untried = [m for m in pos.legal_moves() if m.kind != "RESIGN"]
+                self.rng.shuffle(node.untried)
+            if node.untried:
+                mv = node.untried.pop()
+                child = MctsNode(mv, pos.to_play, node)
+                node.children[mv] = child
+                pos.make_move(mv); depth += 1
+                node = child
+        # 3) playout trên bản sao bàn cờ
+        if pos.is_terminal():
+            score = area_score(pos.board)
+        else:
+            board = pos.board.copy()
+            score = random_playout(board, pos.to_play, pos._last_hash(), self.rng, rules=self._rules)
+        diff = score - self.komi
+        winner = BLACK if diff > 0 else WHITE if diff < 0 else EMPTY
+        # 4) lan ngược kết quả
+        while node is not None:
+            node.visits += 1
+            if winner == node.player:
+                node.wins += 1.0
+            elif winner == EMPTY:
+                node.wins += 0.5
+            node = node.parent
+        for _ in range(depth):
+            pos.unmake_move()
@@ -1,23 +1,55 @@
 # core/search/minimax.py
 from __future__ import annotations
-from typing import Tuple, Optional, Callable, List
+from typing import Dict, Tuple, Optional, Callable, List
+import math
+import threading
 import time
 from core.game_state import GameState
-from core.board import EMPTY
 from core.move import Move
-from config.settings import TIMEBOX_SEC, USE_ALPHA_BETA
+import numpy as np
+from config.settings import (TIMEBOX_SEC, USE_ALPHA_BETA, TT_SIZE_MB, SEARCH_WORKERS, BATCH_LEAF_EVAL,
+                             ASPIRATION_WINDOW, TIME_CHECK_NODES, SEARCH_STATS_FILE, KOMI, LADDER_READING)
+from core.scoring import area_score
 
-from .heuristic import heuristic_score
+from .heuristic import heuristic_score, BATCH_HEURISTICS
+from .position import SearchPosition
+from .parallel import ParallelRootSearch
+from .ordering import MoveOrderer
+from .ladder import LadderReader
+from .time_manager import TimeManager, MoveBudget
+from .stats import SearchStats, format_move
+from .transposition import TranspositionTable, EXACT, LOWER, UPPER, encode_move, decode_move
 
 EvalFn = Callable[[GameState, int], float]
 
+# độ rộng cửa sổ rỗng của PVS (điểm heuristic cách nhau xa hơn nhiều)
+NULL_WINDOW = 1e-6
+# giá trị ván đã kết thúc: thắng/thua = ±WIN_SCORE cộng chênh lệch điểm (lớn hơn mọi điểm heuristic)
+WIN_SCORE = 1000.0
+
 class MinimaxSearcher:
     """
-    Minimax + Alpha-Beta + Move Ordering + Timebox.
+    Minimax + Alpha-Beta (PVS) + Move Ordering + Timebox + Transposition Table.
+    Cây tìm kiếm đi trên một SearchPosition duy nhất (make_move/unmake_move),
+    không tạo GameState mới cho mỗi node.
     - depth_limit: độ sâu tối đa
     - heuristic: hàm đánh giá trạng thái
-    - time_limit_sec: None => không giới hạn; số giây => bật timebox
-    - use_iterative_deepening: nếu True sẽ tăng dần độ sâu đến limit/ hết giờ
+    - time_limit_sec: None => không giới hạn; số giây => bật timebox (khi không biết đồng hồ ván)
+    - time_manager: chia giờ theo đồng hồ khi có clock_remaining (giây còn lại của bên đi);
+      nước bị ép (<= 1 nước PLAY) thì dừng sau vòng đầu
+    - stats_path: file JSONL nhận số liệu (SearchStats) của mỗi lần search; số liệu lần gần nhất
+      luôn có ở last_stats / stats()
+    - use_iterative_deepening: nếu True sẽ tăng dần độ sâu đến limit/ hết giờ;
+      mỗi vòng đi lại PV của vòng trước trước tiên, tìm với cửa sổ aspiration quanh điểm
+      vòng d-2 (tràn cửa sổ => tìm lại đầy đủ); vòng bị cắt ngang vì hết giờ bị bỏ
+    - aspiration: nửa độ rộng cửa sổ aspiration (None/0 => luôn cửa sổ đầy đủ)
+    - tt_size_mb: ngân sách bộ nhớ bảng chuyển vị (None/0 => tắt); bảng giữ qua các vòng
+      iterative deepening và giữa các nước
+    - workers: > 1 => chia các nước ở gốc cho process pool (xem parallel.py); gọi close() khi xong
+    - batch_leaves: chấm tầng lá (node depth=1) theo lô bằng bản batch của heuristic
+      (chỉ khi heuristic có bản batch trong BATCH_HEURISTICS)
+    - komi: dùng khi chấm node kết thúc (2 PASS) bằng điểm Tromp-Taylor thay cho heuristic
+    - ladders: MoveOrderer đọc thang (thưởng atari bắt được, phạt chạy nhóm chết)
     """
     def __init__(
         self,
@@ -26,177 +58,454 @@ class MinimaxSearcher:
         time_limit_sec: Optional[float] = TIMEBOX_SEC,
         use_iterative_deepening: bool = True,
         use_move_ordering: bool = True,
+        tt_size_mb: Optional[float] = TT_SIZE_MB,
+        workers: int = SEARCH_WORKERS,
+        batch_leaves: bool = BATCH_LEAF_EVAL,
+        aspiration: Optional[float] = ASPIRATION_WINDOW,
+        time_manager: Optional[TimeManager] = None,
+        stats_path: Optional[str] = SEARCH_STATS_FILE,
+        komi: float = KOMI,
+        ladders: bool = LADDER_READING,
     ):
         self.depth_limit = depth_limit
         self.heuristic = heuristic
         self.time_limit_sec = time_limit_sec
+        self.time_manager = time_manager or TimeManager()
+        self.clock_remaining: Optional[float] = None   # người gọi đặt trước mỗi search (None => timebox)
+        self.pondering = False                          # True => không giới hạn giờ tới khi ponderhit/stop
+        self._budget = MoveBudget(time_limit_sec, time_limit_sec)
+        self._root_state: Optional[GameState] = None
+        self._tick = 0
         self.use_iterative_deepening = use_iterative_deepening
         self.use_move_ordering = use_move_ordering
+        self.tt: Optional[TranspositionTable] = TranspositionTable(tt_size_mb) if tt_size_mb else None
+        self._tt_player: Optional[int] = None
+        self.workers = workers
+        self._parallel: Optional[ParallelRootSearch] = None
+        self._tt_size_mb = tt_size_mb
+        self._batch_eval = BATCH_HEURISTICS.get(heuristic) if batch_leaves else None
+        self.ladders = ladders
+        self.orderer = MoveOrderer(ladder=LadderReader() if ladders else None)
+        self.aspiration = aspiration
+        self.komi = komi
+        self.pv: List[Move] = []          # PV của vòng lặp sâu nhất đã tìm xong
+        self.score: float = float("-inf")
+        self.completed_depth = 0
+        self.aspiration_researches = 0
+        self._pv: Dict[int, List[Move]] = {}       # PV theo ply trong vòng đang tìm
+        self._prev_pv: List[Move] = []
+        self._root_ply = 0
         self._t0 = 0.0
         self._nodes = 0
+        self._stopped = False
+        self.stats_path = stats_path
+        self.last_stats = SearchStats()
+        self._worker_stats = SearchStats()     # số liệu gộp từ worker khi search song song
+        self._leaves = 0
+        self._t_movegen = self._t_order = self._t_eval = 0.0
+        self._search_t0 = 0.0
+        # đặt từ thread khác để dừng search đang chạy (UI / ponder); người gọi tự clear
+        self.stop_event = threading.Event()
+        # ở worker của search song song: Value giờ dừng chung (time.time()) do ParallelRootSearch đặt
+        self.shared_deadline = None
 
     # ------------- Public API -------------
     def search(self, state: GameState, player: int) -> Move:
-        self._t0 = time.perf_counter()
-        self._nodes = 0
+        return self.search_pv(state, player)[0]
 
-        best_move: Optional[Move] = None
-        best_score: float = float("-inf")
+    def search_pv(self, state: GameState, player: int) -> Tuple[Move, float, List[Move]]:
+        """(nước tốt nhất, điểm, PV) của vòng iterative deepening sâu nhất đã tìm xong."""
+        self._t0 = self._search_t0 = time.perf_counter()
+        self._nodes = self._leaves = 0
+        self._t_movegen = self._t_order = self._t_eval = 0.0
+        self._stopped = False
+        self._tick = 0
+        self._root_state = state
+        self._budget = MoveBudget(None, None) if self.pondering else \
+            self.time_manager.budget(state, self.clock_remaining, self.time_limit_sec)
+        if self.tt is not None:
+            # giá trị trong bảng tính theo góc nhìn `player` -> đổi bên thì xoá
+            if self._tt_player != player:
+                self.tt.clear(); self._tt_player = player
+            self.tt.new_search()
+
+        self.orderer.new_search()
+        self._root_ply = len(state.move_history)
+        self.pv, self.score, self.completed_depth = [], float("-inf"), 0
+        self.aspiration_researches = 0
+        self._prev_pv = []
+
+        self.last_stats = SearchStats()
+        self._worker_stats = SearchStats()
+        if self.workers > 1:
+            result = self._search_parallel(state, player)
+        else:
+            result = self._search_serial(state, player)
+        self._finish_stats(state, player)
+        return result
 
+    def _search_serial(self, state: GameState, player: int) -> Tuple[Move, float, List[Move]]:
+        pos = SearchPosition.from_state(state)
+        forced = sum(1 for m in pos.legal_moves() if m.kind == "PLAY") <= 1
+        inf = float("inf")
         depths = range(1, self.depth_limit + 1) if self.use_iterative_deepening else [self.depth_limit]
+        scores: Dict[int, float] = {}     # điểm theo độ sâu của các vòng đã xong
         for d in depths:
-            score, move = self._alpha_beta_root(state, d, player)
+            self._prev_pv = self.pv
+            lo, hi = -inf, inf
+            nodes0, leaves0 = self._nodes, self._leaves
+            # điểm dao động theo chẵn/lẻ độ sâu -> đặt cửa sổ quanh vòng cùng chẵn lẻ (d-2)
+            center = scores.get(d - 2)
+            if self.aspiration and center is not None and not math.isinf(center):
+                lo, hi = center - self.aspiration, center + self.aspiration
+            score, move = self._alpha_beta_root(pos, d, player, lo, hi)
+            if not self._stopped and ((lo > -inf and score <= lo) or (hi < inf and score >= hi)):
+                # tràn cửa sổ aspiration -> chỉ là cận, tìm lại với cửa sổ đầy đủ
+                self.aspiration_researches += 1
+                score, move = self._alpha_beta_root(pos, d, player)
+            self.last_stats.nodes_by_depth[d] = self._nodes - nodes0
+            self.last_stats.leaves_by_depth[d] = self._leaves - leaves0
+            if self._stopped:
+                # vòng dở dang không đáng tin; chỉ dùng khi chưa có vòng nào xong
+                if not self.pv and move is not None:
+                    self.pv, self.score = self._pv.get(0) or [move], score
+                break
             if move is not None:
-                best_score, best_move = score, move
-            if self._timed_out():
+                if self.pv and self.pv[0] != move:
+                    # nước tốt nhất đổi giữa 2 vòng -> cho thêm thời gian
+                    self._budget = self.time_manager.extend(self._budget)
+                self.pv = self._pv.get(0) or [move]
+                self.score, self.completed_depth = score, d
+                scores[d] = score
+            if forced or self._check_time():
+                break
+            if not self.time_manager.start_next_iteration(time.perf_counter() - self._t0, self._budget):
                 break
 
-        return best_move or Move.pass_()
+        best_move = self.pv[0] if self.pv else Move.pass_()
+        return best_move, self.score, list(self.pv)
+
+    def _eval_children_batch(self, state: SearchPosition, moves: List[Move], player: int) -> np.ndarray:
+        n = state.board.size
+        grids = np.empty((len(moves), n, n), dtype=int)
+        terminal = {}
+        for i, mv in enumerate(moves):
+            state.make_move(mv)
+            grids[i] = state.board.grid
+            if state.is_terminal():
+                terminal[i] = self._terminal_value(state, player)
+            state.unmake_move()
+        t = time.perf_counter()
+        vals = np.asarray(self._batch_eval(grids, player), dtype=float)
+        self._t_eval += time.perf_counter() - t
+        for i, v in terminal.items():
+            vals[i] = v
+        return vals
+
+    def _search_parallel(self, state: GameState, player: int) -> Tuple[Move, float, List[Move]]:
+        if self._parallel is None or self._parallel.workers != self.workers:
+            self.close()
+            config = dict(depth_limit=self.depth_limit, heuristic=self.heuristic, time_limit_sec=None,
+                          use_iterative_deepening=False, use_move_ordering=self.use_move_ordering,
+                          tt_size_mb=self._tt_size_mb, komi=self.komi, ladders=self.ladders)
+            self._parallel = ParallelRootSearch(self.workers, config)
+        self._parallel.new_search()
+        self._parallel.set_deadline(self._deadline())
+        if self.stop_event.is_set():
+            self._parallel.stop()
+
+        best_move: Optional[Move] = None
+        best_score = float("-inf")
+        pos = SearchPosition.from_state(state)
+        moves = self._ordered_moves(pos, player)
+        if not moves:
+            # gốc không còn nước PLAY -> không có gì để chia, tìm tuần tự (trả về PASS như bình thường)
+            return self._search_serial(state, player)
+        depths = range(1, self.depth_limit + 1) if self.use_iterative_deepening else [self.depth_limit]
+        for d in depths:
+            if best_move is not None:
+                # nước tốt nhất của vòng trước đi đầu để có alpha sớm
+                moves.remove(best_move); moves.insert(0, best_move)
+            score, pv, work, done = self._parallel.search_depth(state, moves, d, player)
+            # gốc được mở rộng ở tiến trình chính (như _alpha_beta_root) -> +1 node mỗi vòng,
+            # số liệu của worker gộp vào last_stats ở _finish_stats
+            self._nodes += 1
+            work.nodes_by_depth[d], work.leaves_by_depth[d] = work.nodes + 1, work.leaves
+            self._worker_stats.merge(work)
+            if pv:
+                # các con đã tìm xong đều đáng tin (nước đầu luôn xong trước khi chạy các nước khác);
+                # PV = nước ở gốc + PV worker trả về cho con đó (ponder_move dùng nước thứ 2)
+                best_score, best_move, self.pv = score, pv[0], pv
+                if done:
+                    self.completed_depth = d
+            if self._check_time() or not self.time_manager.start_next_iteration(
+                    time.perf_counter() - self._t0, self._budget):
+                break
+        self.score = best_score
+        return best_move or Move.pass_(), best_score, list(self.pv)
+
+    def _finish_stats(self, state: GameState, player: int) -> None:
+        st = self.last_stats
+        st.nodes, st.leaves = self._nodes, self._leaves
+        st.elapsed = time.perf_counter() - self._search_t0
+        st.time_movegen, st.time_ordering, st.time_eval = self._t_movegen, self._t_order, self._t_eval
+        st.completed_depth = self.completed_depth
+        st.score = None if math.isinf(self.score) else self.score
+        st.pv = [format_move(m) for m in self.pv]
+        st.cutoffs = self.orderer.cutoffs
+        st.first_move_cutoffs = self.orderer.first_move_cutoffs
+        st.aspiration_researches = self.aspiration_researches
+        st.tt = self.tt_stats()
+        st.merge(self._worker_stats)
+        if self.stats_path:
+            st.write_jsonl(self.stats_path, move_number=len(state.move_history), player=player)
+
+    def stats(self) -> Dict[str, object]:
+        """Số liệu của lần search gần nhất (xem SearchStats.to_dict)."""
+        return self.last_stats.to_dict()
+
+    def stop(self) -> None:
+        """Yêu cầu dừng search đang chạy (gọi được từ thread khác); kết quả là vòng sâu nhất đã xong."""
+        self.stop_event.set()
+        if self._parallel is not None:
+            self._parallel.stop()
+
+    def ponderhit(self, clock_remaining: Optional[float] = None) -> None:
+        """Đối thủ đi đúng nước đang ponder: search đang chạy có ngân sách bình thường tính từ bây giờ."""
+        self.clock_remaining = clock_remaining
+        self.pondering = False
+        if self._root_state is not None:
+            budget = self.time_manager.budget(self._root_state, clock_remaining, self.time_limit_sec)
+            self._t0 = time.perf_counter()
+            self._budget = budget
+            if self._parallel is not None:
+                self._parallel.set_deadline(self._deadline())
+
+    def ponder_move(self) -> Optional[Move]:
+        """Nước trả lời đối thủ được dự đoán (nước thứ 2 của PV) để ponder."""
+        return self.pv[1] if len(self.pv) >= 2 else None
+
+    def close(self) -> None:
+        """Tắt process pool của chế độ song song (nếu có)."""
+        if self._parallel is not None:
+            self._parallel.close()
+            self._parallel = None
+
+    def tt_stats(self) -> Dict[str, float]:
+        """Tỉ lệ hit / cutoff của bảng chuyển vị trong lần search gần nhất."""
+        return self.tt.stats() if self.tt is not None else {}
 
     # ------------- Alpha-Beta -------------
-    def _alpha_beta_root(self, state: GameState, depth: int, player: int) -> Tuple[float, Optional[Move]]:
-        alpha, beta = float("-inf"), float("inf")
+    def _tt_probe(self, state: SearchPosition, depth: int, alpha: float, beta: float
+                  ) -> Tuple[Optional[float], Optional[Move], int]:
+        """(giá trị nếu cắt được, nước tốt nhất đã lưu, key)."""
+        if self.tt is None:
+            return None, None, 0
+        key = state.position_key()
+        entry = self.tt.probe(key)
+        if entry is None:
+            return None, None, key
+        e_depth, flag, value, code = entry
+        tt_move = decode_move(code, state.board.size)
+        if e_depth >= depth and (flag == EXACT or (flag == LOWER and value >= beta)
+                                 or (flag == UPPER and value <= alpha)):
+            self.tt.cutoffs += 1
+            return value, tt_move, key
+        return None, tt_move, key
+
+    def _tt_store(self, state: SearchPosition, key: int, depth: int, value: float,
+                  alpha: float, beta: float, best: Optional[Move]) -> None:
+        # giá trị của node bị cắt ngang vì hết giờ không đáng tin -> không lưu
+        if self.tt is None or self._stopped:
+            return
+        flag = UPPER if value <= alpha else LOWER if value >= beta else EXACT
+        self.tt.store(key, depth, flag, value, encode_move(best, state.board.size))
+
+    def _evaluate(self, state: SearchPosition, player: int) -> float:
+        t = time.perf_counter()
+        v = self.heuristic(state, player)
+        self._t_eval += time.perf_counter() - t
+        self._leaves += 1
+        return v
+
+    def _terminal_value(self, state: SearchPosition, player: int) -> float:
+        """Ván đã kết thúc: đầu hàng = thua nặng nhất, 2 PASS = đếm điểm Tromp-Taylor (có komi)."""
+        if state.move_history[-1].kind == "RESIGN":
+            # bên vừa đầu hàng là -state.to_play
+            v = WIN_SCORE + state.board.size ** 2
+            return -v if state.to_play != player else v
+        t = time.perf_counter()
+        score = area_score(state.board, self.komi) * player
+        self._t_eval += time.perf_counter() - t
+        return score + WIN_SCORE if score > 0 else score - WIN_SCORE if score < 0 else 0.0
+
+    def _alpha_beta_root(self, state: SearchPosition, depth: int, player: int,
+                         alpha: float = float("-inf"), beta: float = float("inf")
+                         ) -> Tuple[float, Optional[Move]]:
+        alpha0 = alpha
         best_move: Optional[Move] = None
         best_val = float("-inf")
+        self._pv[0] = []
+        self._nodes += 1
 
-        moves = self._ordered_moves(state, player)
+        _, tt_move, key = self._tt_probe(state, depth, alpha, beta)
+        moves = self._ordered_moves(state, player, self._pv_move(state, tt_move), depth)
 
-        for mv in moves:
+        for i, mv in enumerate(moves):
             if self._timed_out(): break
-            ns = state.apply_move(mv)
-            val = self._alpha_beta(ns, depth - 1, alpha, beta, player)
+            state.make_move(mv)
+            val = self._pvs_child(state, depth - 1, alpha, beta, player, True, i == 0)
+            state.unmake_move()
             if val > best_val:
                 best_val, best_move = val, mv
+                if val > alpha:
+                    self._pv[0] = [mv] + self._pv.get(1, [])
             alpha = max(alpha, best_val)
             if USE_ALPHA_BETA and alpha >= beta:
                 break
+        if best_move is not None:
+            self._tt_store(state, key, depth, best_val, alpha0, beta, best_move)
         return best_val, best_move
 
-    def _alpha_beta(self, state: GameState, depth: int, alpha: float, beta: float, player: int) -> float:
+    def _pvs_child(self, state: SearchPosition, depth: int, alpha: float, beta: float, player: int,
+                   maximizing: bool, first: bool) -> float:
+        """PVS: con đầu (nước PV) tìm cửa sổ đầy đủ; các con sau chỉ thử cửa sổ rỗng
+        "có hơn được alpha (kém hơn beta) không?" và chỉ tìm lại đầy đủ khi câu trả lời là có."""
+        if first or not USE_ALPHA_BETA or math.isinf(alpha if maximizing else beta):
+            return self._alpha_beta(state, depth, alpha, beta, player)
+        if maximizing:
+            v = self._alpha_beta(state, depth, alpha, alpha + NULL_WINDOW, player)
+        else:
+            v = self._alpha_beta(state, depth, beta - NULL_WINDOW, beta, player)
+        if alpha < v < beta:
+            v = self._alpha_beta(state, depth, alpha, beta, player)
+        return v
+
+    def _alpha_beta(self, state: SearchPosition, depth: int, alpha: float, beta: float, player: int) -> float:
+        ply = self._ply(state)
+        self._pv[ply] = []
         if self._timed_out():
             # Khi hết giờ, trả về đánh giá tĩnh hiện tại (không mở rộng thêm)
-            return self.heuristic(state, player)
-        if depth == 0 or state.is_terminal():
-            return self.heuristic(state, player)
+            return self._evaluate(state, player)
+        if state.is_terminal():
+            self._leaves += 1
+            return self._terminal_value(state, player)
+        if depth == 0:
+            return self._evaluate(state, player)
+
+        cut, tt_move, key = self._tt_probe(state, depth, alpha, beta)
+        if cut is not None:
+            return cut
 
         self._nodes += 1
+        alpha0, beta0 = alpha, beta
+        best: Optional[Move] = None
         maximizing = (state.to_play == player)
-        if maximizing:
+        if depth == 1 and self._batch_eval is not None:
+            # mọi con đều là lá -> chấm cả lô, không cần sắp xếp nước đi
+            t = time.perf_counter()
+            moves = state.legal_moves()
+            if not self.use_move_ordering:
+                moves = [m for m in moves if m.kind == "PLAY"]
+            self._t_movegen += time.perf_counter() - t
+            if moves:
+                # thời gian chấm (lô + con kết thúc) tự cộng vào _t_eval bên trong, mỗi phần 1 lần
+                vals = self._eval_children_batch(state, moves, player)
+                self._leaves += len(moves)
+                i = int(np.argmax(vals)) if maximizing else int(np.argmin(vals))
+                value, best = float(vals[i]), moves[i]
+                if alpha < value < beta:
+                    self._pv[ply] = [best]
+            else:
+                value = float("-inf") if maximizing else float("inf")
+        elif maximizing:
             value = float("-inf")
-            moves = self._ordered_moves(state, player)
-            for mv in moves:
-                ns = state.apply_move(mv)
-                value = max(value, self._alpha_beta(ns, depth - 1, alpha, beta, player))
+            moves = self._ordered_moves(state, player, self._pv_move(state, tt_move), depth)
+            for i, mv in enumerate(moves):
+                state.make_move(mv)
+                v = self._pvs_child(state, depth - 1, alpha, beta, player, True, i == 0)
+                state.unmake_move()
+                if v > value:
+                    value, best = v, mv
+                    if v > alpha:
+                        self._pv[ply] = [mv] + self._pv.get(ply + 1, [])
                 alpha = max(alpha, value)
                 if USE_ALPHA_BETA and alpha >= beta:
+                    self.orderer.on_cutoff(state.to_play, mv, ply, depth, i)
                     break
-            return value
         else:
             value = float("inf")
-            moves = self._ordered_moves(state, player)
-            for mv in moves:
-                ns = state.apply_move(mv)
-                value = min(value, self._alpha_beta(ns, depth - 1, alpha, beta, player))
+            moves = self._ordered_moves(state, player, self._pv_move(state, tt_move), depth)
+            for i, mv in enumerate(moves):
+                state.make_move(mv)
+                v = self._pvs_child(state, depth - 1, alpha, beta, player, False, i == 0)
+                state.unmake_move()
+                if v < value:
+                    value, best = v, mv
+                    if v < beta:
+                        self._pv[ply] = [mv] + self._pv.get(ply + 1, [])
                 beta = min(beta, value)
                 if USE_ALPHA_BETA and beta <= alpha:
+                    self.orderer.on_cutoff(state.to_play, mv, ply, depth, i)
                     break
-            return value
+        self._tt_store(state, key, depth, value, alpha0, beta0, best)
+        return value
+
+    def _pv_move(self, state: SearchPosition, tt_move: Optional[Move]) -> Optional[Move]:
+        """Nước của PV vòng trước nếu node nằm trên đường PV đó, không thì hash move."""
+        ply = self._ply(state)
+        pv = self._prev_pv
+        if ply < len(pv) and state.move_history[self._root_ply:] == pv[:ply]:
+            return pv[ply]
+        return tt_move
 
     # ------------- Move ordering -------------
-    def _ordered_moves(self, state: GameState, player: int) -> List[Move]:
-        """Ưu tiên các nước có xác suất tốt: bắt quân, atari, gần cụm quân.
-        Để nhanh gọn, chấm điểm nước đi bằng hàm tĩnh nhẹ, KHÔNG dùng minimax ở đây."""
-        legal = [m for m in state.legal_moves() if m.kind == "PLAY"]
+    def _ordered_moves(self, state: SearchPosition, player: int, tt_move: Optional[Move] = None,
+                       depth: int = 0) -> List[Move]:
+        """Nước đi theo thứ tự của MoveOrderer (hash move, bắt quân, killer, history, điểm tĩnh).
+        Điểm tính theo bên đang đi (state.to_play), KHÔNG dùng minimax ở đây."""
+        t = time.perf_counter()
+        moves = state.legal_moves()
+        t1 = time.perf_counter(); self._t_movegen += t1 - t
         if not self.use_move_ordering:
-            return legal
-
-        def score_move(mv: Move) -> int:
-            # Heuristics thô: capture > atari > proximity
-            cap = self._would_capture(state, player, mv.x, mv.y)
-            atari = self._would_put_in_atari(state, player, mv.x, mv.y)
-            prox = self._proximity_bonus(state, mv.x, mv.y)
-            # Trọng số đơn giản
-            return cap * 1000 + atari * 50 + prox
-
-        legal.sort(key=score_move, reverse=True)
-        # luôn cho phép PASS/RESIGN ở cuối list để không kẹt
-        trailer = [m for m in state.legal_moves() if m.kind != "PLAY"]
-        return legal + trailer
-
-    # --- Utilities cho ordering (mô phỏng cục bộ, nhẹ hơn gọi Rules từng lần) ---
-    def _would_capture(self, state: GameState, player: int, x: int, y: int) -> int:
-        """Số quân đối thủ bị bắt nếu đánh (x,y) (xấp xỉ)."""
-        b = state.board.copy()
-        opp = -player
-        # nếu ô không trống thì coi = 0
-        if b.get(x, y) != 0:
-            return 0
-        b.place_stone(player, x, y)
-        captured = 0
-        # bắt các nhóm đối thủ không còn liberties
-        for nx, ny in b.neighbors(x, y):
-            if b.get(nx, ny) == opp:
-                g = self._collect_group(b, nx, ny)
-                if not self._group_liberties(b, g):
-                    captured += len(g)
-                    for (cx, cy) in g:
-                        b.remove_stone(cx, cy)
-        return captured
-
-    def _would_put_in_atari(self, state: GameState, player: int, x: int, y: int) -> int:
-        """Số nhóm đối thủ bị đưa vào thế atari (liberties = 1) sau nước đi (x,y)."""
-        b = state.board.copy()
-        opp = -player
-        if b.get(x, y) != 0: return 0
-        b.place_stone(player, x, y)
-        atari_groups = 0
-        seen = set()
-        for ny in range(b.size):
-            for nx in range(b.size):
-                if b.get(nx, ny) == opp and (nx, ny) not in seen:
-                    g = self._collect_group(b, nx, ny)
-                    seen |= g
-                    if len(self._group_liberties(b, g)) == 1:
-                        atari_groups += 1
-        return atari_groups
-
-    def _proximity_bonus(self, state: GameState, x: int, y: int) -> int:
-        """Ưu tiên ô gần quân hiện hữu để giảm branching vô nghĩa."""
-        b = state.board
-        R = 2
-        score = 0
-        for dy in range(-R, R+1):
-            for dx in range(-R, R+1):
-                ix, iy = x + dx, y + dy
-                if 0 <= ix < b.size and 0 <= iy < b.size:
-                    v = b.get(ix, iy)
-                    if v != EMPTY:
-                        score += 1
-        return score
-
-    # --- phiên bản nhẹ của group & liberties (lặp lại để tránh lệ thuộc Rules) ---
-    def _collect_group(self, board, x, y):
-        color = board.get(x, y)
-        if color == 0: return set()
-        q = [(x, y)]
-        seen = {(x, y)}
-        while q:
-            cx, cy = q.pop()
-            for nx, ny in board.neighbors(cx, cy):
-                if (nx, ny) not in seen and board.get(nx, ny) == color:
-                    seen.add((nx, ny)); q.append((nx, ny))
-        return seen
-
-    def _group_liberties(self, board, group):
-        libs = set()
-        for x, y in group:
-            for nx, ny in board.neighbors(x, y):
-                if board.get(nx, ny) == 0:
-                    libs.add((nx, ny))
-        return libs
+            return [m for m in moves if m.kind == "PLAY"]
+        out = self.orderer.order(state, depth, self._ply(state), tt_move, moves)
+        self._t_order += time.perf_counter() - t1
+        return out
+
+    def _ply(self, state: SearchPosition) -> int:
+        return len(state.move_history) - self._root_ply
+
+    def ordering_stats(self) -> Dict[str, float]:
+        """Thống kê sắp xếp nước của lần search gần nhất (tỉ lệ cắt ở nước đầu, ...)."""
+        return self.orderer.stats()
 
     # ------------- timebox -------------
     def _timed_out(self) -> bool:
-        if self.time_limit_sec is None:
+        """Gọi ở mỗi node; chỉ đọc đồng hồ mỗi TIME_CHECK_NODES lần."""
+        if self._stopped:
+            return True
+        self._tick += 1
+        if self._tick % TIME_CHECK_NODES:
+            return False
+        return self._check_time()
+
+    def _deadline(self) -> Optional[float]:
+        """Giờ dừng cứng theo đồng hồ time.time() (cho worker ở tiến trình khác), None = không giới hạn."""
+        hard = self._budget.hard
+        return None if hard is None else time.time() + hard - (time.perf_counter() - self._t0)
+
+    def _check_time(self) -> bool:
+        if self._stopped:
+            return True
+        if self.stop_event.is_set():
+            self._stopped = True
+            return True
+        if self.shared_deadline is not None and time.time() >= self.shared_deadline.value:
+            self._stopped = True
+            return True
+        hard = self._budget.hard
+        if hard is None:
             return False
-        return (time.perf_counter() - self._t0) >= self.time_limit_sec
+        self._stopped = (time.perf_counter() - self._t0) >= hard
+        return self._stopped
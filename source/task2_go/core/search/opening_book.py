@@ -0,0 +1,186 @@
+# core/search/opening_book.py
+"""
+Opening book: bảng (khoá thế cờ, nước đi, trọng số, điểm) sắp theo khoá, lưu ra đĩa và tra bằng
+tìm kiếm nhị phân trên np.memmap (không nạp cả file).
+- khoá = min khoá Zobrist (có lượt đi) qua 8 phép đối xứng của bàn cờ; nước lưu theo hệ toạ độ
+  của phép đối xứng đạt min -> các thế xoay / lật của nhau dùng chung 1 mục
+- trọng số = số lần nước được chơi ở thế đó, điểm = tỉ lệ thắng của bên đi nước đó (hoà = 0.5)
+- dựng offline từ biên bản ván (core/records.py: file .gor hoặc SGF), vd. các ván của benchmarks.arena
+Bố cục file: header (MAGIC, size, max_ply, số mục) | keys u64[n] | moves u16[n] | weights f32[n] | scores f32[n]
+(mỗi cột liền nhau để searchsorted chạy thẳng trên memmap).
+Dựng book (từ thư mục task2_go):
+  python -m core.search.opening_book games.gor [more.sgf ...] -o book.bin [--max-ply 12] [--min-count 2]
+"""
+from __future__ import annotations
+import argparse
+import os
+import struct
+import sys
+from typing import Dict, Iterable, List, Optional, Tuple
+import random
+import numpy as np
+from core.board import BLACK, new_board
+from core.game_state import GameState
+from core.move import Move
+from core.rules import Rules
+from core.zobrist import full_hash, side_key
+from config.settings import OPENING_BOOK_FILE
+
+MAGIC = b"GOBOOK\x01\x00"
+HEADER = struct.Struct("<8sIIQ")
+PASS_CODE = 0xFFFE
+
+_PERMS: Dict[int, Tuple[np.ndarray, np.ndarray]] = {}
+
+def symmetries(size: int) -> Tuple[np.ndarray, np.ndarray]:
+    """(perm, inv) dạng (8, size^2): bàn biến đổi t có ô q = ô perm[t][q] của bàn gốc;
+    ô p của bàn gốc nằm ở inv[t][p] trên bàn biến đổi. t = 0 là phép đồng nhất."""
+    out = _PERMS.get(size)
+    if out is None:
+        idx = np.arange(size * size).reshape(size, size)
+        perm = np.array([np.rot90(np.fliplr(idx) if t >= 4 else idx, t % 4).reshape(-1) for t in range(8)])
+        out = (perm, np.argsort(perm, axis=1))
+        _PERMS[size] = out
+    return out
+
+def canonical_key(grid: np.ndarray, to_play: int) -> Tuple[int, List[int]]:
+    """(khoá nhỏ nhất qua 8 phép đối xứng, các phép đối xứng t đạt min).
+    Thế cờ tự đối xứng (vd. bàn trống) có nhiều t; nước được chuẩn hoá bằng mã nhỏ nhất qua các t đó."""
+    size = grid.shape[0]
+    perm, _ = symmetries(size)
+    flat = np.asarray(grid).reshape(-1)
+    side = side_key(to_play)
+    keys = [full_hash(flat[perm[t]].reshape(size, size)) ^ side for t in range(8)]
+    key = min(keys)
+    return key, [t for t in range(8) if keys[t] == key]
+
+def _to_code(mv: Move, size: int, t: int) -> int:
+    if mv.kind == "PASS":
+        return PASS_CODE
+    return int(symmetries(size)[1][t][mv.y * size + mv.x])
+
+def _from_code(code: int, size: int, t: int) -> Move:
+    if code == PASS_CODE:
+        return Move.pass_()
+    y, x = divmod(int(symmetries(size)[0][t][code]), size)
+    return Move.play(x, y)
+
+
+class BookBuilder:
+    """Gom (thế cờ, nước, kết quả) từ các ván rồi ghi ra file book đã sắp xếp."""
+    def __init__(self, size: int, max_ply: int = 12):
+        self.size = size
+        self.max_ply = max_ply
+        self._stats: Dict[Tuple[int, int], List[float]] = {}    # (khoá, mã nước) -> [số lần, tổng điểm]
+        self.games = 0
+
+    def add_record(self, record) -> None:
+        """`record`: core.records.GameRecord (bỏ qua nếu khác kích thước bàn)."""
+        if record.size != self.size:
+            return
+        rules = Rules()
+        board = new_board(self.size)
+        player = BLACK
+        prev_hash, cur_hash = None, board.hash_key(BLACK)
+        for mv in record.moves[:self.max_ply]:
+            if mv.kind == "RESIGN":
+                break
+            key, ts = canonical_key(board.grid, player)
+            code = min(_to_code(mv, self.size, t) for t in ts)
+            result = 0.5 if record.winner in (None, 0) else float(record.winner == player)
+            entry = self._stats.setdefault((key, code), [0, 0.0])
+            entry[0] += 1
+            entry[1] += result
+            if mv.kind == "PLAY":
+                rules.play_move(board, player, mv.x, mv.y, last_hash=prev_hash)
+            player = -player
+            prev_hash, cur_hash = cur_hash, board.hash_key(player)
+        self.games += 1
+
+    def write(self, path: str, min_count: int = 1) -> int:
+        rows = sorted((k, c, n, s / n) for (k, c), (n, s) in self._stats.items() if n >= min_count)
+        with open(path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, self.size, self.max_ply, len(rows)))
+            for col, dtype in ((0, "<u8"), (1, "<u2"), (2, "<f4"), (3, "<f4")):
+                f.write(np.array([r[col] for r in rows], dtype=dtype).tobytes())
+        return len(rows)
+
+
+class OpeningBook:
+    """Tra book đã dựng. probe(state) -> [(nước, trọng số, điểm)], choose(state) -> nước hoặc None."""
+    def __init__(self, path: str, min_weight: float = 1.0):
+        mm = np.memmap(path, dtype=np.uint8, mode="r")
+        magic, self.size, self.max_ply, n = HEADER.unpack(mm[:HEADER.size].tobytes())
+        if magic != MAGIC:
+            raise ValueError(f"Không phải file opening book: {path}")
+        self.min_weight = min_weight
+        off = HEADER.size
+        self.keys = mm[off:off + 8 * n].view("<u8"); off += 8 * n
+        self.moves = mm[off:off + 2 * n].view("<u2"); off += 2 * n
+        self.weights = mm[off:off + 4 * n].view("<f4"); off += 4 * n
+        self.scores = mm[off:off + 4 * n].view("<f4")
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def probe(self, state: GameState) -> List[Tuple[Move, float, float]]:
+        """Các nước trong book cho `state` (đã đổi về toạ độ thật, chỉ giữ nước hợp lệ), trọng số giảm dần."""
+        if state.board.size != self.size or len(state.move_history) >= self.max_ply:
+            return []
+        key, ts = canonical_key(state.board.grid, state.to_play)
+        t = ts[0]
+        lo = int(np.searchsorted(self.keys, key, side="left"))
+        hi = int(np.searchsorted(self.keys, key, side="right"))
+        if lo == hi:
+            return []
+        legal = set(state.legal_moves())
+        out = [(_from_code(self.moves[i], self.size, t), float(self.weights[i]), float(self.scores[i]))
+               for i in range(lo, hi)]
+        return sorted((e for e in out if e[0] in legal), key=lambda e: (-e[1], -e[2]))
+
+    def choose(self, state: GameState, rng: Optional[random.Random] = None) -> Optional[Move]:
+        """Nước chơi nhiều nhất (rng != None => chọn ngẫu nhiên theo trọng số); None nếu ngoài book."""
+        cands = [e for e in self.probe(state) if e[1] >= self.min_weight]
+        if not cands:
+            return None
+        if rng is None:
+            return cands[0][0]
+        return rng.choices([e[0] for e in cands], weights=[e[1] for e in cands])[0]
+
+def load_book(path: Optional[str] = OPENING_BOOK_FILE) -> Optional[OpeningBook]:
+    """Book mặc định cho agent: None nếu không cấu hình hoặc file không tồn tại."""
+    if not path or not os.path.exists(path):
+        return None
+    return OpeningBook(path)
+
+
+def main(argv=None) -> int:
+    from core.records import GameRecord, RecordStore
+    ap = argparse.ArgumentParser(description="Dựng opening book từ biên bản ván (.gor / .sgf)")
+    ap.add_argument("inputs", nargs="+")
+    ap.add_argument("-o", "--out", required=True)
+    ap.add_argument("--size", type=int, default=None, help="mặc định lấy theo ván đầu tiên")
+    ap.add_argument("--max-ply", type=int, default=12)
+    ap.add_argument("--min-count", type=int, default=2)
+    args = ap.parse_args(argv)
+
+    def records() -> Iterable:
+        for path in args.inputs:
+            if path.lower().endswith(".sgf"):
+                with open(path, encoding="utf-8") as f:
+                    yield GameRecord.from_sgf(f.read())
+            else:
+                yield from RecordStore(path)
+    builder = None
+    for rec in records():
+        builder = builder or BookBuilder(args.size or rec.size, args.max_ply)
+        builder.add_record(rec)
+    if builder is None:
+        print("không có ván nào", file=sys.stderr)
+        return 1
+    n = builder.write(args.out, args.min_count)
+    print(f"{builder.games} ván -> {n} mục book ({args.out})")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,161 @@
+# core/search/ordering.py
+from __future__ import annotations
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from core.board import BLACK, WHITE, EMPTY
+from core.move import Move
+
+from .ladder import LadderReader
+
+Coord = Tuple[int, int]
+# thưởng / phạt điểm tĩnh cho nước bắt được bằng thang / nước chạy thang không thoát
+LADDER_BONUS = 200
+
+# --- Chấm điểm tĩnh (đọc bảng nhóm của Board, không mô phỏng) ---
+def capture_size(board, player: int, x: int, y: int) -> int:
+    """Số quân đối thủ bị bắt nếu `player` đánh (x,y): các nhóm kề chỉ còn 1 liberty."""
+    opp = -player
+    captured = 0
+    counted: List[Coord] = []
+    for nx, ny in board.neighbors(x, y):
+        if board.get(nx, ny) == opp and board.in_atari(nx, ny):
+            if any(board.same_group(nx, ny, cx, cy) for cx, cy in counted):
+                continue
+            counted.append((nx, ny))
+            captured += board.group_size(nx, ny)
+    return captured
+
+def atari_threats(board, player: int, x: int, y: int) -> int:
+    """Số nhóm đối thủ kề (x,y) đang có 2 liberties -> bị đưa vào atari sau nước đi."""
+    opp = -player
+    threats = 0
+    counted: List[Coord] = []
+    for nx, ny in board.neighbors(x, y):
+        if board.get(nx, ny) == opp:
+            if any(board.same_group(nx, ny, cx, cy) for cx, cy in counted):
+                continue
+            counted.append((nx, ny))
+            if board.liberty_count(nx, ny) == 2:
+                threats += 1
+    return threats
+
+def proximity_map(grid: np.ndarray, radius: int = 2) -> np.ndarray:
+    """Số quân trong ô vuông (2R+1)x(2R+1) quanh mỗi điểm (tổng tích luỹ 2 chiều, 1 lần cho cả bàn)."""
+    n = grid.shape[0]
+    r = radius
+    occ = np.zeros((n + 2*r + 1, n + 2*r + 1), dtype=np.int32)
+    occ[r+1:r+1+n, r+1:r+1+n] = grid != EMPTY
+    c = occ.cumsum(0).cumsum(1)
+    k = 2*r + 1
+    return c[k:, k:] - c[:-k, k:] - c[k:, :-k] + c[:-k, :-k]
+
+
+class MoveOrderer:
+    """
+    Sắp xếp nước đi cho alpha-beta, theo tầng:
+      1) nước từ bảng chuyển vị (hash move)
+      2) nước bắt quân (O(1) từ bảng nhóm)
+      3) killer moves của ply hiện tại (2 ô / ply)
+      4) còn lại: history (tăng depth^2 khi gây cắt) + điểm tĩnh atari/gần quân
+         (điểm tĩnh chỉ tính khi độ sâu còn lại >= static_min_depth, nơi đáng bỏ công);
+         có `ladder` thì đọc thang (khi độ sâu còn lại >= ladder_min_depth): atari mà đối thủ
+         không thoát được được thưởng, chạy nhóm bị atari mà vẫn chết bị phạt
+      5) PASS/RESIGN cuối danh sách
+    Thống kê: số lần cắt và tỉ lệ cắt ngay ở nước đầu tiên.
+    """
+    def __init__(self, static_min_depth: int = 2, max_ply: int = 128, ladder: Optional[LadderReader] = None,
+                 ladder_min_depth: int = 3):
+        self.static_min_depth = static_min_depth
+        self.ladder = ladder
+        self.ladder_min_depth = ladder_min_depth
+        self.max_ply = max_ply
+        self.killers: List[List[Optional[Move]]] = [[None, None] for _ in range(max_ply)]
+        self.history: Dict[int, Dict[Coord, int]] = {BLACK: {}, WHITE: {}}
+        self.reset_stats()
+
+    def reset_stats(self) -> None:
+        self.ordered_nodes = 0
+        self.cutoffs = 0
+        self.first_move_cutoffs = 0
+        self.cutoff_index_sum = 0
+
+    def new_search(self) -> None:
+        """Đầu mỗi lần search: xoá killer, giảm một nửa history (giữ xu hướng, quên dần)."""
+        self.killers = [[None, None] for _ in range(self.max_ply)]
+        for table in self.history.values():
+            for k in list(table):
+                table[k] >>= 1
+                if not table[k]:
+                    del table[k]
+        self.reset_stats()
+
+    def order(self, state, depth: int, ply: int, tt_move: Optional[Move] = None,
+              moves: Optional[List[Move]] = None) -> List[Move]:
+        """`moves`: danh sách nước hợp lệ đã sinh sẵn (None => lấy từ state.legal_moves())."""
+        self.ordered_nodes += 1
+        all_moves = state.legal_moves() if moves is None else moves
+        board = state.board
+        me = state.to_play
+        killers = self.killers[ply] if ply < self.max_ply else [None, None]
+        hist = self.history[me]
+        prox = proximity_map(board.grid) if depth >= self.static_min_depth else None
+        ladder = self.ladder if depth >= self.ladder_min_depth else None
+
+        def key(mv: Move) -> Tuple[int, int]:
+            if mv == tt_move:
+                return (4, 0)
+            cap = capture_size(board, me, mv.x, mv.y)
+            if cap:
+                return (3, cap)
+            if mv == killers[0]:
+                return (2, 1)
+            if mv == killers[1]:
+                return (2, 0)
+            score = hist.get((mv.x, mv.y), 0)
+            if prox is not None:
+                threats = atari_threats(board, me, mv.x, mv.y)
+                score += threats * 50 + int(prox[mv.y, mv.x])
+                if ladder is not None:
+                    if threats and ladder.move_captures(board, me, mv.x, mv.y):
+                        score += LADDER_BONUS
+                    elif any(board.get(nx, ny) == me and board.in_atari(nx, ny)
+                             for nx, ny in board.neighbors(mv.x, mv.y)) \
+                            and ladder.escape_fails(board, me, mv.x, mv.y):
+                        score -= LADDER_BONUS
+            return (1, score)
+
+        legal = [m for m in all_moves if m.kind == "PLAY"]
+        legal.sort(key=key, reverse=True)
+        # luôn cho phép PASS/RESIGN ở cuối list để không kẹt
+        trailer = [m for m in all_moves if m.kind != "PLAY"]
+        if tt_move is not None and tt_move in trailer:
+            trailer.remove(tt_move)
+            return [tt_move] + legal + trailer
+        return legal + trailer
+
+    def on_cutoff(self, color: int, mv: Move, ply: int, depth: int, index: int) -> None:
+        """Gọi khi nước thứ `index` (0 = đầu tiên) gây cắt beta/alpha."""
+        self.cutoffs += 1
+        self.cutoff_index_sum += index
+        if index == 0:
+            self.first_move_cutoffs += 1
+        if mv.kind != "PLAY":
+            return
+        if ply < self.max_ply:
+            k = self.killers[ply]
+            if k[0] != mv:
+                k[1] = k[0]; k[0] = mv
+        table = self.history[color]
+        table[(mv.x, mv.y)] = table.get((mv.x, mv.y), 0) + depth * depth
+
+    def stats(self) -> Dict[str, float]:
+        out = {
+            "ordered_nodes": self.ordered_nodes,
+            "cutoffs": self.cutoffs,
+            "first_move_cutoffs": self.first_move_cutoffs,
+            "first_move_cutoff_rate": self.first_move_cutoffs / self.cutoffs if self.cutoffs else 0.0,
+            "avg_cutoff_index": self.cutoff_index_sum / self.cutoffs if self.cutoffs else 0.0,
+        }
+        if self.ladder is not None:
+            out.update({f"ladder_{k}": v for k, v in self.ladder.stats().items()})
+        return out
@@ -0,0 +1,156 @@
+# core/search/parallel.py
+from __future__ import annotations
+import multiprocessing as mp
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from typing import Any, Dict, List, Optional, Tuple
+from core.game_state import GameState
+from core.move import Move
+
+from .position import SearchPosition
+from .stats import SearchStats, TT_COUNTS
+from .time_manager import MoveBudget
+from .transposition import decode_move
+
+# --- Trạng thái trong tiến trình worker (giữ "ấm" giữa các nước: searcher + bảng chuyển vị) ---
+_worker_searcher = None
+_worker_alpha = None
+_worker_search_id = None
+
+def _init_worker(config: Dict[str, Any], shared_alpha, shared_deadline) -> None:
+    global _worker_searcher, _worker_alpha
+    from .minimax import MinimaxSearcher
+    _worker_searcher = MinimaxSearcher(workers=1, **config)
+    # giờ dừng chung (time.time()): tiến trình chính dời / đặt -inf khi ponderhit / stop
+    _worker_searcher.shared_deadline = shared_deadline
+    _worker_alpha = shared_alpha
+
+def _search_root_move(search_id: int, state: GameState, mv: Move, depth: int,
+                      player: int) -> Tuple[Move, float, float, SearchStats, bool, List[Move]]:
+    """Tìm con của gốc sau nước `mv` với cửa sổ (alpha chung, +inf).
+    Trả về (mv, giá trị, alpha đã dùng, số liệu của lần tìm này, đã tìm xong?, PV bắt đầu bằng mv)."""
+    global _worker_search_id
+    s = _worker_searcher
+    if s.tt is not None and _worker_search_id != search_id:
+        if s._tt_player != player:
+            s.tt.clear(); s._tt_player = player
+        s.tt.new_search()
+    _worker_search_id = search_id
+    s._t0 = time.perf_counter()
+    s._nodes = s._leaves = 0
+    s._t_movegen = s._t_order = s._t_eval = 0.0
+    s.orderer.reset_stats()
+    tt0 = s.tt.stats() if s.tt is not None else {}
+    s._stopped = False
+    s._root_ply = len(state.move_history)
+    s._prev_pv = []
+    s._tick = 0
+    # giới hạn giờ chỉ theo shared_deadline (đọc lại mỗi lần kiểm tra giờ)
+    s._budget = MoveBudget(None, None)
+
+    alpha = _worker_alpha.value
+    pos = SearchPosition.from_state(state)
+    pos.make_move(mv)
+    val = s._alpha_beta(pos, depth - 1, alpha, float("inf"), player)
+    completed = not s._stopped
+    if completed and val > alpha:
+        with _worker_alpha.get_lock():
+            if val > _worker_alpha.value:
+                _worker_alpha.value = val
+    st = SearchStats(nodes=s._nodes, leaves=s._leaves, time_movegen=s._t_movegen, time_ordering=s._t_order,
+                     time_eval=s._t_eval, cutoffs=s.orderer.cutoffs,
+                     first_move_cutoffs=s.orderer.first_move_cutoffs)
+    if tt0:
+        # bảng chuyển vị của worker dùng chung cả lần search -> chỉ lấy phần tăng thêm
+        tt1 = s.tt.stats()
+        st.tt = {k: tt1[k] - tt0[k] for k in TT_COUNTS}
+    # con ở ply 1 (tính từ gốc) -> PV của nó ở s._pv[1]; rỗng khi con cắt ngay bằng bảng chuyển vị
+    # -> lấy nước tốt nhất đã lưu của con (sau khi chụp số liệu, không tính vào probe / hit)
+    child = s._pv.get(1, [])
+    if not child and completed and s.tt is not None:
+        entry = s.tt.probe(pos.position_key())
+        tt_move = decode_move(entry[3], pos.board.size) if entry is not None else None
+        child = [tt_move] if tt_move is not None else []
+    return mv, val, alpha, st, completed, [mv] + child
+
+
+class ParallelRootSearch:
+    """
+    Chia các nước ở gốc cho một ProcessPoolExecutor (worker giữ ấm giữa các nước).
+    Nước đầu (đã xếp tốt nhất) tìm trước để có alpha, các nước còn lại chạy song song
+    và đọc alpha chung (multiprocessing.Value) để cắt tỉa. Kết quả gom trong ngân sách thời gian.
+    Giờ dừng cũng là 1 Value chung (time.time(), +inf = không giới hạn): set_deadline() / stop()
+    đổi được từ thread khác khi search đang chạy (ponderhit, UI dừng), worker thấy ở lần kiểm tra giờ sau.
+    """
+    def __init__(self, workers: int, config: Dict[str, Any]):
+        self.workers = workers
+        ctx = mp.get_context("spawn")
+        self._alpha = ctx.Value("d", float("-inf"))
+        self._deadline = ctx.Value("d", float("inf"))
+        self._pool = ProcessPoolExecutor(max_workers=workers, mp_context=ctx, initializer=_init_worker,
+                                         initargs=(config, self._alpha, self._deadline))
+        self._search_id = 0
+
+    def new_search(self) -> None:
+        self._search_id += 1
+
+    def set_deadline(self, deadline: Optional[float]) -> None:
+        """Giờ dừng (time.time()) của search đang chạy / sắp chạy; None = không giới hạn."""
+        self._deadline.value = float("inf") if deadline is None else deadline
+
+    def stop(self) -> None:
+        """Dừng ngay: worker bỏ dở nước đang tìm, search_depth trả về những gì đã xong."""
+        self._deadline.value = float("-inf")
+
+    def search_depth(self, state: GameState, moves: List[Move], depth: int,
+                     player: int) -> Tuple[float, List[Move], SearchStats, bool]:
+        """Một vòng độ sâu `depth` ở gốc. Trả về (điểm, PV của nước tốt nhất ([] nếu chưa có),
+        số liệu gộp của các worker, đã xong hết?)."""
+        if not moves:
+            # không còn nước PLAY nào ở gốc -> người gọi tự chọn PASS
+            return float("-inf"), [], SearchStats(), True
+        with self._alpha.get_lock():
+            self._alpha.value = float("-inf")
+        order = {mv: i for i, mv in enumerate(moves)}
+        results: List[Tuple[Move, float, float, SearchStats, bool, List[Move]]] = []
+
+        def timeout() -> Optional[float]:
+            # đọc lại mỗi lần chờ: giờ dừng có thể bị dời (ponderhit) / đặt -inf (stop)
+            deadline = self._deadline.value
+            return None if deadline == float("inf") else max(0.0, deadline - time.time())
+
+        first = self._pool.submit(_search_root_move, self._search_id, state, moves[0], depth, player)
+        pending = {first}
+        done, _ = wait(pending, timeout=timeout())
+        if first in done:
+            results.append(first.result())
+            pending = {self._pool.submit(_search_root_move, self._search_id, state, mv, depth, player)
+                       for mv in moves[1:]}
+            while pending:
+                done, pending = wait(pending, timeout=timeout(), return_when=FIRST_COMPLETED)
+                if not done:
+                    break   # hết giờ: bỏ kết quả dở
+                results.extend(f.result() for f in done)
+        running = [f for f in pending if not f.cancel()]
+        if running:
+            # task dở còn chạy sẽ chiếm worker (và nhận giờ dừng mới) của lần search sau
+            # -> dừng hẳn rồi chờ trả về; lần search sau tự đặt lại giờ dừng (set_deadline)
+            self.stop()
+            wait(running)
+
+        work = SearchStats()
+        for r in results:
+            work.merge(r[3])
+        finished = [r for r in results if r[4]]
+        all_done = len(finished) == len(moves)
+        if not finished:
+            return float("-inf"), [], work, False
+        # giá trị <= alpha đã dùng chỉ là cận trên -> khi hoà ưu tiên giá trị chính xác, rồi thứ tự ordering
+        best = max(finished, key=lambda r: (r[1], r[1] > r[2], -order[r[0]]))
+        return best[1], best[5], work, all_done
+
+    def close(self) -> None:
+        # chờ worker thoát hẳn: worker còn đang khởi động vẫn phải unpickle các Value chung (initargs),
+        # giải phóng chúng trước thì worker lỗi FileNotFoundError ở SemLock._rebuild
+        self.stop()
+        self._pool.shutdown(wait=True, cancel_futures=True)
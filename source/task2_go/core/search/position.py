@@ -0,0 +1,113 @@
+# core/search/position.py
+from __future__ import annotations
+from typing import List, Optional, Tuple
+import numpy as np
+from core.board import Board
+from core.game_state import GameState, moves_from_mask
+from core.move import Move
+from core.rules import Rules, position_set
+from config.settings import KO_RULE
+
+Coord = Tuple[int, int]
+
+class SearchPosition:
+    """
+    Vị trí dùng riêng cho tìm kiếm: sửa tại chỗ bằng make_move/unmake_move
+    (không copy bàn cờ / lịch sử cho mỗi node như GameState.apply_move).
+    Có cùng các thuộc tính đọc như GameState (board, to_play, move_history,
+    hash_history, legal_moves, is_terminal) nên heuristic dùng chung được.
+    Superko: tập thế đã có (PositionSet) push / pop cùng make / unmake; khoá bảng chuyển vị
+    không gồm lịch sử (như mọi engine, chấp nhận sai lệch hiếm do lặp thế).
+    """
+    def __init__(self, board: Board, to_play: int, move_history: List[Move], hash_history: List[int],
+                 ko_rule: str = KO_RULE):
+        self.board = board
+        self.to_play = to_play
+        self.move_history = move_history
+        self.hash_history = hash_history
+        self.ko_rule = ko_rule
+        self._seen = position_set(ko_rule, hash_history, to_play)
+        self._rules = Rules()
+        # ngăn xếp undo: quân bị bắt của từng nước đã make (PASS/RESIGN -> [])
+        self._undo: List[List[Coord]] = []
+        # cache nước hợp lệ của vị trí hiện tại, khoá theo (hash hiện tại, hash ko, digest tập superko)
+        self._legal_key: Optional[Tuple[int, Optional[int], int]] = None
+        self._legal_mask: Optional[np.ndarray] = None
+        self._legal_list: List[Move] = []
+
+    @staticmethod
+    def from_state(state: GameState) -> "SearchPosition":
+        pos = SearchPosition(state.board.copy(), state.to_play,
+                             list(state.move_history), list(state.hash_history), state.ko_rule)
+        if state._legal_list is not None:
+            # dùng lại mặt nạ đã cache trên GameState (UI có thể đã tính)
+            pos._legal_key = pos._cache_key()
+            pos._legal_mask = state.legal_mask()
+            pos._legal_list = state.legal_moves()
+        return pos
+
+    def to_state(self) -> GameState:
+        return GameState(board=self.board.copy(), to_play=self.to_play,
+                         move_history=list(self.move_history),
+                         hash_history=list(self.hash_history), ko_rule=self.ko_rule)
+
+    def _last_hash(self) -> Optional[int]:
+        return self.hash_history[-2] if len(self.hash_history) >= 2 else None
+
+    def _cache_key(self) -> Tuple[int, Optional[int], int]:
+        return (self.board.hash_key(self.to_play), self._last_hash(),
+                self._seen.digest if self._seen is not None else 0)
+
+    def position_key(self) -> int:
+        """Khoá 64-bit cho bảng chuyển vị: hash có lượt đi; nếu nước vừa rồi bắt đúng 1 quân
+        (chỉ khi đó mới có thể vướng ko) thì trộn thêm hash ko để không lẫn 2 trạng thái ko khác nhau."""
+        h = self.hash_history[-1]
+        ko_possible = len(self._undo[-1]) == 1 if self._undo else len(self.hash_history) >= 2
+        if ko_possible:
+            h ^= (self.hash_history[-2] * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF
+        return h
+
+    def legal_mask(self) -> np.ndarray:
+        key = self._cache_key()
+        if self._legal_key != key:
+            self._legal_mask = self._rules.legal_mask(self.board, self.to_play, last_hash=key[1], seen=self._seen)
+            self._legal_list = moves_from_mask(self._legal_mask)
+            self._legal_key = key
+        return self._legal_mask
+
+    def legal_moves(self) -> List[Move]:
+        self.legal_mask()
+        return list(self._legal_list)
+
+    def is_terminal(self) -> bool:
+        h = self.move_history
+        if len(h) >= 2 and h[-1].kind == 'PASS' and h[-2].kind == 'PASS':
+            return True
+        return bool(h) and h[-1].kind == 'RESIGN'
+
+    # --- make / unmake ---
+    def make_move(self, mv: Move) -> None:
+        if mv.kind == 'PLAY':
+            captured = self._rules.play_move(self.board, self.to_play, mv.x, mv.y,
+                                             last_hash=self._last_hash(), seen=self._seen)
+        else:
+            captured = []
+        self._undo.append(captured)
+        self.move_history.append(mv)
+        self.to_play = -self.to_play
+        self.hash_history.append(self.board.hash_key(self.to_play))
+        if self._seen is not None:
+            self._seen.push(self.board.hash_key(), self.to_play)
+
+    def unmake_move(self) -> None:
+        captured = self._undo.pop()
+        mv = self.move_history.pop()
+        self.hash_history.pop()
+        if self._seen is not None:
+            self._seen.pop(self.board.hash_key(), self.to_play)
+        self.to_play = -self.to_play
+        if mv.kind == 'PLAY':
+            self.board.remove_stone(mv.x, mv.y)
+            opp = -self.to_play
+            for cx, cy in captured:
+                self.board.place_stone(opp, cx, cy)
@@ -0,0 +1,100 @@
+# core/search/stats.py
+from __future__ import annotations
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+import json
+
+# bộ đếm cộng được của TranspositionTable.stats() (các tỉ lệ tính lại sau khi cộng)
+TT_COUNTS = ("probes", "hits", "cutoffs", "stores")
+
+@dataclass
+class SearchStats:
+    """
+    Số liệu của một lần MinimaxSearcher.search():
+    - nodes/leaves: node trong (được mở rộng) / lá (được chấm heuristic), tổng và theo từng vòng độ sâu
+    - thời gian: tổng, sinh nước đi, sắp xếp nước, chấm điểm
+    - cutoffs / cutoff ở nước đầu (từ MoveOrderer), số liệu bảng chuyển vị
+    Các chỉ số suy ra (nps, hệ số nhánh hiệu dụng, tỉ lệ cắt) tính trong to_dict().
+    """
+    nodes: int = 0
+    leaves: int = 0
+    nodes_by_depth: Dict[int, int] = field(default_factory=dict)
+    leaves_by_depth: Dict[int, int] = field(default_factory=dict)
+    elapsed: float = 0.0
+    time_movegen: float = 0.0
+    time_ordering: float = 0.0
+    time_eval: float = 0.0
+    completed_depth: int = 0
+    score: Optional[float] = None
+    pv: List[str] = field(default_factory=list)
+    cutoffs: int = 0
+    first_move_cutoffs: int = 0
+    aspiration_researches: int = 0
+    tt: Dict[str, float] = field(default_factory=dict)
+
+    def nps(self) -> float:
+        return (self.nodes + self.leaves) / self.elapsed if self.elapsed > 0 else 0.0
+
+    def ebf(self) -> Optional[float]:
+        """Hệ số nhánh hiệu dụng: số node (trong + lá) của vòng sâu nhất / vòng liền trước."""
+        depths = sorted(self.nodes_by_depth)
+        if len(depths) < 2:
+            return None
+        a, b = depths[-2], depths[-1]
+        prev = self.nodes_by_depth[a] + self.leaves_by_depth.get(a, 0)
+        last = self.nodes_by_depth[b] + self.leaves_by_depth.get(b, 0)
+        return last / prev if prev else None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "nodes": self.nodes,
+            "leaves": self.leaves,
+            "nodes_by_depth": {str(d): v for d, v in self.nodes_by_depth.items()},
+            "leaves_by_depth": {str(d): v for d, v in self.leaves_by_depth.items()},
+            "elapsed": round(self.elapsed, 6),
+            "nps": round(self.nps(), 1),
+            "ebf": None if self.ebf() is None else round(self.ebf(), 3),
+            "time_movegen": round(self.time_movegen, 6),
+            "time_ordering": round(self.time_ordering, 6),
+            "time_eval": round(self.time_eval, 6),
+            "completed_depth": self.completed_depth,
+            "score": self.score,
+            "pv": self.pv,
+            "cutoff_rate": round(self.cutoffs / self.nodes, 4) if self.nodes else 0.0,
+            "first_move_cutoff_rate": round(self.first_move_cutoffs / self.cutoffs, 4) if self.cutoffs else 0.0,
+            "aspiration_researches": self.aspiration_researches,
+            "tt": self.tt,
+        }
+
+    def merge(self, other: "SearchStats") -> None:
+        """Cộng dồn các bộ đếm (node, lá, thời gian, cutoff, bảng chuyển vị) của `other`,
+        vd. số liệu worker của search song song ở gốc."""
+        self.nodes += other.nodes
+        self.leaves += other.leaves
+        for mine, theirs in ((self.nodes_by_depth, other.nodes_by_depth),
+                             (self.leaves_by_depth, other.leaves_by_depth)):
+            for d, v in theirs.items():
+                mine[d] = mine.get(d, 0) + v
+        self.time_movegen += other.time_movegen
+        self.time_ordering += other.time_ordering
+        self.time_eval += other.time_eval
+        self.cutoffs += other.cutoffs
+        self.first_move_cutoffs += other.first_move_cutoffs
+        if other.tt:
+            tt = {k: self.tt.get(k, 0) + other.tt.get(k, 0) for k in TT_COUNTS}
+            tt["hit_rate"] = tt["hits"] / tt["probes"] if tt["probes"] else 0.0
+            tt["cutoff_rate"] = tt["cutoffs"] / tt["probes"] if tt["probes"] else 0.0
+            self.tt = tt
+
+    def write_jsonl(self, path: str, **extra: Any) -> None:
+        """Ghi thêm 1 dòng JSON (kèm các trường `extra`, vd. số nước của ván) vào cuối file."""
+        row = dict(extra); row.update(self.to_dict())
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(row, ensure_ascii=False) + "\n")
+
+
+def format_move(mv) -> str:
+    """Nước đi dạng ngắn cho log / overlay: 'x,y', 'pass', 'resign'."""
+    if mv.kind == "PLAY":
+        return f"{mv.x},{mv.y}"
+    return mv.kind.lower()
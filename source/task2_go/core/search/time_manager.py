@@ -0,0 +1,72 @@
+# core/search/time_manager.py
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Optional
+import numpy as np
+from core.board import EMPTY
+
+@dataclass(frozen=True)
+class MoveBudget:
+    """Ngân sách 1 nước (giây, None = không giới hạn).
+    soft: mức nhắm tới (không bắt đầu vòng iterative deepening mới khi đã gần hết);
+    hard: mức cắt ngang search đang chạy."""
+    soft: Optional[float]
+    hard: Optional[float]
+
+
+class TimeManager:
+    """
+    Chia thời gian còn lại trên đồng hồ cho từng nước:
+    - ước lượng số nước còn phải đi của bên mình từ số nước đã đi và độ kín bàn cờ
+      (ván dài cỡ game_length_factor * size^2 nước; bàn càng kín càng ít nước còn lại)
+    - soft = phần chia đều (trừ overhead mỗi nước), hard = hard_factor * soft nhưng không quá
+      max_fraction thời gian còn lại
+    - không có đồng hồ => dùng timebox cố định (soft = hard = flat)
+    Trong lúc search: nước tốt nhất đổi giữa 2 vòng => nới soft (unstable_factor, tối đa hard);
+    chỉ bắt đầu vòng mới khi thời gian đã dùng < start_fraction * soft (vòng sau tốn gấp nhiều lần).
+    """
+    def __init__(self, min_moves_to_go: int = 10, game_length_factor: float = 1.2,
+                 overhead: float = 0.05, min_time: float = 0.05, hard_factor: float = 3.0,
+                 max_fraction: float = 0.2, unstable_factor: float = 1.6, start_fraction: float = 0.5):
+        self.min_moves_to_go = min_moves_to_go
+        self.game_length_factor = game_length_factor
+        self.overhead = overhead
+        self.min_time = min_time
+        self.hard_factor = hard_factor
+        self.max_fraction = max_fraction
+        self.unstable_factor = unstable_factor
+        self.start_fraction = start_fraction
+
+    def moves_to_go(self, state) -> float:
+        n2 = state.board.size ** 2
+        empties = int(np.count_nonzero(np.asarray(state.board.grid) == EMPTY))
+        by_length = n2 * self.game_length_factor - len(state.move_history)
+        # bàn kín dần -> tối đa cỡ nửa số ô trống còn lại cho mỗi bên
+        left = min(max(by_length, 0.0), float(empties)) / 2
+        return max(float(self.min_moves_to_go), left)
+
+    def budget(self, state, remaining: Optional[float], flat: Optional[float]) -> MoveBudget:
+        """Ngân sách cho nước của state.to_play khi đồng hồ còn `remaining` giây."""
+        if remaining is None:
+            return MoveBudget(flat, flat)
+        mtg = self.moves_to_go(state)
+        usable = max(0.0, remaining - self.overhead * mtg)
+        soft = usable / mtg
+        hard = min(soft * self.hard_factor, usable * self.max_fraction)
+        # luôn chừa overhead của nước này để không thua vì hết giờ
+        cap = max(self.min_time, remaining - self.overhead)
+        hard = min(max(hard, self.min_time), cap)
+        soft = min(max(soft, self.min_time), hard)
+        return MoveBudget(soft, hard)
+
+    def extend(self, budget: MoveBudget) -> MoveBudget:
+        """Nới soft khi nước tốt nhất chưa ổn định (không vượt hard)."""
+        if budget.soft is None:
+            return budget
+        soft = budget.soft * self.unstable_factor
+        return MoveBudget(min(soft, budget.hard) if budget.hard is not None else soft, budget.hard)
+
+    def start_next_iteration(self, elapsed: float, budget: MoveBudget) -> bool:
+        if budget.soft is None:
+            return True
+        return elapsed < budget.soft * self.start_fraction
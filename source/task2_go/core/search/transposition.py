@@ -0,0 +1,93 @@
+# core/search/transposition.py
+from __future__ import annotations
+from typing import Dict, Optional, Tuple
+import numpy as np
+from core.move import Move
+
+# Cờ loại giá trị lưu trong bảng
+EXACT, LOWER, UPPER = 0, 1, 2
+
+# Mã hoá nước đi vào int16: PLAY = y*size + x, còn lại là số âm
+NO_MOVE, PASS_CODE, RESIGN_CODE = -1, -2, -3
+
+# key u64 + value f64 + move i16 + depth i8 + flag i8 + age u8
+ENTRY_BYTES = 8 + 8 + 2 + 1 + 1 + 1
+
+def encode_move(mv: Optional[Move], size: int) -> int:
+    if mv is None: return NO_MOVE
+    if mv.kind == "PLAY": return mv.y * size + mv.x
+    return PASS_CODE if mv.kind == "PASS" else RESIGN_CODE
+
+def decode_move(code: int, size: int) -> Optional[Move]:
+    if code >= 0:
+        y, x = divmod(code, size)
+        return Move.play(x, y)
+    if code == PASS_CODE: return Move.pass_()
+    if code == RESIGN_CODE: return Move.resign()
+    return None
+
+class TranspositionTable:
+    """
+    Bảng chuyển vị kích thước cố định, lưu trong các mảng NumPy cấp phát sẵn
+    theo ngân sách `size_mb` (số ô = luỹ thừa 2 lớn nhất vừa ngân sách).
+    - Chỉ số ô = key & mask (key là hash 64-bit của vị trí)
+    - Thay thế: ô trống / cùng key / ô của lần search cũ / độ sâu mới >= độ sâu đang lưu
+    - Đếm probe, hit, cutoff để đo hiệu quả
+    """
+    def __init__(self, size_mb: float = 16.0):
+        n = max(1, int(size_mb * (1 << 20)) // ENTRY_BYTES)
+        n = 1 << (n.bit_length() - 1)
+        self.capacity = n
+        self._mask = n - 1
+        self._keys = np.zeros(n, dtype=np.uint64)
+        self._values = np.zeros(n, dtype=np.float64)
+        self._moves = np.full(n, NO_MOVE, dtype=np.int16)
+        self._depths = np.full(n, -1, dtype=np.int8)
+        self._flags = np.zeros(n, dtype=np.int8)
+        self._ages = np.zeros(n, dtype=np.uint8)
+        self._generation = 0
+        self.probes = self.hits = self.cutoffs = self.stores = 0
+
+    def new_search(self) -> None:
+        """Gọi đầu mỗi lần search: tăng thế hệ (để ưu tiên thay ô cũ) và reset thống kê."""
+        self._generation = (self._generation + 1) & 0xFF
+        self.probes = self.hits = self.cutoffs = self.stores = 0
+
+    def clear(self) -> None:
+        self._depths.fill(-1)
+        self._moves.fill(NO_MOVE)
+
+    def probe(self, key: int) -> Optional[Tuple[int, int, float, int]]:
+        """(depth, flag, value, move_code) nếu có ô khớp key, ngược lại None."""
+        self.probes += 1
+        i = key & self._mask
+        if self._depths[i] < 0 or int(self._keys[i]) != key:
+            return None
+        self.hits += 1
+        return int(self._depths[i]), int(self._flags[i]), float(self._values[i]), int(self._moves[i])
+
+    def store(self, key: int, depth: int, flag: int, value: float, move_code: int = NO_MOVE) -> None:
+        i = key & self._mask
+        old_depth = int(self._depths[i])
+        same = int(self._keys[i]) == key
+        if old_depth >= 0 and not same and self._ages[i] == self._generation and depth < old_depth:
+            return
+        if same and move_code == NO_MOVE:
+            move_code = int(self._moves[i])   # giữ nước tốt nhất cũ nếu lần này không có
+        self._keys[i] = key
+        self._values[i] = value
+        self._moves[i] = move_code
+        self._depths[i] = min(depth, 127)
+        self._flags[i] = flag
+        self._ages[i] = self._generation
+        self.stores += 1
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "probes": self.probes,
+            "hits": self.hits,
+            "cutoffs": self.cutoffs,
+            "stores": self.stores,
+            "hit_rate": self.hits / self.probes if self.probes else 0.0,
+            "cutoff_rate": self.cutoffs / self.probes if self.probes else 0.0,
+        }
@@ -0,0 +1,50 @@
+
+from __future__ import annotations
+import random
+from typing import Dict, List
+import numpy as np
+
+# Khoá Zobrist 64-bit sinh từ seed cố định -> giống nhau giữa các tiến trình/lần chạy
+# (dùng được cho bảng chuyển vị, opening book, cache lưu ra đĩa).
+ZOBRIST_SEED = 0x60_5EED
+_BLACK, _WHITE = 1, -1   # trùng với core.board.BLACK/WHITE (tránh import vòng)
+
+_TABLES: Dict[int, Dict[int, List[int]]] = {}
+
+SIDE_KEY: int = random.Random(ZOBRIST_SEED).getrandbits(64)
+
+def stone_keys(size: int) -> Dict[int, List[int]]:
+    """{màu: [khoá theo chỉ số phẳng p = y*size + x]} cho bàn `size`."""
+    table = _TABLES.get(size)
+    if table is None:
+        rng = random.Random(ZOBRIST_SEED * 1_000_003 + size)
+        n = size * size
+        table = {_BLACK: [rng.getrandbits(64) for _ in range(n)],
+                 _WHITE: [rng.getrandbits(64) for _ in range(n)]}
+        _TABLES[size] = table
+    return table
+
+_ARRAYS: Dict[int, Dict[int, np.ndarray]] = {}
+
+def stone_key_array(size: int) -> Dict[int, np.ndarray]:
+    """stone_keys dạng mảng uint64 (XOR cả loạt ô bằng numpy)."""
+    arr = _ARRAYS.get(size)
+    if arr is None:
+        arr = {c: np.array(k, dtype=np.uint64) for c, k in stone_keys(size).items()}
+        _ARRAYS[size] = arr
+    return arr
+
+def side_key(to_play: int) -> int:
+    """Gộp lượt đi vào khoá: Đen đi = 0, Trắng đi = SIDE_KEY."""
+    return SIDE_KEY if to_play == _WHITE else 0
+
+def full_hash(grid: np.ndarray) -> int:
+    """Tính lại khoá bàn cờ từ đầu (không gồm lượt đi) - dùng để đối chiếu/chuẩn hoá đối xứng."""
+    size = grid.shape[0]
+    keys = stone_keys(size)
+    h = 0
+    flat = grid.reshape(-1).tolist()
+    for p, v in enumerate(flat):
+        if v:
+            h ^= keys[v][p]
+    return h
@@ -2,13 +2,14 @@
 import pygame
 from ui.menu import MenuScene
 from ui.game_scene import GameScene
+from config.settings import BOARD_SIZE
 from core.move import Move
 from core.agents.human_agent import HumanAgent
 
 def main():
     pygame.init()
     screen = pygame.display.set_mode((1000, 840))
-    pygame.display.set_caption("Go 9x9 — PvP / VsAI")
+    pygame.display.set_caption(f"Go {BOARD_SIZE}x{BOARD_SIZE} — PvP / VsAI")
     clock = pygame.time.Clock()
 
     scene = "menu"; menu = MenuScene(screen); game = None; running = True
@@ -20,7 +21,10 @@ def main():
                 game.handle_click(e.pos)
             if scene == "game" and e.type == pygame.KEYDOWN:
                 if e.key == pygame.K_ESCAPE:
+                    game.close()
                     scene = "menu"; menu = MenuScene(screen)
+                if e.key == pygame.K_F3:
+                    game.toggle_stats()
                 if e.key == pygame.K_SPACE:
                     player = game.state.to_play
                     agent = game.agents[player]
@@ -35,11 +39,14 @@ def main():
             game.step()
             result = game.draw(events)
             if result == "menu":
+                game.close()
                 scene = "menu"
                 menu = MenuScene(screen)
                 game = None
 
         pygame.display.flip(); clock.tick(60)
+    if game is not None:
+        game.close()
     pygame.quit()
 
 if __name__ == "__main__":
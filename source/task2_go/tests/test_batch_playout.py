@@ -0,0 +1,29 @@
+# tests/test_batch_playout.py
+"""BatchPlayout phải đi đúng luật như Rules.play_move (simple-ko) và from_state giữ nguyên nước hợp lệ của thế gốc."""
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from benchmarks.batch_playout import check, check_from_state
+from core.game_state import GameState
+from core.move import Move
+from core.search.batch_playout import BatchPlayout
+
+@pytest.mark.parametrize("size,seed", [(5, 1), (9, 2), (13, 3)])
+def test_batch_matches_rules(size, seed):
+    r = check(size, games=16, seed=seed, max_moves=3 * size * size)
+    assert r["moves"] > 0
+    assert r["errors"] == []
+
+@pytest.mark.parametrize("size", [5, 9])
+def test_from_state_matches_game_state(size):
+    r = check_from_state(size, games=4, seed=size)
+    assert r["states"] > 0
+    assert r["errors"] == []
+
+def test_from_state_after_pass():
+    s = GameState.new_game(9).apply_move(Move.play(4, 4)).apply_move(Move.pass_())
+    sim = BatchPlayout.from_state(s, 3, seed=0)
+    assert (sim.ko == -1).all() and (sim.passes == 1).all()
+    assert np.array_equal(sim.legal_mask()[0], s.legal_mask())
@@ -0,0 +1,50 @@
+# tests/test_ladder.py
+"""Đọc thang: quân Trắng 2 liberties giữa bàn 13x13, Đen đuổi được theo cả 2 hướng; quân chặn (ladder breaker)
+trên đường chạy chỉ cứu được hướng đó."""
+from __future__ import annotations
+
+import pytest
+
+from core.board import BLACK, WHITE, new_board
+from core.search.ladder import LadderReader
+
+BREAK_DOWN_LEFT = (2, 10)     # chặn đường chạy sau nước Đen (7,6)
+BREAK_UP_RIGHT = (10, 2)      # chặn đường chạy sau nước Đen (6,7)
+
+def _board(backend, breakers=()):
+    b = new_board(13, backend)
+    b.place_stone(WHITE, 6, 6)
+    for x, y in [(5, 6), (6, 5), (7, 7)]:
+        b.place_stone(BLACK, x, y)
+    for x, y in breakers:
+        b.place_stone(WHITE, x, y)
+    return b
+
+@pytest.mark.parametrize("backend", ["numpy", "bitboard"])
+def test_open_ladder_works(backend):
+    b, r = _board(backend), LadderReader()
+    assert r.is_dead(b, 6, 6, BLACK)
+    assert not r.is_dead(b, 6, 6, WHITE)
+    assert r.move_captures(b, BLACK, 7, 6) and r.move_captures(b, BLACK, 6, 7)
+    assert r.dead_stones(b, BLACK) == {BLACK: 0, WHITE: 1}
+
+@pytest.mark.parametrize("backend", ["numpy", "bitboard"])
+def test_breaker_saves_one_direction(backend):
+    r = LadderReader()
+    b = _board(backend, [BREAK_DOWN_LEFT])
+    assert not r.move_captures(b, BLACK, 7, 6)
+    assert r.move_captures(b, BLACK, 6, 7)
+    assert r.is_dead(b, 6, 6, BLACK)
+    b = _board(backend, [BREAK_DOWN_LEFT, BREAK_UP_RIGHT])
+    assert not r.move_captures(b, BLACK, 7, 6) and not r.move_captures(b, BLACK, 6, 7)
+    assert not r.is_dead(b, 6, 6, BLACK)
+
+def test_escape_fails_in_ladder():
+    r = LadderReader()
+    b = _board("numpy")
+    b.place_stone(BLACK, 7, 6)              # atari: Trắng chỉ còn (6,7)
+    assert r.is_dead(b, 6, 6, WHITE)
+    assert r.escape_fails(b, WHITE, 6, 7)
+    b = _board("numpy", [BREAK_DOWN_LEFT])
+    b.place_stone(BLACK, 7, 6)
+    assert not r.escape_fails(b, WHITE, 6, 7)
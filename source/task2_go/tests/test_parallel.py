@@ -0,0 +1,82 @@
+# tests/test_parallel.py
+"""Search song song ở gốc (workers > 1): stop() / ponderhit() tới được worker, close() không làm worker lỗi."""
+from __future__ import annotations
+import threading
+import time
+
+import pytest
+
+from benchmarks.suite import load_position
+from core.search.minimax import MinimaxSearcher
+
+@pytest.fixture(scope="module")
+def searcher():
+    ms = MinimaxSearcher(depth_limit=12, time_limit_sec=1.0, workers=2)
+    yield ms
+    ms.close()
+
+def _run(ms, pondering: bool, after: float, action) -> float:
+    s = load_position("opening")
+    ms.stop_event.clear()
+    ms.pondering = pondering
+    timer = threading.Timer(after, action)
+    t0 = time.perf_counter()
+    timer.start()
+    mv = ms.search(s, s.to_play)
+    timer.join()
+    assert mv.kind == "PLAY" and ms.completed_depth >= 1
+    return time.perf_counter() - t0
+
+def test_stop_ends_ponder_search(searcher):
+    # ponder không giới hạn giờ: chỉ dừng được nhờ stop()
+    assert _run(searcher, True, 1.0, searcher.stop) < 3.0
+
+def test_ponderhit_applies_budget(searcher):
+    # ponderhit sau 1s -> thêm ngân sách time_limit_sec (1s) tính từ lúc đó
+    assert _run(searcher, True, 1.0, searcher.ponderhit) < 4.0
+
+def test_timed_search_after_stop(searcher):
+    # task dở của lần trước không được chiếm worker của lần search sau
+    assert _run(searcher, False, 0.0, lambda: None) < 3.0
+
+def test_close_with_fresh_pool(capfd):
+    s = load_position("fight")
+    for _ in range(2):
+        ms = MinimaxSearcher(depth_limit=1, time_limit_sec=None, workers=3)
+        ms.search(s, s.to_play)
+        ms.close()
+    assert "Traceback" not in capfd.readouterr().err
+
+def test_background_ponder_with_workers(searcher):
+    # PV song song có nước trả lời dự đoán -> BackgroundAgent ponder được, ponderhit tới worker
+    from core.agents.background import BackgroundAgent
+    from core.agents.minimax_agent import MinimaxAgent
+    s = load_position("opening")
+    bg = BackgroundAgent(MinimaxAgent(searcher, s.to_play, book=None))
+    try:
+        bg.request(s)
+        while (mv := bg.poll()) is None:
+            time.sleep(0.01)
+        assert len(searcher.pv) >= 2
+        after = s.apply_move(mv)
+        bg.ponder(after)
+        assert bg.predicted is not None
+        time.sleep(1.0)
+        t0 = time.perf_counter()
+        bg.request(after.apply_move(bg.predicted))
+        assert bg.ponder_hits == 1
+        while bg.poll() is None:
+            time.sleep(0.01)
+        assert time.perf_counter() - t0 < 3.0
+    finally:
+        bg.cancel()
+
+def test_stats_count_root_nodes():
+    # gốc mở rộng ở tiến trình chính cũng là 1 node mỗi vòng, như search tuần tự
+    s = load_position("opening")
+    for workers in (1, 2):
+        ms = MinimaxSearcher(depth_limit=2, time_limit_sec=None, workers=workers)
+        ms.search(s, s.to_play)
+        ms.close()
+        st = ms.last_stats
+        assert st.nodes_by_depth[1] == 1 and st.nodes == sum(st.nodes_by_depth.values())
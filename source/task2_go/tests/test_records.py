@@ -0,0 +1,86 @@
+# tests/test_records.py
+"""Vòng khứ hồi biên bản ván: SGF, file .gor (RecordStore / replay_positions) và opening book."""
+from __future__ import annotations
+import random
+
+import numpy as np
+import pytest
+
+from core.board import BLACK, WHITE
+from core.game_state import GameState
+from core.move import Move
+from core.records import GameRecord, RecordStore, replay_positions, write_records
+from core.search.opening_book import BookBuilder, OpeningBook, symmetries
+
+def _random_record(size: int, seed: int, moves: int = 60, winner=BLACK, resign: bool = False) -> GameRecord:
+    rng = random.Random(seed)
+    s = GameState.new_game(size)
+    for _ in range(moves):
+        plays = [m for m in s.legal_moves() if m.kind == "PLAY"]
+        s = s.apply_move(rng.choice(plays) if plays and rng.random() > 0.05 else Move.pass_())
+        if s.is_terminal():
+            break
+    rec = GameRecord.from_state(s, komi=6.5, winner=winner)
+    if resign and not s.is_terminal():
+        rec.moves.append(Move.resign())
+        rec.winner = -s.to_play
+    return rec
+
+@pytest.mark.parametrize("size", [9, 13, 19])
+def test_sgf_round_trip(size):
+    rec = _random_record(size, seed=size)
+    rec.props["PB"] = "a]b\\c"
+    back = GameRecord.from_sgf(rec.to_sgf())
+    assert (back.size, back.moves, back.komi, back.winner) == (rec.size, rec.moves, rec.komi, rec.winner)
+    assert back.props["PB"] == "a]b\\c"
+    assert back.to_state().board.hash_key() == rec.to_state().board.hash_key()
+
+def test_sgf_resign_round_trip():
+    rec = _random_record(9, seed=5, moves=21, resign=True)
+    assert rec.moves[-1].kind == "RESIGN"
+    back = GameRecord.from_sgf(rec.to_sgf())
+    assert back.moves == rec.moves and back.winner == rec.winner
+
+def test_gor_round_trip(tmp_path):
+    recs = [_random_record(size, seed=i, winner=w) for i, (size, w) in
+            enumerate([(9, BLACK), (9, WHITE), (13, None), (19, 0), (9, BLACK)])]
+    path = str(tmp_path / "games.gor")
+    assert write_records(path, recs) == len(recs)
+    store = RecordStore(path)
+    assert len(store) == len(recs)
+    for rec, back in zip(recs, store):
+        assert (back.size, back.moves, back.komi, back.winner) == (rec.size, rec.moves, rec.komi, rec.winner)
+
+def test_replay_positions_matches_game_state(tmp_path):
+    recs = [_random_record(9, seed=i) for i in range(3)]
+    path = str(tmp_path / "games.gor")
+    write_records(path, recs)
+    states = {g: GameState.new_game(9) for g in range(len(recs))}
+    for g, ply, board, player, mv in replay_positions(RecordStore(path)):
+        s = states[g]
+        assert len(s.move_history) == ply and s.to_play == player
+        assert np.array_equal(np.asarray(board.grid), np.asarray(s.board.grid))
+        assert mv == recs[g].moves[ply]
+        states[g] = s.apply_move(mv)
+
+def test_opening_book_round_trip_with_symmetry(tmp_path):
+    size = 9
+    rec = GameRecord(size, [Move.play(2, 2), Move.play(6, 6), Move.play(2, 6)], winner=BLACK)
+    builder = BookBuilder(size, max_ply=3)
+    builder.add_record(rec)
+    builder.add_record(rec)
+    path = str(tmp_path / "book.bin")
+    assert builder.write(path) == 3
+    book = OpeningBook(path)
+    s = GameState.new_game(size)
+    assert book.choose(s).kind == "PLAY"
+    s = s.apply_move(Move.play(2, 2))
+    assert [e[0] for e in book.probe(s)] == [Move.play(6, 6)]
+    # cùng thế cờ qua mọi phép đối xứng -> tra ra nước đã biến đổi tương ứng
+    perm, inv = symmetries(size)
+    for t in range(8):
+        def f(x, y):
+            return divmod(int(inv[t][y * size + x]), size)[::-1]
+        st = GameState.new_game(size).apply_move(Move.play(*f(2, 2)))
+        assert [e[0] for e in book.probe(st)] == [Move.play(*f(6, 6))]
+        assert book.probe(st)[0][1] == 2.0
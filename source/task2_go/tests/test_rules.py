@@ -0,0 +1,91 @@
+# tests/test_rules.py
+"""Luật: perft trên các thế cố định của benchmarks.suite (số đếm phải khớp tuyệt đối),
+make/unmake khớp apply_move, ko / superko so với cách tính trực tiếp từ lịch sử."""
+from __future__ import annotations
+import random
+
+import numpy as np
+import pytest
+
+from benchmarks.suite import load_position, perft
+from core.game_state import GameState
+from core.move import Move
+from core.rules import KO_RULES, Rules
+from core.search.position import SearchPosition
+from core.zobrist import side_key
+
+# perft độ sâu 3 (PLAY + PASS) - cũng là số đếm trong benchmarks/baseline.json
+PERFT_D3 = {"empty": 531523, "opening": 439053, "fight": 234547, "ko": 399896, "endgame": 1629}
+
+@pytest.mark.parametrize("name", sorted(PERFT_D3))
+def test_perft(name):
+    assert perft(SearchPosition.from_state(load_position(name)), 3) == PERFT_D3[name]
+
+def test_ko_position_forbids_immediate_recapture():
+    s = load_position("ko")
+    assert not s.legal_mask()[4, 4]
+    # đi nơi khác 1 lượt mỗi bên thì bắt lại được
+    s = s.apply_move(Move.play(8, 8)).apply_move(Move.play(0, 8))
+    assert s.legal_mask()[4, 4]
+
+def _random_states(rule: str, seed: int, size: int = 5, games: int = 30):
+    rng = random.Random(seed)
+    for _ in range(games):
+        s = GameState.new_game(size, ko_rule=rule)
+        for _ in range(3 * size * size):
+            yield s
+            plays = [m for m in s.legal_moves() if m.kind == "PLAY"]
+            s = s.apply_move(rng.choice(plays) if plays and rng.random() > 0.05 else Move.pass_())
+            if s.is_terminal():
+                break
+
+def _brute_mask(s: GameState) -> np.ndarray:
+    """Nước hợp lệ tính trực tiếp: không tự sát, rồi so thế sau nước với toàn bộ lịch sử theo luật ko."""
+    rules = Rules()
+    hh = list(s.hash_history)
+    mask = rules.legal_mask(s.board, s.to_play)
+    for y, x in zip(*np.nonzero(mask)):
+        b = s.board.copy()
+        rules.play_move(b, s.to_play, int(x), int(y))
+        if s.ko_rule == "simple":
+            banned = len(hh) >= 2 and b.hash_key(-s.to_play) == hh[-2]
+        elif s.ko_rule == "situational":
+            banned = b.hash_key(-s.to_play) in hh
+        else:
+            # positional: bỏ phần lượt đi của từng khoá trong lịch sử (lượt xen kẽ, phần tử cuối ứng với to_play)
+            n = len(hh)
+            boards = {h ^ side_key(s.to_play if (n - 1 - i) % 2 == 0 else -s.to_play) for i, h in enumerate(hh)}
+            banned = b.hash_key() in boards
+        mask[y, x] = not banned
+    return mask
+
+@pytest.mark.parametrize("rule", KO_RULES)
+@pytest.mark.parametrize("backend", ["numpy", "bitboard"])
+def test_ko_rules_match_brute_force(rule, backend):
+    for s in _random_states(rule, seed=len(rule)):
+        if backend == "bitboard":
+            s = _replay(s, backend)
+        assert np.array_equal(s.legal_mask(), _brute_mask(s)), (rule, list(s.move_history))
+
+def _replay(s: GameState, backend: str) -> GameState:
+    out = GameState.new_game(s.board.size, backend, ko_rule=s.ko_rule)
+    for mv in s.move_history:
+        out = out.apply_move(mv)
+    return out
+
+@pytest.mark.parametrize("rule", KO_RULES)
+def test_make_unmake_matches_apply_move(rule):
+    for s in _random_states(rule, seed=3, games=10):
+        pos = SearchPosition.from_state(s)
+        before = pos.legal_moves()
+        assert before == s.legal_moves()
+        for mv in before[:6]:
+            if mv.kind == "RESIGN":
+                continue
+            pos.make_move(mv)
+            child = s.apply_move(mv)
+            assert pos.board.hash_key() == child.board.hash_key()
+            assert pos.legal_moves() == child.legal_moves()
+            pos.unmake_move()
+        assert pos.legal_moves() == before
+        assert pos.board.hash_key() == s.board.hash_key()
@@ -2,11 +2,13 @@ import pygame
 from typing import Dict
 from core.game_state import GameState
 from core.move import Move
-from core.board import BLACK, WHITE
+from core.board import BLACK, WHITE, hoshi_points
 from core.agents.human_agent import HumanAgent
 from core.agents.minimax_agent import MinimaxAgent
+from core.agents.background import BackgroundAgent
 from core.search.minimax import MinimaxSearcher
-from config.settings import BOARD_SIZE
+from core.scoring import game_result
+from config.settings import BOARD_SIZE, BOARD_SIZES, KOMI
 import os
 
 # Nếu trong settings có ON_TIMEOUT_ACTION thì import, còn không thì dùng fallback:
@@ -16,6 +18,8 @@ except Exception:
     ON_TIMEOUT_ACTION = "RESIGN"  # "RESIGN" hoặc "PASS"
 
 CELL = 60
+# độ rộng lưới (pixel) cố định, ô co theo kích thước bàn: 9x9 -> 60px, 13x13 -> 40px, 19x19 -> 26px
+BOARD_PIXELS = CELL * 8
 
 def _fmt_time(seconds: float) -> str:
     s = max(0, int(seconds))
@@ -26,11 +30,14 @@ class GameScene:
     def __init__(self, screen, config):
         self.screen=screen
         self.W, self.H = screen.get_size()
-        self.state=GameState.new_game(size=BOARD_SIZE)
+        size = getattr(config, "board_size", BOARD_SIZE)
+        if size not in BOARD_SIZES:
+            raise ValueError(f"Kích thước bàn {size} không hỗ trợ (chọn {BOARD_SIZES})")
+        self.state=GameState.new_game(size=size)
 
         # Căn bàn cờ giữa
-        self.cell_size = 60
-        self.board_pixel_size = self.cell_size * (BOARD_SIZE - 1)
+        self.cell_size = BOARD_PIXELS // (size - 1)
+        self.board_pixel_size = self.cell_size * (size - 1)
         self.margin_x = (self.W - self.board_pixel_size) // 2
         self.margin_y = (self.H - self.board_pixel_size) // 2
 
@@ -41,6 +48,8 @@ class GameScene:
             human=HumanAgent()
             ai=MinimaxAgent(MinimaxSearcher(config.ai_depth), player_color=-config.human_color)
             self.agents={config.human_color:human, -config.human_color:ai}
+        # agent AI chạy trong thread nền (UI chỉ poll kết quả) + ponder khi người đang nghĩ
+        self.workers={c: BackgroundAgent(a) for c, a in self.agents.items() if hasattr(a, "searcher")}
 
         self.last_play=None
         self.font=pygame.font.SysFont("arial",28)
@@ -79,6 +88,19 @@ class GameScene:
         self.time_over = False
         self.time_over_winner = None  # 1 hoặc -1
 
+        # Bảng số liệu search của AI (bật/tắt bằng F3)
+        self.show_stats = False
+        # kết quả ván (tính 1 lần khi ván kết thúc)
+        self.result = None
+
+    def close(self):
+        """Giải phóng tài nguyên của agent (thread nền, process pool của AI song song)."""
+        for worker in self.workers.values():
+            worker.close()
+        for agent in self.agents.values():
+            if hasattr(agent, "close"):
+                agent.close()
+
     def draw_glow_text(self, text, font, color, center, glow=True):
         if glow:
             shadow = font.render(text, True, (0, 0, 0, 80))
@@ -92,7 +114,7 @@ class GameScene:
     # ====== VẼ QUÂN ======
     def draw_stone(self, center, is_black, scale=1.0):
         x, y = center
-        r = int((self.cell_size // 2 - 5) * scale)  # Quân to, đầy ô
+        r = int((self.cell_size // 2 - max(2, self.cell_size // 12)) * scale)  # Quân to, đầy ô
 
         # 1) Bóng đổ
         shadow = pygame.Surface((r*2 + 25, r*2 + 25), pygame.SRCALPHA)
@@ -139,6 +161,40 @@ class GameScene:
                 self.state = self.state.apply_move(Move.resign())
             self.time_over = True
             self.time_over_winner = -player  # bên kia thắng
+            for worker in self.workers.values():
+                worker.cancel()
+
+    def toggle_stats(self):
+        self.show_stats = not self.show_stats
+
+    # ====== SỐ LIỆU SEARCH (debug) ======
+    _STATS_KEYS = ("completed_depth", "nodes", "leaves", "nps", "ebf", "cutoff_rate",
+                   "first_move_cutoff_rate", "time_movegen", "time_ordering", "time_eval",
+                   "playouts", "best_winrate")
+
+    def draw_stats_overlay(self):
+        lines = []
+        for color, worker in self.workers.items():
+            stats = worker.searcher.stats() if hasattr(worker.searcher, "stats") else {}
+            lines.append(f"AI {'Đen' if color == BLACK else 'Trắng'}")
+            for k in self._STATS_KEYS:
+                v = stats.get(k)
+                if v is None:
+                    continue
+                lines.append(f"  {k}: {round(v, 3) if isinstance(v, float) else v}")
+            tt = stats.get("tt") or {}
+            if tt:
+                lines.append(f"  tt_hit_rate: {tt.get('hit_rate', 0):.3f}")
+            if "pv" in stats:
+                lines.append("  pv: " + " ".join(stats["pv"][:6]))
+        if not lines:
+            return
+        w = 270; h = 18 * len(lines) + 12
+        panel = pygame.Surface((w, h), pygame.SRCALPHA)
+        panel.fill((0, 0, 0, 150))
+        self.screen.blit(panel, (10, 10))
+        for i, line in enumerate(lines):
+            self.screen.blit(self.font_small.render(line, True, (240, 240, 240)), (18, 16 + 18 * i))
 
     # ====== XỬ LÝ CLICK ======
     def handle_click(self,pos):
@@ -147,7 +203,7 @@ class GameScene:
             player=self.state.to_play; agent=self.agents[player]
             if isinstance(agent, HumanAgent):
                 mv=Move.play(i,j)
-                if any(m.kind=='PLAY' and m.x==i and m.y==j for m in self.state.legal_moves()):
+                if self.state.legal_mask()[j, i]:
                     agent.set_pending_move(mv)
 
     # ====== BƯỚC CẬP NHẬT ======
@@ -159,12 +215,29 @@ class GameScene:
             return "done"
 
         player=self.state.to_play; agent=self.agents[player]
-        mv=agent.select_move(self.state)
+        worker=self.workers.get(player)
+        if worker is not None:
+            # AI tìm trong thread nền; chưa xong thì vẽ tiếp khung hình sau
+            worker.request(self.state, clock=self.clock_total[player])
+            mv=worker.poll()
+        else:
+            mv=agent.select_move(self.state)
         if mv is None: 
             return None
-        self.state=self.state.apply_move(mv); self.last_play=mv
+        self._play(mv)
         return None
 
+    def _play(self, mv):
+        # trừ giờ bên vừa đi tới đúng lúc nước được áp dụng (không dồn sang bên kia)
+        self._tick_clock()
+        if self.state.is_terminal() or self.time_over:
+            return
+        player=self.state.to_play
+        self.state=self.state.apply_move(mv); self.last_play=mv
+        worker=self.workers.get(player)
+        if worker is not None and not self.state.is_terminal():
+            worker.ponder(self.state)
+
     # ====== VẼ UI ======
     def draw(self, events=[]):
         self.screen.fill((230, 200, 150))  # Nền gỗ
@@ -195,13 +268,11 @@ class GameScene:
             x1, y1 = mx + k * cell, my + (size-1) * cell
             pygame.draw.line(self.screen, (20,20,20), (x0, y0), (x1, y1), 1)
 
-        # 3) Điểm khí (hoshi)
-        stars = [2, 4, 6]
-        for i in stars:
-            for j in stars:
-                cx = mx + i * cell
-                cy = my + j * cell
-                pygame.draw.circle(self.screen, (60, 60, 60), (cx, cy), 4)
+        # 3) Điểm sao (hoshi) theo kích thước bàn
+        for i, j in hoshi_points(size):
+            cx = mx + i * cell
+            cy = my + j * cell
+            pygame.draw.circle(self.screen, (60, 60, 60), (cx, cy), 4)
 
         # 4) Quân cờ
         for y in range(size):
@@ -256,12 +327,26 @@ class GameScene:
         else:
             self.screen.blit(turn_text, turn_text.get_rect(center=(white_center[0], top_y + 86)))
 
+        if self.show_stats:
+            self.draw_stats_overlay()
+
         # Banner hết giờ
         if self.time_over:
             msg = f"Hết giờ! {'Đen' if self.time_over_winner==1 else 'Trắng'} thắng."
             banner = self.big_font.render(msg, True, (220,30,30))
             rect = banner.get_rect(center=(self.W//2, max(30, my-160)))
             self.screen.blit(banner, rect)
+        # Banner kết quả (2 PASS: đếm điểm Tromp-Taylor + komi; đầu hàng)
+        elif self.state.is_terminal():
+            if self.result is None:
+                self.result = game_result(self.state, KOMI)
+            msg = self.result.describe()
+            if self.result.count is not None:
+                c = self.result.count
+                msg += f" (Đen {c.black} - Trắng {c.white} + {KOMI:g})"
+            banner = self.big_font.render(msg, True, (220,30,30))
+            rect = banner.get_rect(center=(self.W//2, max(30, my-160)))
+            self.screen.blit(banner, rect)
 
         # Hướng dẫn
         # Vị trí 2 nút
@@ -283,8 +368,8 @@ class GameScene:
         # === XỬ LÝ CLICK CHO 2 NÚT ===
         if click_event:
             if pass_rect.collidepoint(click_event.pos):
-                if not self.state.is_terminal():
-                    self.state = self.state.apply_move(Move.pass_())
+                if not self.state.is_terminal() and isinstance(self.agents[self.state.to_play], HumanAgent):
+                    self._play(Move.pass_())
             elif back_rect.collidepoint(click_event.pos):
                 self.show_quit_confirm = True
 
@@ -1,7 +1,7 @@
 import pygame
 import os 
 from dataclasses import dataclass
-from config.settings import DEFAULT_AI_DEPTH, CLOCK_SECONDS_PER_SIDE
+from config.settings import DEFAULT_AI_DEPTH, CLOCK_SECONDS_PER_SIDE, BOARD_SIZE
 
 # === MÀU CHUẨN CỜ VÂY ===
 BLACK_STONE = (20, 20, 20)
@@ -13,6 +13,7 @@ class GameConfig:
     ai_depth: int = DEFAULT_AI_DEPTH
     human_color: int = 1  # 1=Đen, -1=Trắng
     clock_seconds: int = CLOCK_SECONDS_PER_SIDE
+    board_size: int = BOARD_SIZE
 
 class MenuScene:
     def __init__(self, screen):